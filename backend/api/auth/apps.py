@@ -5,3 +5,14 @@ class AuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api.auth'
     label = 'api_auth'
+
+    def ready(self):
+        from django.conf import settings
+        from django.contrib.auth.signals import user_logged_in
+
+        from . import signals
+
+        if not settings.AUTH_LAST_LOGIN_SYNC:
+            # django.contrib.auth conecta update_last_login con este dispatch_uid.
+            user_logged_in.disconnect(dispatch_uid='update_last_login')
+            user_logged_in.connect(signals.buffer_last_login, dispatch_uid='auth_buffer_last_login')
@@ -0,0 +1,91 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api.users.cache import user_cache
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    Autenticación JWT de simplejwt con una variante asíncrona (``aauthenticate``) que usan
+    las vistas ``AsyncAPIView``: el token se valida igual y el usuario se busca con el ORM asíncrono.
+
+    La búsqueda del usuario (``load_user``) está separada de sus validaciones (``check_user``)
+    para que las subclases puedan cambiar de dónde se obtiene.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        user = self.load_user(self.get_user_id(validated_token))
+        return self.check_user(user, validated_token)
+
+    async def aget_user(self, validated_token):
+        user = await self.aload_user(self.get_user_id(validated_token))
+        return self.check_user(user, validated_token)
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def load_user(self, user_id):
+        try:
+            return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+    async def aload_user(self, user_id):
+        try:
+            return await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+    @staticmethod
+    def check_user(user, validated_token):
+        """
+        Mismas validaciones que ``get_user`` de simplejwt: usuario activo y contraseña sin cambios.
+        """
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Autenticación JWT que obtiene el usuario del caché de usuarios (memoria del proceso y caché
+    compartido) en lugar de hacer un SELECT en cada petición. Las validaciones (activo, contraseña)
+    se aplican igual sobre el usuario guardado, que se invalida cada vez que el usuario cambia.
+    """
+
+    def load_user(self, user_id):
+        return user_cache.get(user_id, lambda: super(CachedJWTAuthentication, self).load_user(user_id))
+
+    async def aload_user(self, user_id):
+        return await user_cache.aget(user_id, lambda: super(CachedJWTAuthentication, self).aload_user(user_id))
+
+    @staticmethod
+    def stats() -> dict:
+        """
+        Aciertos y fallos del caché de usuarios en este proceso (ver ``UserCache.stats``).
+        """
+        return user_cache.stats()
@@ -0,0 +1,175 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from core.caching import is_shared_cache
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre un ``bytearray``: dice con certeza que un elemento no está y,
+    con una probabilidad de falso positivo ``error_rate``, que sí podría estar.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Doble hashing (Kirsch-Mitzenmacher): las k posiciones salen de dos valores de 64 bits.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenBlacklistCache:
+    """
+    Comprobación de la lista negra de refresh tokens sin consultar la base de datos en cada uso.
+
+    - Cada proceso mantiene un filtro de Bloom con los ``jti`` en la lista negra (de tokens sin vencer).
+      Si el ``jti`` no está en el filtro, el token no está en la lista negra.
+    - El filtro se mantiene al día con una versión en el caché compartido que se incrementa al
+      confirmarse cada alta en la lista negra; si cambió, se leen solo las filas nuevas (``id`` mayor
+      al último visto). Cada ``AUTH_BLACKLIST_BLOOM_REBUILD_SECONDS`` se reconstruye entero.
+    - Si el filtro dice que podría estar, la respuesta exacta sale del caché compartido o, si no
+      está, de la consulta por ``jti`` (índice único de ``OutstandingToken``), y se guarda.
+
+    Todo lo anterior depende de que los procesos vean el mismo caché. Con un backend local a cada
+    proceso (la memoria local por defecto) un proceso no se enteraría de los logouts de los demás,
+    así que cada comprobación va directo a la consulta por ``jti``.
+    """
+
+    VERSION_KEY = 'auth:blacklist:version'
+    KEY = 'auth:blacklist:{}'
+
+    # Al ponerse al día se releen también las últimas filas ya vistas: con transacciones concurrentes
+    # un ``id`` menor puede confirmarse después de uno mayor.
+    CATCH_UP_OVERLAP = 1000
+
+    def __init__(self, backend=None, timeout=None, rebuild_seconds=None, error_rate=0.001):
+        self.backend = backend or cache
+        self.timeout = settings.AUTH_BLACKLIST_CACHE_TIMEOUT if timeout is None else timeout
+        self.rebuild_seconds = settings.AUTH_BLACKLIST_BLOOM_REBUILD_SECONDS if rebuild_seconds is None else rebuild_seconds
+        self.error_rate = error_rate
+        self.shared = is_shared_cache(self.backend)
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = 0
+        self._version = None
+        self._built_at = 0.0
+        self._counters = {'bloom_negatives': 0, 'cache_hits': 0, 'db_lookups': 0}
+
+    def is_blacklisted(self, jti: str) -> bool:
+        if not self.shared:
+            self._count('db_lookups')
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+        if jti not in self._current_bloom():
+            self._count('bloom_negatives')
+            return False
+
+        key = self.KEY.format(jti)
+        blacklisted = self.backend.get(key)
+        if blacklisted is not None:
+            self._count('cache_hits')
+            return blacklisted
+
+        self._count('db_lookups')
+        blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        # ``add`` y no ``set``: si un alta se confirmó después de la consulta, ``mark_blacklisted``
+        # ya guardó True y no se reemplaza por la respuesta vieja.
+        self.backend.add(key, blacklisted, timeout=self.timeout)
+        return blacklisted
+
+    def mark_blacklisted(self, jti: str):
+        """
+        Registra un alta en la lista negra; se llama al confirmarse la transacción que la guardó.
+        """
+        self.backend.set(self.KEY.format(jti), True, timeout=self.timeout)
+        try:
+            self.backend.incr(self.VERSION_KEY)
+        except ValueError:
+            self.backend.add(self.VERSION_KEY, time.time_ns(), timeout=None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters['bloom_entries'] = self._bloom.count if self._bloom is not None else 0
+        return counters
+
+    def reset(self):
+        """
+        Descarta el filtro de este proceso; se reconstruye en la próxima comprobación.
+        """
+        with self._lock:
+            self._bloom = None
+
+    def _get_version(self):
+        version = self.backend.get(self.VERSION_KEY)
+        if version is None:
+            # Igual que la versión del catálogo: si se perdió se parte de un valor nuevo, que obliga
+            # a todos los procesos a releer las altas.
+            self.backend.add(self.VERSION_KEY, time.time_ns(), timeout=None)
+            version = self.backend.get(self.VERSION_KEY, 0)
+        return version
+
+    def _current_bloom(self) -> BloomFilter:
+        version = self._get_version()
+        with self._lock:
+            expired = time.monotonic() - self._built_at >= self.rebuild_seconds
+            if self._bloom is None or expired or self._bloom.count > self._bloom.capacity:
+                self._rebuild(version)
+            elif version != self._version:
+                self._catch_up(version)
+            return self._bloom
+
+    def _rebuild(self, version):
+        # La versión se lee antes que las filas: un alta confirmada después cambia la versión y se leerá luego.
+        rows = list(
+            BlacklistedToken.objects
+            .filter(token__expires_at__gt=timezone.now())
+            .values_list('id', 'token__jti')
+        )
+        bloom = BloomFilter(capacity=max(len(rows) * 2, 1024), error_rate=self.error_rate)
+        for _, jti in rows:
+            bloom.add(jti)
+        last_id = max((pk for pk, _ in rows), default=0)
+        self._bloom, self._last_id, self._version, self._built_at = bloom, last_id, version, time.monotonic()
+
+    def _catch_up(self, version):
+        rows = (
+            BlacklistedToken.objects
+            .filter(id__gt=self._last_id - self.CATCH_UP_OVERLAP)
+            .order_by('id')
+            .values_list('id', 'token__jti')
+        )
+        for pk, jti in rows:
+            if pk > self._last_id or jti not in self._bloom:
+                self._bloom.add(jti)
+            self._last_id = max(self._last_id, pk)
+        self._version = version
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+
+# Una instancia por proceso: el filtro de Bloom se comparte entre todas las peticiones.
+token_blacklist = TokenBlacklistCache()
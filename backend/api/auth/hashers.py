@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 de Django con las iteraciones de ``AUTH_PASSWORD_ITERATIONS``. Usa el mismo
+    algoritmo (``pbkdf2_sha256``), así que verifica los hashes existentes; si se guardaron con otra
+    cantidad de iteraciones ``must_update`` lo indica y se vuelven a cifrar al iniciar sesión.
+    """
+
+    @property
+    def iterations(self):
+        return settings.AUTH_PASSWORD_ITERATIONS
@@ -0,0 +1,117 @@
+"""
+Escritura diferida de ``last_login``.
+
+Django actualiza ``last_login`` con un UPDATE por cada inicio de sesión (receptor ``update_last_login``
+de ``user_logged_in``). Con ``AUTH_LAST_LOGIN_SYNC`` en False ese receptor se reemplaza por
+``LastLoginBuffer``: cada proceso junta la última fecha de cada usuario y la escribe con un solo
+UPDATE cada ``AUTH_LAST_LOGIN_FLUSH_SECONDS`` segundos, al llegar a ``AUTH_LAST_LOGIN_FLUSH_SIZE``
+usuarios y al terminar el proceso. Si el proceso muere sin terminar, se pierden a lo sumo esos segundos.
+
+Con ``AUTH_LAST_LOGIN_FLUSH_SECONDS`` en 0 no se inicia el hilo: cada inicio
+de sesión se escribe en el momento, con el mismo UPDATE que nunca hace retroceder la fecha.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from api.users.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+
+    def __init__(self, interval=None, max_entries=None, chunk_size=500):
+        self.interval = settings.AUTH_LAST_LOGIN_FLUSH_SECONDS if interval is None else interval
+        self.max_entries = settings.AUTH_LAST_LOGIN_FLUSH_SIZE if max_entries is None else max_entries
+        self.chunk_size = chunk_size
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def record(self, user_id, when):
+        """
+        Anota un inicio de sesión; si el usuario ya estaba pendiente se conserva la fecha más reciente.
+        """
+        with self._lock:
+            self._keep_latest(user_id, when)
+            full = len(self._pending) >= self.max_entries
+            if self._thread is None and self.interval > 0:
+                self._start()
+        if self.interval <= 0:
+            self.flush()
+        elif full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Escribe las fechas pendientes y devuelve cuántos usuarios se actualizaron. Nunca retrocede
+        ``last_login`` (otro proceso pudo escribir una fecha posterior).
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            try:
+                return self._write(sorted(pending.items()))
+            except Exception:
+                # Se devuelven al buffer para el próximo intento, sin pisar fechas más recientes.
+                with self._lock:
+                    for user_id, when in pending.items():
+                        self._keep_latest(user_id, when)
+                raise
+
+    def _keep_latest(self, user_id, when):
+        # Se llama con ``self._lock`` tomado.
+        previous = self._pending.get(user_id)
+        if previous is None or when > previous:
+            self._pending[user_id] = when
+
+    def _write(self, items):
+        updated = 0
+        with transaction.atomic():
+            for start in range(0, len(items), self.chunk_size):
+                chunk = items[start:start + self.chunk_size]
+                new_value = Case(
+                    *[When(pk=user_id, then=Value(when)) for user_id, when in chunk],
+                    output_field=DateTimeField(),
+                )
+                updated += User.objects.filter(pk__in=[user_id for user_id, _ in chunk]).update(
+                    last_login=Greatest(Coalesce(F('last_login'), new_value), new_value)
+                )
+        return updated
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='last-login-flush', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Un error de la base de datos no debe detener el hilo; se reintenta con el siguiente lote.
+                logger.exception('No se pudo escribir last_login')
+            finally:
+                # El hilo tiene su propia conexión; se cierra para no dejarla abierta entre escrituras.
+                connection.close()
+
+
+# Una instancia por proceso; el hilo que escribe se inicia con el primer inicio de sesión.
+last_login_buffer = LastLoginBuffer()
@@ -0,0 +1,150 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand
+
+from api.auth.passwords import PasswordVerifier, PasswordVerifierBusy
+from api.users.models import User
+
+PASSWORD = 'benchmark-Password-123'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the cost of each password hasher and PBKDF2 iteration count, and the login throughput '
+        'of the password verification pool (with 503 rejections) against verifying on the request thread'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            nargs='+',
+            default=[260_000, 600_000, 1_000_000],
+            help='PBKDF2-SHA256 iteration counts to time, AUTH_PASSWORD_ITERATIONS is always added'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Verifications per measurement, the median is reported (default: 5)'
+        )
+        parser.add_argument(
+            '--logins',
+            type=int,
+            default=64,
+            help='Verifications per concurrency level in the pool test (default: 64)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            nargs='+',
+            default=[1, 8, 32],
+            help='Concurrent login threads in the pool test (default: 1 8 32)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.AUTH_PASSWORD_WORKERS,
+            help='Pool processes (default: AUTH_PASSWORD_WORKERS)'
+        )
+        parser.add_argument(
+            '--queue-size',
+            type=int,
+            default=settings.AUTH_PASSWORD_QUEUE_SIZE,
+            help='Verifications allowed to wait (default: AUTH_PASSWORD_QUEUE_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'hasher':<16} {'work factor':>12} {'verify ms':>10} {'per core/s':>11}")
+        pbkdf2 = hashers.PBKDF2PasswordHasher()
+        for iterations in sorted(set(options['iterations']) | {settings.AUTH_PASSWORD_ITERATIONS}):
+            encoded = pbkdf2.encode(PASSWORD, pbkdf2.salt(), iterations)
+            self.report('pbkdf2_sha256', f'{iterations:,}', pbkdf2.verify, encoded, options['repeat'])
+
+        for hasher in hashers.get_hashers():
+            if hasher.algorithm == 'pbkdf2_sha256':
+                continue
+            try:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+            except ValueError as e:
+                self.stdout.write(f'{hasher.algorithm:<16} {"-":>12} skipped: {e}')
+                continue
+            work_factor = next(
+                (f'{value:,}' for name, value in hasher.safe_summary(encoded).items() if name in ('iterations', 'work factor', 'time cost')),
+                '-',
+            )
+            self.report(hasher.algorithm, work_factor, hasher.verify, encoded, options['repeat'])
+
+        # Usuario sin guardar con un hash de la configuración actual (no se vuelve a cifrar).
+        user = User(username='benchmark', password=hashers.make_password(PASSWORD))
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'mode':<8} {'conc':>5} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'503':>5} {'probe p99 ms':>13}"
+        )
+        modes = [('inline', PasswordVerifier(workers=0, queue_size=0))]
+        if options['workers'] > 0:
+            modes.append(('pool', PasswordVerifier(workers=options['workers'], queue_size=options['queue_size'])))
+        for name, verifier in modes:
+            # La primera verificación arranca los procesos del pool, no se mide.
+            verifier.check_password(user, PASSWORD)
+            for concurrency in options['concurrency']:
+                self.burst(name, verifier, user, concurrency, options['logins'])
+            verifier.shutdown()
+
+    def report(self, algorithm, work_factor, verify, encoded, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            if not verify(PASSWORD, encoded):
+                raise AssertionError(f'{algorithm} did not verify its own hash')
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        self.stdout.write(f'{algorithm:<16} {work_factor:>12} {median * 1000:>10.1f} {1 / median:>11.1f}')
+
+    def burst(self, name, verifier, user, concurrency, logins):
+        """
+        ``logins`` verificaciones desde ``concurrency`` hilos mientras otro hilo mide cuánto tarda
+        un trabajo corto de CPU (lo que sufren los demás endpoints del mismo proceso).
+        """
+        latencies, rejected = [], 0
+        probes, done = [], False
+
+        def login():
+            started = time.perf_counter()
+            try:
+                verifier.check_password(user, PASSWORD)
+            except PasswordVerifierBusy:
+                return None
+            return time.perf_counter() - started
+
+        def probe():
+            while not done:
+                started = time.perf_counter()
+                sum(i * i for i in range(20_000))
+                probes.append(time.perf_counter() - started)
+                time.sleep(0.005)
+
+        with ThreadPoolExecutor(max_workers=1) as prober:
+            probing = prober.submit(probe)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                for latency in pool.map(lambda _: login(), range(logins)):
+                    if latency is None:
+                        rejected += 1
+                    else:
+                        latencies.append(latency)
+            elapsed = time.perf_counter() - started
+            done = True
+            probing.result()
+
+        latencies.sort()
+        probes.sort()
+        percentile = lambda values, p: values[min(int(p / 100 * len(values)), len(values) - 1)] * 1000 if values else 0.0
+        self.stdout.write(
+            f'{name:<8} {concurrency:>5} {len(latencies) / elapsed:>9.1f} {percentile(latencies, 50):>8.1f} '
+            f'{percentile(latencies, 99):>8.1f} {rejected:>5} {percentile(probes, 99):>13.1f}'
+        )
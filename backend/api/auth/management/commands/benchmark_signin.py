@@ -0,0 +1,104 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max
+
+from api.auth.passwords import password_verifier
+from api.auth.services import AuthService
+from api.users.models import User
+from api.users.seeding import seed_users
+
+EMAIL = 'benchmark-signin@example.com'
+PASSWORD = 'benchmark-Password-123'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure sign-in latency with many users: the old exact email lookup (table scan), the '
+        'case-insensitive indexed lookup, and the full AuthService sign-in including the password check'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1_000_000,
+            help='Users the table must hold, missing ones are seeded first (default: 1000000)'
+        )
+        parser.add_argument(
+            '--lookups',
+            type=int,
+            default=200,
+            help='Indexed lookups to time (default: 200)'
+        )
+        parser.add_argument(
+            '--scans',
+            type=int,
+            default=5,
+            help='Lookups to time with the old unindexed query, each scans the table (default: 5)'
+        )
+        parser.add_argument(
+            '--signins',
+            type=int,
+            default=10,
+            help='Full sign-ins to time, each pays for a password hash (default: 10)'
+        )
+
+    def handle(self, *args, **options):
+        existing = User.objects.count()
+        if existing < options['users']:
+            missing = options['users'] - existing
+            self.stdout.write(f'Seeding {missing} users...')
+            offset = (User.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+            started = time.perf_counter()
+            seed_users(missing, offset=offset)
+            self.stdout.write(f'Seeded in {time.perf_counter() - started:.1f}s')
+
+        user = User.objects.filter_by_email(EMAIL).first()
+        if user is None:
+            User.objects.create_user(username='benchmark-signin', email=EMAIL, password=PASSWORD)
+        else:
+            user.set_password(PASSWORD)
+            user.save(update_fields=['password'])
+
+        emails = list(
+            User.objects.exclude(email='').order_by('?').values_list('email', flat=True)[:max(options['lookups'], options['scans'])]
+        )
+        total = User.objects.count()
+        self.stdout.write(f'{total} users, vendor {connection.vendor}')
+        self.stdout.write(f"{'lookup':<26} {'runs':>5} {'p50 ms':>9} {'p99 ms':>9}")
+
+        # Consulta anterior: igualdad exacta sobre una columna sin índice.
+        self.report('exact email (no index)', [
+            self.timed(lambda: User.objects.filter(email=email).first()) for email in emails[:options['scans']]
+        ])
+        # Consulta nueva: LOWER(email) con el índice único, con el email en mayúsculas para probar la conversión.
+        self.report('lower(email) (index)', [
+            self.timed(lambda: User.objects.get_by_email(self.shuffle_case(email))) for email in emails[:options['lookups']]
+        ])
+
+        service = AuthService()
+        self.report('sign-in (AuthService)', [
+            self.timed(lambda: service.authenticate_user(EMAIL.upper(), PASSWORD)) for _ in range(options['signins'])
+        ])
+        password_verifier.shutdown()
+
+    @staticmethod
+    def timed(call):
+        started = time.perf_counter()
+        call()
+        return time.perf_counter() - started
+
+    @staticmethod
+    def shuffle_case(email):
+        return ''.join(char.upper() if random.random() < 0.5 else char for char in email)
+
+    def report(self, name, timings):
+        timings = sorted(timings)
+        p99 = timings[min(int(0.99 * len(timings)), len(timings) - 1)]
+        self.stdout.write(
+            f'{name:<26} {len(timings):>5} {statistics.median(timings) * 1000:>9.2f} {p99 * 1000:>9.2f}'
+        )
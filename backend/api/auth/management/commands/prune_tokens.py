@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding refresh tokens (and their blacklist entries) in small batches, '
+        'each in its own transaction so no lock is held for long. Meant to run periodically (e.g. cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tokens deleted per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches to leave room for other writes (default: 0)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Stop after this many batches; the next run continues (default: no limit)'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now()
+        expired = OutstandingToken.objects.filter(expires_at__lte=cutoff).order_by('expires_at')
+        deleted = batches = 0
+
+        while options['max_batches'] is None or batches < options['max_batches']:
+            with transaction.atomic():
+                ids = list(expired.values_list('id', flat=True)[:options['batch_size']])
+                if not ids:
+                    break
+                # El borrado en cascada elimina las filas de la lista negra de estos tokens con un solo DELETE.
+                _, per_model = OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += per_model.get(OutstandingToken._meta.label, 0)
+            batches += 1
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} expired tokens in {batches} batches (expired before {cutoff:%Y-%m-%d %H:%M})'
+        ))
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Índice sobre ``expires_at`` de los tokens emitidos (tabla de simplejwt) para que
+    ``prune_tokens`` encuentre los vencidos por lotes sin recorrer toda la tabla.
+    """
+
+    dependencies = [
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX IF NOT EXISTS outstanding_token_expires_idx '
+                'ON token_blacklist_outstandingtoken (expires_at)'
+            ),
+            reverse_sql='DROP INDEX IF EXISTS outstanding_token_expires_idx',
+        ),
+    ]
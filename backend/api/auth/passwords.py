@@ -0,0 +1,204 @@
+"""
+Verificación de contraseñas fuera del hilo de la petición.
+
+El hash de una contraseña (PBKDF2 con cientos de miles de iteraciones) ocupa la CPU durante
+cientos de milisegundos; con una ráfaga de inicios de sesión los hilos del worker quedan
+ocupados y el resto de los endpoints espera. ``PasswordVerifier`` manda cada verificación a
+un pool acotado de procesos y, si además de los procesos ocupados la cola está llena,
+rechaza la verificación con ``PasswordVerifierBusy`` para responder 503 en lugar de acumular espera.
+"""
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.utils.crypto import get_random_string
+
+
+class PasswordVerifierBusy(Exception):
+    """
+    Se lanza cuando el pool de verificación está lleno; ``retry_after`` son los segundos sugeridos para reintentar.
+    """
+
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"El servicio de autenticación está saturado, reintente en {retry_after} segundos")
+
+
+_dummy_encoded = None
+
+
+def _dummy_hash() -> str:
+    """
+    Hash de una contraseña al azar, con el hasher y los parámetros actuales; se calcula una vez por proceso.
+    """
+    global _dummy_encoded
+    if _dummy_encoded is None:
+        _dummy_encoded = make_password(get_random_string(32))
+    return _dummy_encoded
+
+
+def _init_worker():
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    django.setup()
+    # Al iniciar el proceso y no en la primera petición con un email inexistente, que si no tardaría
+    # dos hashes en lugar de uno.
+    _dummy_hash()
+
+
+def _verify(password: str, encoded: str):
+    """
+    Se ejecuta en un proceso del pool. Devuelve si la contraseña es correcta y, si el hash se guardó
+    con otro hasher o con otros parámetros, el hash nuevo con la configuración actual.
+    """
+    rehashed = None
+
+    def setter(raw_password):
+        nonlocal rehashed
+        rehashed = make_password(raw_password)
+
+    return check_password(password, encoded, setter), rehashed
+
+
+def _verify_dummy(password: str):
+    """
+    Se ejecuta en un proceso del pool: verifica contra el hash al azar de ese proceso (siempre falla).
+    """
+    return check_password(password, _dummy_hash()), None
+
+
+class PasswordVerifier:
+    """
+    Pool de ``AUTH_PASSWORD_WORKERS`` procesos (por proceso del servidor) con hasta
+    ``AUTH_PASSWORD_QUEUE_SIZE`` verificaciones en espera. Con 0 procesos se verifica en el hilo
+    de la petición, como ``User.check_password``.
+    """
+
+    def __init__(self, workers=None, queue_size=None, timeout=None):
+        self.workers = settings.AUTH_PASSWORD_WORKERS if workers is None else workers
+        self.queue_size = settings.AUTH_PASSWORD_QUEUE_SIZE if queue_size is None else queue_size
+        self.timeout = settings.AUTH_PASSWORD_TIMEOUT if timeout is None else timeout
+        self._slots = threading.BoundedSemaphore(max(self.workers, 1) + self.queue_size)
+        self._lock = threading.Lock()
+        self._executor = None
+        if self.workers <= 0:
+            # Sin pool se verifica en el hilo de la petición: el hash al azar se calcula ya.
+            _dummy_hash()
+        # Promedio móvil de la duración de una verificación, para estimar Retry-After.
+        self._average = 0.5
+
+    def check_password(self, user, password: str) -> bool:
+        """
+        Equivalente a ``user.check_password(password)``: si la contraseña es correcta y el hash
+        está desactualizado, guarda el hash nuevo (solo el campo ``password``).
+
+        Raises:
+            PasswordVerifierBusy: Si no hay lugar en el pool ni en la cola, o la verificación no termina a tiempo.
+        """
+        if self.workers <= 0:
+            return user.check_password(password)
+
+        started = time.monotonic()
+        valid, rehashed = self._run(_verify, password, user.password)
+        self._observe(time.monotonic() - started)
+
+        if rehashed:
+            user.password = rehashed
+            user.save(update_fields=['password'])
+        return valid
+
+    def check_dummy_password(self, password: str) -> bool:
+        """
+        Verifica la contraseña contra un hash al azar (siempre falla) con el mismo costo y por el
+        mismo pool que ``check_password``, para que un email inexistente no responda más rápido.
+
+        Raises:
+            PasswordVerifierBusy: Igual que ``check_password``.
+        """
+        if self.workers <= 0:
+            return check_password(password, _dummy_hash())
+
+        valid, _ = self._run(_verify_dummy, password)
+        return valid
+
+    def retry_after(self) -> int:
+        """
+        Segundos que tarda en vaciarse el pool lleno, según la duración promedio de una verificación.
+        """
+        return max(1, math.ceil(self._average * (self.workers + self.queue_size) / self.workers))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, function, *args):
+        """
+        Manda la verificación al pool. El lugar se libera cuando la verificación termina y no cuando
+        la petición deja de esperarla: un future en ejecución no se puede cancelar y, si se liberara
+        al vencer el tiempo, las verificaciones nuevas se acumularían en la cola interna del pool.
+
+        Si un proceso del pool murió, el pool se descarta (la próxima verificación crea otro) y se responde
+        como con el pool lleno; verificar aquí dejaría a todas las peticiones en curso calculando hashes
+        en los hilos del servidor.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise PasswordVerifierBusy(self.retry_after())
+        executor = self._get_executor()
+        try:
+            future = executor.submit(function, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._discard(executor)
+            raise PasswordVerifierBusy(self.retry_after())
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordVerifierBusy(self.retry_after())
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise PasswordVerifierBusy(self.retry_after())
+
+    def _discard(self, executor):
+        """
+        Descarta un pool roto, solo si sigue siendo el actual: otro hilo que lo encontró roto antes
+        pudo haber creado ya el reemplazo, que no se debe perder con sus procesos.
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn en lugar de fork: el proceso del servidor tiene hilos y conexiones abiertas.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context('spawn'),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _observe(self, seconds):
+        with self._lock:
+            self._average = 0.8 * self._average + 0.2 * seconds
+
+
+# Una instancia por proceso del servidor; el pool se crea con la primera verificación.
+password_verifier = PasswordVerifier()
@@ -10,7 +10,7 @@ class AuthRepository:
     @staticmethod
     def get_user_by_email(email: str) -> User:
         """
-        Obtiene un usuario por su email.
+        Obtiene un usuario por su email, sin distinguir mayúsculas, con el índice único sobre ``LOWER(email)``.
 
         Args:
             email (str): El email del usuario.
@@ -22,6 +22,6 @@ class AuthRepository:
             User.DoesNotExist: Si no se encuentra un usuario con el email proporcionado.
         """
         try:
-            return User.objects.get(email=email)
+            return User.objects.get_by_email(email)
         except User.DoesNotExist:
             raise User.DoesNotExist(f"El recurso solicitado {email} no exist")
\ No newline at end of file
@@ -1,4 +1,7 @@
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+
+from .tokens import RefreshToken
 
 
 class LoginSerializer(serializers.Serializer):
@@ -61,4 +64,11 @@ class TokenRefreshSerializer(serializers.Serializer):
         """
         if not value:
             raise serializers.ValidationError("Refresh token is required.")
-        return value
\ No newline at end of file
+        return value
+
+
+class CachedBlacklistTokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Serializer de simplejwt para renovar tokens que comprueba la lista negra con ``token_blacklist``.
+    """
+    token_class = RefreshToken
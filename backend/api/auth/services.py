@@ -1,7 +1,9 @@
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from django.core.exceptions import ObjectDoesNotExist
 from django.contrib.auth.signals import user_logged_in
+from .passwords import password_verifier
 from .repository import AuthRepository
+from .tokens import RefreshToken
 
 
 class AuthService:
@@ -11,6 +13,7 @@ class AuthService:
 
     def __init__(self):
         self.repository = AuthRepository()
+        self.password_verifier = password_verifier
 
     def authenticate_user(self, email: str, password: str, request=None) -> dict:
         """
@@ -27,10 +30,16 @@ class AuthService:
         Raises:
             User.DoesNotExist: Si no se encuentra un usuario con el email proporcionado.
             ValueError: Si la contraseña es incorrecta.
+            PasswordVerifierBusy: Si el pool de verificación de contraseñas está lleno.
         """
-        user = self.repository.get_user_by_email(email)
-        
-        if not user.check_password(password):
+        try:
+            user = self.repository.get_user_by_email(email)
+        except ObjectDoesNotExist:
+            # Mismo costo que con un email registrado: el tiempo de respuesta no revela qué emails existen.
+            self.password_verifier.check_dummy_password(password)
+            raise
+
+        if not self.password_verifier.check_password(user, password):
             raise ValueError("La creadenciales son invalidas")
 
         # Generate JWT tokens
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .blacklist import token_blacklist
+from .last_login import last_login_buffer
+
+
+@receiver(post_save, sender=BlacklistedToken, dispatch_uid='auth_mark_blacklisted_token')
+def mark_blacklisted_token(sender, instance, created, **kwargs):
+    """
+    Avisa a los filtros de Bloom de todos los procesos cuando un token entra a la lista negra
+    (logout, rotación de refresh tokens o el admin).
+    """
+    if created:
+        jti = instance.token.jti
+        transaction.on_commit(lambda: token_blacklist.mark_blacklisted(jti))
+
+
+def buffer_last_login(sender, user, **kwargs):
+    """
+    Reemplaza a ``update_last_login`` de Django (ver ``AuthConfig.ready``): la fecha se guarda en
+    la instancia y se escribe en la base de datos con el próximo lote de ``last_login_buffer``.
+    """
+    user.last_login = timezone.now()
+    last_login_buffer.record(user.pk, user.last_login)
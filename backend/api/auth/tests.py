@@ -1,3 +1,257 @@
+import io
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from api.users.models import User
+
+from .blacklist import TokenBlacklistCache
+from .hashers import PBKDF2PasswordHasher
+from .last_login import LastLoginBuffer, last_login_buffer
+from .passwords import PasswordVerifier, PasswordVerifierBusy
+from .throttling import LoginIPRateThrottle, local_buckets
+from .tokens import RefreshToken
+
+
+class RefreshTokenBlacklistTests(TestCase):
+    """
+    Un refresh token deja de servir en cuanto se hace logout, en cualquier proceso.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(username='sesion', email='sesion@example.com')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.jti = self.refresh['jti']
+
+    def test_refresh_is_rejected_after_logout(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        self.assertEqual(client.post(reverse('token_refresh'), {'refresh': str(self.refresh)}).status_code, 200)
+        self.assertEqual(client.post(reverse('logout'), {'refresh': str(self.refresh)}).status_code, 205)
+        self.assertEqual(client.post(reverse('token_refresh'), {'refresh': str(self.refresh)}).status_code, 401)
+
+    def test_process_local_cache_sees_blacklist_from_other_processes(self):
+        # Cada instancia con su propia memoria local, como dos workers.
+        worker, other = (TokenBlacklistCache(backend=LocMemCache(f'blacklist-{name}', {})) for name in 'ab')
+        self.assertFalse(worker.is_blacklisted(self.jti))
+
+        self.refresh.blacklist()
+        other.mark_blacklisted(self.jti)
+
+        self.assertTrue(worker.is_blacklisted(self.jti))
+
+    def test_shared_cache_uses_the_bloom_filter(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        backend = FileBasedCache(directory.name, {})
+        worker, other = TokenBlacklistCache(backend=backend), TokenBlacklistCache(backend=backend)
+        self.assertFalse(worker.is_blacklisted(self.jti))
+        self.assertEqual(worker.stats()['bloom_negatives'], 1)
+
+        self.refresh.blacklist()
+        other.mark_blacklisted(self.jti)
+
+        self.assertTrue(worker.is_blacklisted(self.jti))
+
+
+class PruneTokensCommandTests(TestCase):
+    """
+    ``prune_tokens`` borra solo los tokens vencidos, junto con sus altas en la lista negra.
+    """
+
+    def test_deletes_expired_tokens_in_batches(self):
+        user = User.objects.create(username='vencido', email='vencido@example.com')
+        now = timezone.now()
+        expired = [
+            OutstandingToken.objects.create(user=user, jti=f'vencido-{i}', token='x', expires_at=now - timedelta(days=1))
+            for i in range(3)
+        ]
+        valid = OutstandingToken.objects.create(user=user, jti='vigente', token='x', expires_at=now + timedelta(days=1))
+        BlacklistedToken.objects.create(token=expired[0])
+        BlacklistedToken.objects.create(token=valid)
+
+        output = io.StringIO()
+        call_command('prune_tokens', batch_size=2, stdout=output)
+
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['vigente'])
+        self.assertEqual(list(BlacklistedToken.objects.values_list('token__jti', flat=True)), ['vigente'])
+        self.assertIn('Deleted 3 expired tokens in 2 batches', output.getvalue())
+
+
+class LastLoginBufferTests(TestCase):
+    """
+    Escritura por lotes de ``last_login``: una fila por usuario y nunca hacia atrás.
+    """
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.users = [User.objects.create(username=f'login-{i}', email=f'login-{i}@example.com') for i in range(2)]
+
+    def last_logins(self):
+        return [user.last_login for user in User.objects.filter(pk__in=[u.pk for u in self.users]).order_by('pk')]
+
+    def test_logins_are_coalesced_into_one_update(self):
+        buffer = LastLoginBuffer(interval=60)
+        # Sin el hilo: la prueba decide cuándo escribir.
+        with mock.patch.object(buffer, '_start'):
+            for minutes in (1, 3, 2):
+                buffer.record(self.users[0].pk, self.now + timedelta(minutes=minutes))
+            buffer.record(self.users[1].pk, self.now)
+        self.assertEqual(buffer.pending(), 2)
+
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(buffer.flush(), 2)
+
+        self.assertEqual([query['sql'].startswith('UPDATE') for query in captured].count(True), 1)
+        self.assertEqual(self.last_logins(), [self.now + timedelta(minutes=3), self.now])
+        self.assertEqual(buffer.pending(), 0)
+
+    def test_last_login_never_moves_backwards(self):
+        later = self.now + timedelta(hours=1)
+        User.objects.filter(pk=self.users[0].pk).update(last_login=later)
+
+        buffer = LastLoginBuffer(interval=0)
+        buffer.record(self.users[0].pk, self.now)
+        buffer.record(self.users[1].pk, self.now)
+
+        self.assertEqual(self.last_logins(), [later, self.now])
+        self.assertIsNone(buffer._thread)
+
+
+class LoginThrottleTests(TestCase):
+    """
+    El límite por IP del inicio de sesión no se puede evitar cambiando encabezados de la petición.
+    """
+
+    def setUp(self):
+        local_buckets.clear()
+        self.addCleanup(local_buckets.clear)
+        patches = [
+            mock.patch.object(LoginIPRateThrottle, 'THROTTLE_RATES', {'login_ip': '2/min', 'login_email': '100/min'}),
+            # Sin el pool de procesos: solo interesa el throttle.
+            mock.patch.object(PasswordVerifier, 'check_dummy_password', return_value=False),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_rotating_x_forwarded_for_does_not_reset_the_ip_bucket(self):
+        client = APIClient()
+        statuses = [
+            client.post(
+                reverse('signin'),
+                {'email': f'intento-{i}@example.com', 'password': 'x'},
+                format='json',
+                HTTP_X_FORWARDED_FOR=f'203.0.113.{i}',
+            ).status_code
+            for i in range(3)
+        ]
+
+        self.assertEqual(statuses, [401, 401, 429])
+
+
+class PasswordVerifierTests(TestCase):
+    """
+    Verificación de contraseñas en el pool de procesos: 503 con Retry-After cuando no hay lugar,
+    nunca un hash en el hilo de la petición, y el hash se actualiza al iniciar sesión.
+    """
+
+    password = 'una-Password-123'
+
+    def setUp(self):
+        # El inicio de sesión anota last_login; sin el hilo de escritura del buffer.
+        patcher = mock.patch.object(last_login_buffer, 'record')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def use_verifier(self, verifier):
+        patcher = mock.patch('api.auth.services.password_verifier', verifier)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(verifier.shutdown)
+        return verifier
+
+    def signin(self, email):
+        return APIClient().post(reverse('signin'), {'email': email, 'password': self.password}, format='json')
+
+    def test_full_pool_answers_503_with_retry_after(self):
+        User.objects.create(username='ocupado', email='ocupado@example.com', password='x')
+        verifier = self.use_verifier(PasswordVerifier(workers=1, queue_size=0))
+        # El único lugar lo ocupa otra verificación.
+        verifier._slots.acquire()
+
+        response = self.signin('ocupado@example.com')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], str(verifier.retry_after()))
+        self.assertEqual(response.data['status'], 'error')
+
+    def assert_busy_without_hashing_inline(self, broken):
+        verifier = PasswordVerifier(workers=1, queue_size=0)
+        verifier._executor = broken
+
+        with mock.patch('api.auth.passwords._verify_dummy') as verify_inline:
+            with self.assertRaises(PasswordVerifierBusy):
+                verifier.check_dummy_password(self.password)
+
+        verify_inline.assert_not_called()
+        self.assertIsNone(verifier._executor)
+        broken.shutdown.assert_called_once()
+        # El lugar se liberó.
+        self.assertTrue(verifier._slots.acquire(blocking=False))
+
+    def test_pool_broken_before_submit_answers_busy(self):
+        broken = mock.Mock()
+        broken.submit.side_effect = BrokenProcessPool('Un proceso del pool murió')
+        self.assert_busy_without_hashing_inline(broken)
+
+    def test_pool_broken_during_verification_answers_busy(self):
+        failed = Future()
+        failed.set_exception(BrokenProcessPool('Un proceso del pool murió'))
+        broken = mock.Mock()
+        broken.submit.return_value = failed
+        self.assert_busy_without_hashing_inline(broken)
+
+    def test_broken_pool_does_not_discard_a_replacement(self):
+        verifier = PasswordVerifier(workers=1, queue_size=0)
+        broken, replacement = mock.Mock(), mock.Mock()
+        # Otro hilo ya descartó el pool roto y creó uno nuevo.
+        verifier._executor = replacement
+
+        verifier._discard(broken)
+
+        self.assertIs(verifier._executor, replacement)
+        replacement.shutdown.assert_not_called()
+
+    def test_signin_rehashes_password_with_current_iterations(self):
+        old_iterations = 1000
+        hasher = PBKDF2PasswordHasher()
+        user = User.objects.create(
+            username='antiguo', email='antiguo@example.com',
+            password=hasher.encode(self.password, hasher.salt(), old_iterations),
+        )
+        self.use_verifier(PasswordVerifier(workers=1, queue_size=0))
+
+        response = self.signin('antiguo@example.com')
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        summary = identify_hasher(user.password).safe_summary(user.password)
+        self.assertEqual(summary['iterations'], settings.AUTH_PASSWORD_ITERATIONS)
+        self.assertTrue(user.check_password(self.password))
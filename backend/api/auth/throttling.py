@@ -0,0 +1,122 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LocalBucketStore:
+    """
+    Estado de los token buckets en la memoria del proceso: ``llave -> (fichas, última recarga)``.
+    Es un LRU con ``max_entries`` llaves como máximo, así una ráfaga de IPs o emails distintos
+    no hace crecer la memoria; una llave expulsada vuelve con el bucket lleno.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = settings.AUTH_LOGIN_THROTTLE_MAX_ENTRIES if max_entries is None else max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_per_second, now):
+        with self._lock:
+            state = self._buckets.get(key)
+            allowed, state, wait = take_token(state, capacity, refill_per_second, now)
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return allowed, wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SharedBucketStore:
+    """
+    Estado de los token buckets en el caché compartido de Django, para limitar entre todos los
+    procesos. La lectura y la escritura no son atómicas: con peticiones simultáneas en varios
+    procesos pueden pasar algunas de más, pero el límite se mantiene en el orden configurado.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or cache
+
+    def consume(self, key, capacity, refill_per_second, now):
+        allowed, state, wait = take_token(self.backend.get(key), capacity, refill_per_second, now)
+        # La entrada expira cuando el bucket ya estaría lleno otra vez.
+        self.backend.set(key, state, timeout=max(1, int((capacity - state[0]) / refill_per_second) + 1))
+        return allowed, wait
+
+
+def take_token(state, capacity, refill_per_second, now):
+    """
+    Recarga el bucket según el tiempo transcurrido y toma una ficha si hay.
+
+    Returns:
+        tuple: ``(permitido, estado nuevo, segundos hasta la próxima ficha)``.
+    """
+    tokens, updated = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+    if tokens >= 1:
+        return True, (tokens - 1, now), 0.0
+    return False, (tokens, now), (1 - tokens) / refill_per_second
+
+
+local_buckets = LocalBucketStore()
+shared_buckets = SharedBucketStore()
+
+
+class TokenBucketRateThrottle(SimpleRateThrottle):
+    """
+    Throttle de DRF con token bucket: la tasa ``"N/periodo"`` de ``DEFAULT_THROTTLE_RATES`` permite
+    ráfagas de hasta N peticiones y recarga N fichas por periodo. A diferencia de ``SimpleRateThrottle``
+    no guarda el historial de peticiones, solo dos números por llave.
+
+    El estado vive en la memoria del proceso o, con ``AUTH_LOGIN_THROTTLE_SHARED``, en el caché compartido.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        store = shared_buckets if settings.AUTH_LOGIN_THROTTLE_SHARED else local_buckets
+        allowed, self._wait = store.consume(self.key, self.num_requests, self.num_requests / self.duration, self.timer())
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class LoginIPRateThrottle(TokenBucketRateThrottle):
+    """
+    Intentos de inicio de sesión por dirección IP (``login_ip``).
+    """
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginEmailRateThrottle(TokenBucketRateThrottle):
+    """
+    Intentos de inicio de sesión por email (``login_email``), sin importar desde qué IP llegan.
+    """
+    scope = 'login_email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # El email va como hash: largo fijo y válido como llave de cualquier backend de caché.
+        ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
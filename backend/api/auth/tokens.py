@@ -0,0 +1,17 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .blacklist import token_blacklist
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Refresh token de simplejwt que consulta la lista negra a través de ``token_blacklist``
+    (filtro de Bloom del proceso y caché compartido) en lugar de hacer un SELECT en cada uso.
+    """
+
+    def check_blacklist(self):
+        if token_blacklist.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
@@ -6,8 +6,10 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
-from .serializers import LoginSerializer, LogoutSerializer, TokenRefreshSerializer
+from .serializers import LoginSerializer, LogoutSerializer, TokenRefreshSerializer, CachedBlacklistTokenRefreshSerializer
+from .passwords import PasswordVerifierBusy
 from .services import AuthService
+from .throttling import LoginEmailRateThrottle, LoginIPRateThrottle
 from django.core.exceptions import ObjectDoesNotExist
 
 
@@ -18,6 +20,7 @@ class LoginView(APIView):
     """
 
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPRateThrottle, LoginEmailRateThrottle]
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -44,6 +47,8 @@ class LoginView(APIView):
             400: openapi.Response(description="Datos inválidos o faltantes"),
             401: openapi.Response(description="Credenciales incorrectas"),
             403: openapi.Response(description="Cuenta desactivada"),
+            429: openapi.Response(description="Demasiados intentos desde esta IP o para este email, reintentar tras Retry-After"),
+            503: openapi.Response(description="Demasiados inicios de sesión en curso, reintentar tras Retry-After"),
             500: openapi.Response(description="Error interno en el servidor"),
         },
     )
@@ -63,6 +68,12 @@ class LoginView(APIView):
             return Response({"status":"error", "message": f"Credenciales invalidas"}, status=status.HTTP_401_UNAUTHORIZED)
         except ValueError:
             return Response({"status":"error", "message": f"No se puede autenticar con las credenciales proporcionadas o la cuenta ha sido desactivada"}, status=status.HTTP_403_FORBIDDEN)
+        except PasswordVerifierBusy as e:
+            return Response(
+                {"status":"error", "message": str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(e.retry_after)},
+            )
         except Exception as e:
             return Response({"status":"error", "message": f"Ha ocurrido un error inesperado"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -138,6 +149,7 @@ class CustomTokenRefreshView(TokenRefreshView):
     Permite obtener un nuevo access token a partir de un refresh token válido.
     Endpoint: /auth/refresh/token
     """
+    serializer_class = CachedBlacklistTokenRefreshSerializer
     @swagger_auto_schema(
         operation_summary="Actualizar token de acceso",
         operation_description=(
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+
+class ProductListCache:
+    """
+    Caché de lectura (read-through) para las páginas del listado de productos.
+
+    Las llaves combinan los filtros normalizados con una versión del catálogo. Cualquier
+    escritura en productos incrementa la versión, con lo que todas las páginas guardadas
+    quedan obsoletas en O(1), sin recorrer ni borrar llaves; las entradas viejas expiran solas.
+    """
+
+    VERSION_KEY = 'products:catalog_version'
+    HITS_KEY = 'products:list_cache:hits'
+    MISSES_KEY = 'products:list_cache:misses'
+
+    def __init__(self, backend=None, timeout=None):
+        self.backend = backend or cache
+        self.timeout = settings.PRODUCTS_LIST_CACHE_TIMEOUT if timeout is None else timeout
+
+    def get_version(self) -> int:
+        version = self.backend.get(self.VERSION_KEY)
+        if version is None:
+            # Si la versión se perdió (expulsión o reinicio) se parte de un valor nuevo basado en
+            # el tiempo, para no reutilizar una versión que pudiera tener páginas viejas guardadas.
+            self.backend.add(self.VERSION_KEY, time.time_ns(), timeout=None)
+            version = self.backend.get(self.VERSION_KEY, 0)
+        return version
+
+    def bump_version(self):
+        """
+        Invalida todas las páginas guardadas incrementando la versión del catálogo.
+        """
+        try:
+            self.backend.incr(self.VERSION_KEY)
+        except ValueError:
+            self.backend.add(self.VERSION_KEY, time.time_ns(), timeout=None)
+
+    def make_key(self, params: dict) -> str:
+        payload = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha1(payload.encode()).hexdigest()
+        return f'products:list:{self.get_version()}:{digest}'
+
+    def get_or_set(self, params: dict, loader):
+        """
+        Devuelve la página guardada para los parámetros o la obtiene con ``loader`` y la guarda.
+        """
+        key, page = self._lookup(params)
+        if page is not None:
+            return page
+
+        page = loader()
+        self.backend.set(key, page, timeout=self.timeout)
+        return page
+
+    async def aget_or_set(self, params: dict, loader):
+        """
+        Versión asíncrona de ``get_or_set``; ``loader`` es una corrutina.
+
+        Los métodos ``a*`` del caché de Django solo pasan la llamada a un hilo, así que la lectura
+        (versión, página y contador) se hace completa en un solo salto en lugar de uno por operación.
+        """
+        key, page = await sync_to_async(self._lookup)(params)
+        if page is not None:
+            return page
+
+        page = await loader()
+        await self.backend.aset(key, page, timeout=self.timeout)
+        return page
+
+    def _lookup(self, params: dict):
+        key = self.make_key(params)
+        page = self.backend.get(key)
+        self._count(self.HITS_KEY if page is not None else self.MISSES_KEY)
+        return key, page
+
+    def stats(self) -> dict:
+        hits = self.backend.get(self.HITS_KEY, 0)
+        misses = self.backend.get(self.MISSES_KEY, 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+            'version': self.backend.get(self.VERSION_KEY),
+        }
+
+    def reset_stats(self):
+        self.backend.delete_many([self.HITS_KEY, self.MISSES_KEY])
+
+    def _count(self, key):
+        try:
+            self.backend.incr(key)
+        except ValueError:
+            if not self.backend.add(key, 1, timeout=None):
+                self.backend.incr(key)
@@ -0,0 +1,106 @@
+"""
+Feed de cambios del catálogo (``/api/products/changes/``).
+
+Los clientes que replican el catálogo piden solo lo que cambió desde su último cursor: los
+productos ordenados por ``(last_update, id)`` y las bajas registradas en ``ProductTombstone``
+ordenadas por ``(deleted_at, id)``. Las dos secuencias se mezclan por fecha y el cursor guarda
+la posición alcanzada en cada una, así que cada sincronización cuesta O(cambios).
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import NamedTuple
+
+from .pagination import InvalidCursor, KeysetPagination
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Posición inicial de cada secuencia (antes de cualquier cambio).
+START = (EPOCH, 0)
+
+
+class ExpiredCursor(InvalidCursor):
+    """
+    El cursor es anterior a la retención de bajas: pudo perder eliminaciones y el cliente
+    debe volver a sincronizar el catálogo completo.
+    """
+
+
+class ChangesPage(NamedTuple):
+    """
+    Cambios de una página (en orden) y el cursor para continuar; ``next_cursor`` siempre existe,
+    con ``has_more`` en False indica desde dónde pedir la próxima sincronización.
+    """
+    changes: list
+    next_cursor: str
+    has_more: bool
+
+
+def _to_micros(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+def encode_cursor(products_position, deletes_position) -> str:
+    return KeysetPagination.encode_cursor({
+        'p': [_to_micros(products_position[0]), products_position[1]],
+        'd': [_to_micros(deletes_position[0]), deletes_position[1]],
+    })
+
+
+def decode_cursor(cursor: str):
+    """
+    Devuelve las posiciones ``(fecha, id)`` de productos y bajas.
+
+    Raises:
+        InvalidCursor: Si el cursor no tiene el formato esperado.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        positions = [position['p'], position['d']]
+        if not all(
+            isinstance(item, list) and len(item) == 2 and all(type(value) is int for value in item)
+            for item in positions
+        ):
+            raise ValueError
+        return tuple((_from_micros(micros), pk) for micros, pk in positions)
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError, OverflowError):
+        raise InvalidCursor(f"El cursor {cursor} no es válido")
+
+
+def merge_changes(products, tombstones, page_size, products_after, deletes_after, until) -> ChangesPage:
+    """
+    Mezcla por fecha los productos y las bajas leídos (hasta ``page_size + 1`` de cada uno) y arma la página.
+
+    Una secuencia que se entregó completa avanza hasta ``until``: todo lo anterior ya se informó,
+    así su posición no se queda atrás (ni vence) mientras no tenga cambios.
+    """
+    events = sorted(
+        [(product.last_update, 0, product.id, product) for product in products]
+        + [(deleted_at, 1, pk, product_id) for deleted_at, pk, product_id in tombstones],
+        key=lambda event: event[:3],
+    )
+    has_more = len(events) > page_size
+    events = events[:page_size]
+
+    changes = []
+    positions = {0: products_after, 1: deletes_after}
+    consumed = {0: 0, 1: 0}
+    for at, kind, pk, item in events:
+        positions[kind] = (at, pk)
+        consumed[kind] += 1
+        if kind == 0:
+            changes.append({'op': 'upsert', 'id': item.id, 'at': at, 'data': item})
+        else:
+            changes.append({'op': 'delete', 'id': item, 'at': at, 'data': None})
+
+    for kind, fetched in ((0, products), (1, tombstones)):
+        if len(fetched) <= page_size and consumed[kind] == len(fetched):
+            positions[kind] = (until, 0)
+
+    return ChangesPage(changes, encode_cursor(positions[0], positions[1]), has_more)
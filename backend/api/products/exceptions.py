@@ -0,0 +1,11 @@
+class InsufficientStock(Exception):
+    """
+    Se lanza cuando un producto no tiene stock suficiente para cubrir una reservación.
+    """
+
+    def __init__(self, product_id, requested):
+        self.product_id = product_id
+        self.requested = requested
+        super().__init__(
+            f"El producto con ID {product_id} no tiene stock suficiente para reservar {requested} unidades"
+        )
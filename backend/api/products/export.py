@@ -0,0 +1,53 @@
+import csv
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import ProductSerializer
+
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class _EchoBuffer:
+    """
+    Objeto tipo archivo que devuelve lo escrito en lugar de guardarlo, para que
+    ``csv.writer`` produzca cada línea sin acumularlas en memoria.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_ndjson(rows):
+    encoder = JSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def iter_csv(rows):
+    writer = csv.writer(_EchoBuffer())
+    fields = ProductSerializer.Meta.fields
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def export_rows(queryset, export_format, chunk_size):
+    """
+    Genera el catálogo serializado línea por línea.
+
+    Las filas se leen con ``iterator(chunk_size)`` y se serializan una a la vez con la misma
+    representación del API, de modo que la memoria usada no depende del tamaño de la tabla.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Formato de exportación no soportado: {export_format}')
+
+    serializer = ProductSerializer()
+    rows = (serializer.to_representation(product) for product in queryset.iterator(chunk_size=chunk_size))
+
+    if export_format == 'csv':
+        return iter_csv(rows)
+    return iter_ndjson(rows)
@@ -0,0 +1,203 @@
+import csv
+import itertools
+import json
+import os
+import time
+
+from django.db import connections, transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import empty
+
+from .models import Product
+from .repository import ProductRepository
+from .serializers import ProductSerializer
+
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+class ImportAborted(Exception):
+    """
+    Se alcanzó el máximo de filas inválidas permitido.
+    """
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    return 'csv'
+
+
+def read_rows(path, import_format, skip=0):
+    """
+    Lee el archivo como flujo y genera ``(posición, fila)`` a partir de la fila ``skip``.
+    La posición es el número de fila de datos (sin contar el encabezado del CSV), empezando en 1.
+    """
+    with open(path, encoding='utf-8', newline='') as source:
+        if import_format == 'csv':
+            rows = csv.DictReader(source)
+        else:
+            # Las líneas ya procesadas se saltan sin decodificarlas.
+            rows = (line for line in source if line.strip())
+
+        for position, row in enumerate(itertools.islice(rows, skip, None), start=skip + 1):
+            if import_format == 'ndjson':
+                try:
+                    row = json.loads(row)
+                except json.JSONDecodeError as e:
+                    row = e
+            yield position, row
+
+
+class ProductRowValidator:
+    """
+    Valida filas con las reglas de ``ProductSerializer`` reutilizando una sola instancia,
+    en lugar de construir un serializer (y sus campos) por cada fila.
+    """
+
+    def __init__(self):
+        self.serializer = ProductSerializer()
+        self.optional_fields = [
+            name for name, field in self.serializer.fields.items()
+            if not field.read_only and field.default is not empty
+        ]
+
+    def validate(self, row):
+        """
+        Los campos con valor por defecto (``activo``) que la fila no trae no se incluyen: al insertar
+        se usa el valor por defecto del modelo y en upsert se conserva el valor guardado.
+
+        Returns:
+            dict: Los datos validados, con ``id`` si la fila lo trae.
+
+        Raises:
+            ValidationError: Si la fila no cumple las reglas del serializer.
+        """
+        if not isinstance(row, dict):
+            raise ValidationError({'non_field_errors': ['La línea no es un objeto JSON válido']})
+
+        data = dict(self.serializer.run_validation(row))
+        for field in self.optional_fields:
+            if field not in row:
+                data.pop(field, None)
+        pk = row.get('id')
+        if pk not in (None, ''):
+            try:
+                data['id'] = int(pk)
+            except (TypeError, ValueError):
+                raise ValidationError({'id': ['Debe ser un número entero']})
+            if data['id'] < 1:
+                raise ValidationError({'id': ['Debe ser mayor que cero']})
+        return data
+
+
+class Checkpoint:
+    """
+    Guarda cuántas filas del archivo quedaron confirmadas en la base de datos, para reanudar
+    la importación desde ahí. Se escribe después de cada lote confirmado.
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = os.path.abspath(source)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('source') != self.source:
+            return 0
+        return state['position']
+
+    def save(self, position):
+        # Se escribe en un archivo temporal y se reemplaza para no dejar un checkpoint a medias.
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': self.source, 'position': position}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ProductImporter:
+    """
+    Carga productos por lotes. Cada lote se valida y se escribe en su propia transacción.
+
+    Modos de escritura:
+        - ``copy``: ``COPY ... FROM STDIN`` (solo PostgreSQL, solo inserciones).
+        - ``bulk``: ``bulk_create`` por lotes.
+        - ``upsert``: ``bulk_create`` con ``ON CONFLICT (id) DO UPDATE``.
+    """
+
+    def __init__(self, method='bulk', batch_size=5000, max_errors=100, on_error=None, on_progress=None):
+        self.repository = ProductRepository()
+        self.validator = ProductRowValidator()
+        self.method = method
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.on_error = on_error or (lambda position, errors: None)
+        self.on_progress = on_progress or (lambda stats: None)
+
+        vendor = connections[Product.objects.db].vendor
+        if method == 'copy' and vendor != 'postgresql':
+            raise ValueError('El modo copy solo está disponible en PostgreSQL')
+
+    def run(self, rows, checkpoint=None, start=0):
+        """
+        Importa las filas ``(posición, fila)`` y devuelve las estadísticas finales.
+        """
+        stats = {'position': start, 'imported': 0, 'invalid': 0, 'started': time.perf_counter()}
+        explicit_ids = False
+
+        try:
+            for batch in self._batches(rows):
+                items, batch_ids = [], set()
+                for position, row in batch:
+                    try:
+                        item = self.validator.validate(row)
+                        if self.method == 'upsert' and 'id' in item:
+                            # ON CONFLICT no puede actualizar la misma fila dos veces en una sentencia.
+                            if item['id'] in batch_ids:
+                                raise ValidationError({'id': ['El id ya aparece en una fila anterior del mismo lote']})
+                            batch_ids.add(item['id'])
+                        items.append(item)
+                    except ValidationError as e:
+                        stats['invalid'] += 1
+                        self.on_error(position, e.detail)
+                        if stats['invalid'] > self.max_errors:
+                            raise ImportAborted(f'Se superó el máximo de {self.max_errors} filas inválidas')
+
+                if self.method == 'upsert':
+                    explicit_ids = explicit_ids or any('id' in item for item in items)
+                with transaction.atomic():
+                    stats['imported'] += self._write(items)
+
+                stats['position'] = batch[-1][0]
+                if checkpoint:
+                    checkpoint.save(stats['position'])
+                self.on_progress(stats)
+        finally:
+            # También si se interrumpe: los lotes ya confirmados pudieron insertar ids explícitos.
+            if explicit_ids:
+                self.repository.reset_id_sequence()
+        return stats
+
+    def _write(self, items):
+        if self.method == 'upsert':
+            return self.repository.upsert_products(items)
+
+        # Al insertar, los ids del archivo se ignoran y los asigna la base de datos.
+        for item in items:
+            item.pop('id', None)
+        if self.method == 'copy':
+            return self.repository.copy_products(items)
+        return len(self.repository.bulk_create_products(items))
+
+    def _batches(self, rows):
+        iterator = iter(rows)
+        while batch := list(itertools.islice(iterator, self.batch_size)):
+            yield batch
@@ -0,0 +1,88 @@
+import io
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.products.models import Product
+from api.products.seeding import seed_products
+from api.products.serializers import ProductSerializer
+from api.users.models import User
+from api.users.serializers import UserSerializer
+from core.fast_serializers import get_fast_serializer
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's stdlib JSON renderer/parser with the orjson-backed ones on product and user lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[1_000, 10_000, 100_000],
+            help='List sizes to render and parse (default: 1000 10000 100000)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per measurement, the median is reported (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed: the fast classes fall back to stdlib json'))
+
+        largest = max(options['rows'])
+        existing = Product.objects.count()
+        if existing < largest:
+            self.stdout.write(f'Seeding {largest - existing} products...')
+            seed_products(largest - existing, seed=existing)
+
+        targets = [('products', Product, ProductSerializer), ('users', User, UserSerializer)]
+        for name, model, serializer_class in targets:
+            fast = get_fast_serializer(serializer_class)
+            for rows in options['rows']:
+                data = fast.serialize_queryset(model.objects.order_by('id')[:rows])
+                if len(data) < rows:
+                    self.stdout.write(self.style.WARNING(f'{name}: only {len(data)} rows available'))
+
+                stdlib_ms, expected = self.measure(lambda: JSONRenderer().render(data), options['repeat'])
+                fast_ms, body = self.measure(lambda: FastJSONRenderer().render(data), options['repeat'])
+                if body != expected:
+                    raise CommandError(f'{name}: FastJSONRenderer output differs from JSONRenderer')
+
+                parse_stdlib_ms, parsed = self.measure(
+                    lambda: JSONParser().parse(io.BytesIO(body)), options['repeat']
+                )
+                parse_fast_ms, fast_parsed = self.measure(
+                    lambda: FastJSONParser().parse(io.BytesIO(body)), options['repeat']
+                )
+                if fast_parsed != parsed:
+                    raise CommandError(f'{name}: FastJSONParser result differs from JSONParser')
+
+                megabytes = len(body) / 1_000_000
+                self.stdout.write(
+                    f'{name:<9} {len(data):>8} rows  '
+                    f'render {self.throughput(megabytes, stdlib_ms)} -> {self.throughput(megabytes, fast_ms)}  '
+                    f'parse {self.throughput(megabytes, parse_stdlib_ms)} -> {self.throughput(megabytes, parse_fast_ms)}'
+                )
+
+    @staticmethod
+    def throughput(megabytes, ms):
+        return f'{megabytes / (ms / 1000):>7.1f} MB/s'
+
+    @staticmethod
+    def measure(run, repeat):
+        timings = []
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = run()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), result
@@ -0,0 +1,81 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.products.models import Product
+from api.products.seeding import seed_products
+from api.products.services import ProductService
+
+
+DEFAULT_TERMS = ['laptop', 'dell', 'inalámbrico', 'lenovo gamer', 'memoria usb', 'zzzz']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark product name search (substring filter vs ranked ?q= search)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=1_000_000,
+            help='Minimum number of products in the table before measuring (default: 1000000)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Number of timed runs per term and mode (default: 20)'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=50,
+            help='Page size requested on every run (default: 50)'
+        )
+        parser.add_argument(
+            '--term',
+            action='append',
+            dest='terms',
+            help='Search term to measure; can be repeated (default: a built-in list)'
+        )
+
+    def handle(self, *args, **options):
+        target = options['products']
+        repeat = options['repeat']
+        page_size = options['page_size']
+        terms = options['terms'] or DEFAULT_TERMS
+
+        existing = Product.objects.count()
+        if existing < target:
+            self.stdout.write(f'Seeding {target - existing} products...')
+            started = time.perf_counter()
+            seed_products(target - existing, seed=existing)
+            self.stdout.write(f'Seeded in {time.perf_counter() - started:.1f}s')
+            if connection.vendor in ('postgresql', 'sqlite'):
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+        service = ProductService()
+        self.stdout.write(
+            f'{connection.vendor}: {Product.objects.count()} products, '
+            f'{repeat} runs per term, page_size={page_size}'
+        )
+        self.stdout.write(f"{'term':<16} {'mode':<10} {'p50 ms':>9} {'p95 ms':>9} {'rows':>6}")
+
+        for term in terms:
+            for mode, filters in (('substring', {'nombre': term}), ('ranked', {'q': term})):
+                timings = []
+                rows = 0
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    page = service.get_products_page(filters, page_size=page_size)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    rows = len(page.results)
+
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f'{term:<16} {mode:<10} {statistics.median(timings):>9.2f} {p95:>9.2f} {rows:>6}'
+                )
@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.products.models import Product
+from api.products.seeding import seed_products
+from api.products.serializers import ProductSerializer
+from api.users.models import User
+from api.users.seeding import seed_users
+from api.users.serializers import UserSerializer
+from core.fast_serializers import get_fast_serializer
+
+
+TARGETS = {
+    'products': (Product, ProductSerializer, lambda count, existing: seed_products(count, seed=existing)),
+    'users': (User, UserSerializer, lambda count, existing: seed_users(count, offset=existing)),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF serializers against the fast values_list serializer, checking the rendered JSON is identical'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[10_000, 100_000],
+            help='Row counts to serialize (default: 10000 100000)'
+        )
+        parser.add_argument(
+            '--target',
+            choices=[*TARGETS, 'all'],
+            default='all',
+            help='Which serializer to benchmark (default: all)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per measurement, the median is reported (default: 3)'
+        )
+
+    def handle(self, *args, **options):
+        targets = list(TARGETS) if options['target'] == 'all' else [options['target']]
+        renderer = JSONRenderer()
+
+        for name in targets:
+            model, serializer_class, seed = TARGETS[name]
+            fast = get_fast_serializer(serializer_class)
+
+            largest = max(options['rows'])
+            existing = model.objects.count()
+            if existing < largest:
+                self.stdout.write(f'Seeding {largest - existing} {name}...')
+                seed(largest - existing, existing)
+
+            for rows in options['rows']:
+                queryset = model.objects.order_by('id')[:rows]
+
+                drf_ms, drf_body = self.measure(
+                    lambda: renderer.render(serializer_class(queryset, many=True).data), options['repeat']
+                )
+                fast_ms, fast_body = self.measure(
+                    lambda: renderer.render(fast.serialize_queryset(queryset)), options['repeat']
+                )
+                if fast_body != drf_body:
+                    raise CommandError(f'{name}: the fast serializer output differs from {serializer_class.__name__}')
+
+                self.stdout.write(
+                    f'{name:<9} {rows:>8} rows  drf {drf_ms:>9.1f} ms  fast {fast_ms:>9.1f} ms  '
+                    f'x{drf_ms / fast_ms:.1f}  ({len(fast_body)} identical bytes)'
+                )
+
+    @staticmethod
+    def measure(run, repeat):
+        timings = []
+        body = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = run()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), body
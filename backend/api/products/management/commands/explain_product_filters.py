@@ -0,0 +1,128 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.products.models import Product
+from api.products.repository import ProductRepository
+from api.products.seeding import seed_products
+
+
+FILTER_COMBINATIONS = [
+    ('no filters', {}),
+    ('activo=true', {'activo': 'true'}),
+    ('activo=false', {'activo': 'false'}),
+    ('precio range', {'precio_min': '100', 'precio_max': '500'}),
+    ('activo + precio range', {'activo': 'true', 'precio_min': '100', 'precio_max': '500'}),
+    ('activo + precio_max', {'activo': 'true', 'precio_max': '500'}),
+    ('stock', {'stock': '10'}),
+    ('activo + stock', {'activo': 'true', 'stock': '10'}),
+    ('nombre', {'nombre': 'laptop'}),
+    ('q', {'q': 'laptop'}),
+]
+
+# Recorrido secuencial de toda la tabla.
+FULL_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on products_product\b'),
+    'sqlite': re.compile(r'\bSCAN products_product(?!\w)(?! USING)'),
+}
+
+# Recorrido en orden de llave primaria: se detiene al completar la página (LIMIT),
+# pero cuanto más selectivo es el filtro más filas lee antes de llenarla.
+PK_WALK_PATTERNS = {
+    'postgresql': re.compile(r'Index Scan using products_product_pkey on products_product[^\n]*\n\s+Filter:'),
+    'sqlite': re.compile(r'\bSCAN products_product(?!\w)(?! USING)(?![\s\S]*TEMP B-TREE FOR ORDER BY)'),
+}
+
+INDEX_PATTERNS = {
+    'postgresql': re.compile(r'Index(?: Only)? Scan(?: Backward)? using (\w+)|Bitmap Index Scan on (\w+)'),
+    'sqlite': re.compile(r'USING (?:COVERING |INTEGER PRIMARY KEY)?(?:INDEX )?(\w+)?'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Seed products and EXPLAIN every product list filter combination, reporting full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=100_000,
+            help='Minimum number of products in the table before explaining (default: 100000)'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=50,
+            help='Page size used for the explained queries (default: 50)'
+        )
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help='Exit with an error when any combination still scans the whole table'
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in FULL_SCAN_PATTERNS:
+            raise CommandError(f'EXPLAIN analysis is not supported for the "{vendor}" backend')
+
+        target = options['products']
+        page_size = options['page_size']
+
+        existing = Product.objects.count()
+        if existing < target:
+            self.stdout.write(f'Seeding {target - existing} products...')
+            seed_products(target - existing, seed=existing)
+
+        # Estadísticas actualizadas para que el planificador elija como lo haría en producción.
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        repository = ProductRepository()
+        full_scans = []
+        pk_walks = []
+
+        for name, filters in FILTER_COMBINATIONS:
+            queryset = repository.get_all_products(filters)[:page_size + 1]
+
+            started = time.perf_counter()
+            if vendor == 'postgresql':
+                plan = queryset.explain(analyze=True, buffers=True)
+            else:
+                plan = queryset.explain()
+            elapsed = (time.perf_counter() - started) * 1000
+
+            indexes = sorted({
+                index for match in INDEX_PATTERNS[vendor].finditer(plan)
+                for index in match.groups() if index
+            })
+            if PK_WALK_PATTERNS[vendor].search(plan):
+                verdict = self.style.WARNING('pk walk  ')
+                pk_walks.append(name)
+            elif FULL_SCAN_PATTERNS[vendor].search(plan):
+                verdict = self.style.ERROR('FULL SCAN')
+                full_scans.append(name)
+            else:
+                verdict = self.style.SUCCESS('indexed  ')
+
+            self.stdout.write(
+                f"{name:<24} {verdict} {elapsed:>9.2f} ms  {', '.join(indexes) or '-'}"
+            )
+            if options['verbosity'] > 1:
+                self.stdout.write(plan + '\n')
+
+        if pk_walks:
+            self.stdout.write(self.style.WARNING(
+                f"{len(pk_walks)} filter combination(s) walk the primary key until the page is full "
+                f"(cost grows as the filter gets more selective): {', '.join(pk_walks)}"
+            ))
+
+        if full_scans:
+            message = f"{len(full_scans)} filter combination(s) scan the whole table: {', '.join(full_scans)}"
+            if options['fail_on_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No filter combination scans the whole table'))
@@ -0,0 +1,56 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.products.export import EXPORT_FORMATS
+from api.products.services import ProductService
+
+
+FILTER_OPTIONS = ['nombre', 'q', 'activo', 'precio_min', 'precio_max', 'stock']
+
+
+class Command(BaseCommand):
+    help = 'Stream the product catalog as NDJSON or CSV, applying the same filters as the list endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=list(EXPORT_FORMATS),
+            default='ndjson',
+            help='Output format (default: ndjson)'
+        )
+        parser.add_argument(
+            '--output',
+            '-o',
+            help='File to write to (default: stdout)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help='Rows fetched from the database per batch (default: PRODUCTS_EXPORT_CHUNK_SIZE)'
+        )
+        for name in FILTER_OPTIONS:
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name, help=f'Filter by {name}')
+
+    def handle(self, *args, **options):
+        filters = {name: options[name] for name in FILTER_OPTIONS if options[name] is not None}
+        rows = ProductService().export_products(filters, options['format'], options['chunk_size'])
+
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        started = time.perf_counter()
+        lines = 0
+        try:
+            for line in rows:
+                output.write(line)
+                lines += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        if options['output']:
+            elapsed = time.perf_counter() - started
+            rows_written = lines - 1 if options['format'] == 'csv' else lines
+            self.stderr.write(self.style.SUCCESS(
+                f"Exported {rows_written} products to {options['output']} in {elapsed:.1f}s"
+            ))
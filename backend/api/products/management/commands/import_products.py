@@ -0,0 +1,99 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.products.importing import (
+    IMPORT_FORMATS,
+    Checkpoint,
+    ImportAborted,
+    ProductImporter,
+    detect_format,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = 'Import products from a CSV or NDJSON file in validated batches, with upsert and resumable checkpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with header) or NDJSON file to import')
+        parser.add_argument(
+            '--format',
+            choices=IMPORT_FORMATS,
+            help='Input format (default: detected from the file extension, csv otherwise)'
+        )
+        parser.add_argument(
+            '--method',
+            choices=['auto', 'copy', 'bulk'],
+            default='auto',
+            help='Insert method: COPY (PostgreSQL only) or batched bulk_create (default: copy on PostgreSQL)'
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Update products whose id already exists instead of inserting new rows'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows validated and written per transaction (default: 5000)'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file (default: <path>.checkpoint)'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Skip the rows already committed according to the checkpoint file'
+        )
+        parser.add_argument(
+            '--max-errors',
+            type=int,
+            default=100,
+            help='Abort after this many invalid rows (default: 100)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or detect_format(path)
+
+        if options['upsert']:
+            method = 'upsert'
+        elif options['method'] == 'auto':
+            method = 'copy' if connection.vendor == 'postgresql' else 'bulk'
+        else:
+            method = options['method']
+
+        checkpoint = Checkpoint(options['checkpoint'] or f'{path}.checkpoint', path)
+        start = checkpoint.load() if options['resume'] else 0
+        if start:
+            self.stdout.write(f'Resuming after row {start}')
+
+        try:
+            importer = ProductImporter(
+                method=method,
+                batch_size=options['batch_size'],
+                max_errors=options['max_errors'],
+                on_error=self.report_error,
+                on_progress=self.report_progress,
+            )
+            stats = importer.run(read_rows(path, import_format, skip=start), checkpoint=checkpoint, start=start)
+        except (ImportAborted, ValueError, OSError) as e:
+            raise CommandError(f'{e} (the checkpoint keeps the last committed row, use --resume to continue)')
+
+        checkpoint.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['imported']} products ({stats['invalid']} invalid rows skipped) using {method}"
+        ))
+
+    def report_error(self, position, errors):
+        self.stderr.write(f'row {position}: {json.dumps(errors, ensure_ascii=False, default=str)}')
+
+    def report_progress(self, stats):
+        elapsed = time.perf_counter() - stats['started']
+        rate = stats['imported'] / elapsed if elapsed else 0
+        self.stdout.write(f"row {stats['position']:>10}  imported {stats['imported']:>10}  {rate:>10,.0f} rows/s")
@@ -0,0 +1,219 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.products.models import Product
+from api.users.models import User
+from core.loadtest import build_requests, run_load
+
+
+# Rutas síncronas y su variante asíncrona por endpoint ({id} se reemplaza por ids existentes).
+ENDPOINTS = {
+    'products-list': ('/api/products/?page_size=50', '/api/products/async/?page_size=50'),
+    'products-detail': ('/api/products/{id}/', '/api/products/async/{id}/'),
+    'users-list': ('/api/users/?edad=30', '/api/users/async/?edad=30'),
+    'users-detail': ('/api/users/{id}/', '/api/users/async/{id}/'),
+}
+
+# Escenarios con --serve: servidor y variante de las vistas.
+SCENARIOS = {
+    'wsgi': ('gunicorn', 'sync'),
+    'asgi-sync': ('uvicorn', 'sync'),
+    'asgi-async': ('uvicorn', 'async'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the read endpoints and report requests/sec and latency percentiles, comparing '
+        'gunicorn (WSGI) against uvicorn (ASGI) with the sync and async views'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--serve',
+            action='store_true',
+            help='Start gunicorn and uvicorn on local ports and run every scenario against them'
+        )
+        parser.add_argument(
+            '--target',
+            action='append',
+            default=[],
+            metavar='NAME=URL[@async]',
+            help='Existing deployment to test, e.g. wsgi=http://127.0.0.1:8000; add @async to hit the async routes'
+        )
+        parser.add_argument(
+            '--scenario',
+            nargs='+',
+            choices=SCENARIOS,
+            default=list(SCENARIOS),
+            help='Scenarios to run with --serve (default: all)'
+        )
+        parser.add_argument(
+            '--endpoint',
+            nargs='+',
+            choices=ENDPOINTS,
+            default=['products-list', 'products-detail'],
+            help='Endpoints to load (default: products-list products-detail)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            nargs='+',
+            default=[64, 256],
+            help='Open connections per run (default: 64 256)'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10.0,
+            help='Measured seconds per run (default: 10)'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=float,
+            default=2.0,
+            help='Seconds of load before measuring (default: 2)'
+        )
+        parser.add_argument(
+            '--client-processes',
+            type=int,
+            default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+            help='Processes generating load (default: half the CPUs, at most 4)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Server worker processes with --serve (default: 2)'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Threads per gunicorn worker with --serve (default: 8)'
+        )
+        parser.add_argument(
+            '--username',
+            default='demo',
+            help='User the access token is issued for (default: demo)'
+        )
+
+    def handle(self, *args, **options):
+        if not options['serve'] and not options['target']:
+            raise CommandError('Pass --serve to start the servers or at least one --target')
+
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} not found, create it with create_demo_user or pass --username")
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}', 'Accept': 'application/json'}
+        ids = {
+            'products': list(Product.objects.order_by('id').values_list('id', flat=True)[:1000]),
+            'users': list(User.objects.order_by('id').values_list('id', flat=True)[:1000]),
+        }
+
+        targets = [self.parse_target(target) for target in options['target']]
+        if settings.DEBUG:
+            self.stderr.write('DEBUG is on: every query is recorded, numbers will be lower than in production')
+
+        self.stdout.write(f"{'scenario':<12} {'endpoint':<16} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for name, host, port, variant in targets:
+            self.run_scenario(name, host, port, variant, headers, ids, options)
+
+        if options['serve']:
+            for name in options['scenario']:
+                server, variant = SCENARIOS[name]
+                port = self.free_port()
+                process = self.start_server(server, port, options)
+                try:
+                    self.wait_until_ready(port, process)
+                    self.run_scenario(name, '127.0.0.1', port, variant, headers, ids, options)
+                finally:
+                    process.terminate()
+                    process.wait(timeout=30)
+
+    def run_scenario(self, name, host, port, variant, headers, ids, options):
+        for endpoint in options['endpoint']:
+            sync_path, async_path = ENDPOINTS[endpoint]
+            path = async_path if variant == 'async' else sync_path
+            if '{id}' in path:
+                sample = ids[endpoint.split('-')[0]]
+                if not sample:
+                    raise CommandError(f'{endpoint} needs existing rows, seed the database first')
+                paths = [path.format(id=pk) for pk in sample]
+            else:
+                paths = [path]
+
+            requests = build_requests(host, port, paths, headers)
+            for concurrency in options['concurrency']:
+                result = run_load(
+                    host, port, requests, concurrency,
+                    duration=options['duration'],
+                    warmup=options['warmup'],
+                    processes=options['client_processes'],
+                )
+                self.stdout.write(
+                    f'{name:<12} {endpoint:<16} {concurrency:>5} {result.rps:>9.0f} '
+                    f'{result.percentile(50):>8.1f} {result.percentile(99):>8.1f} {result.errors:>7}'
+                )
+
+    @staticmethod
+    def parse_target(value):
+        name, sep, url = value.partition('=')
+        if not sep:
+            raise CommandError(f'Invalid --target {value}, expected NAME=URL')
+        url, _, variant = url.partition('@')
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise CommandError(f'Invalid --target URL {url}, only http:// is supported')
+        return name, parts.hostname, parts.port or 80, variant or 'sync'
+
+    @staticmethod
+    def free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def start_server(self, server, port, options):
+        if server == 'gunicorn':
+            command = [
+                sys.executable, '-m', 'gunicorn', 'core.wsgi:application',
+                '--bind', f'127.0.0.1:{port}',
+                '--workers', str(options['workers']),
+                '--threads', str(options['threads']),
+                '--log-level', 'warning',
+            ]
+        else:
+            command = [
+                sys.executable, '-m', 'uvicorn', 'core.asgi:application',
+                '--host', '127.0.0.1',
+                '--port', str(port),
+                '--workers', str(options['workers']),
+                '--log-level', 'warning',
+                '--no-access-log',
+            ]
+        try:
+            return subprocess.Popen(command, cwd=settings.BASE_DIR)
+        except OSError as e:
+            raise CommandError(f'Could not start {server}: {e}')
+
+    @staticmethod
+    def wait_until_ready(port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'The server exited with code {process.returncode} (is it installed?)')
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'The server did not start listening on port {port}')
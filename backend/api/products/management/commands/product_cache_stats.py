@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from api.products.cache import ProductListCache
+
+
+class Command(BaseCommand):
+    help = 'Show the product list cache hit/miss counters and the current catalog version'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the hit/miss counters after printing them'
+        )
+
+    def handle(self, *args, **options):
+        list_cache = ProductListCache()
+        stats = list_cache.stats()
+
+        self.stdout.write(f"hits:     {stats['hits']}")
+        self.stdout.write(f"misses:   {stats['misses']}")
+        self.stdout.write(f"hit rate: {stats['hit_rate']:.1%}")
+        self.stdout.write(f"version:  {stats['version']}")
+
+        if options['reset']:
+            list_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.products.repository import ProductRepository
+
+
+class Command(BaseCommand):
+    help = 'Delete product tombstones older than the retention period used by the changes feed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.PRODUCTS_TOMBSTONE_RETENTION_DAYS,
+            help='Keep tombstones from the last N days (default: PRODUCTS_TOMBSTONE_RETENTION_DAYS)'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted = ProductRepository().prune_tombstones(cutoff)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones older than {cutoff:%Y-%m-%d %H:%M}'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.products.stats import PRICE_BUCKET_EDGES, rebuild_buckets
+
+
+class Command(BaseCommand):
+    help = 'Recompute the inventory stats summary from the products table and fix any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report the drift and exit with an error if there is any, without fixing it'
+        )
+
+    def handle(self, *args, **options):
+        drift = rebuild_buckets(fix=not options['check'])
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('No drift'))
+            return
+
+        for (activo, bucket), values in sorted(drift.items()):
+            lower = PRICE_BUCKET_EDGES[bucket] if bucket < len(PRICE_BUCKET_EDGES) else f'bucket {bucket}'
+            label = f"{'active' if activo else 'inactive'} >= {lower}"
+            expected, found = values['esperado'], values['encontrado']
+            self.stdout.write(
+                f'{label:<20} products {found[0]} -> {expected[0]}  stock {found[1]} -> {expected[1]}  '
+                f'value {found[2]} -> {expected[2]}'
+            )
+
+        if options['check']:
+            raise CommandError(f'{len(drift)} summary buckets drifted')
+        self.stdout.write(self.style.SUCCESS(f'Fixed {len(drift)} summary buckets'))
@@ -0,0 +1,75 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+FTS_TABLE = 'products_product_fts'
+
+
+def create_search_index(apps, schema_editor):
+    """
+    PostgreSQL: índice GIN de trigramas sobre UPPER(nombre), que atiende tanto
+    ``nombre__icontains`` como la búsqueda ``?q=``.
+    SQLite: tabla FTS5 con tokenizador trigram sincronizada mediante triggers.
+    """
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS products_product_nombre_trgm '
+            'ON products_product USING gin ((UPPER(nombre::text)) gin_trgm_ops)'
+        )
+
+    elif vendor == 'sqlite':
+        # El tokenizador trigram está disponible a partir de SQLite 3.34.
+        if schema_editor.connection.Database.sqlite_version_info < (3, 34):
+            return
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"nombre, content='products_product', content_rowid='id', tokenize='trigram')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON products_product BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, nombre) VALUES (new.id, new.nombre); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON products_product BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, nombre) VALUES ('delete', old.id, old.nombre); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF nombre ON products_product BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, nombre) VALUES ('delete', old.id, old.nombre); "
+            f"INSERT INTO {FTS_TABLE}(rowid, nombre) VALUES (new.id, new.nombre); END"
+        )
+        schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS products_product_nombre_trgm')
+
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    atomic = False
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
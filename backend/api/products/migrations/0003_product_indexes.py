@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:03
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """
+    En PostgreSQL crea el índice con ``CREATE INDEX CONCURRENTLY``, sin bloquear las escrituras
+    sobre la tabla de productos mientras se construye. En otros motores usa ``AddIndex``.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    atomic = False
+
+    dependencies = [
+        ('products', '0002_product_search_index'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='product',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['precio', 'id'], name='product_activo_precio_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='product',
+            index=models.Index(fields=['precio', 'id'], name='product_precio_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='product',
+            index=models.Index(fields=['activo', 'id'], name='product_activo_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='product',
+            index=models.Index(fields=['stock', 'id'], name='product_stock_idx'),
+        ),
+    ]
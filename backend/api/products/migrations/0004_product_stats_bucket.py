@@ -0,0 +1,80 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:24
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, Sum, Value, When
+
+
+# Copia congelada de los rangos y filas de ``api.products.stats`` al momento de esta migración:
+# la migración no debe cambiar si más adelante se modifican en el código.
+PRICE_BUCKET_EDGES = tuple(Decimal(edge) for edge in ('0', '100', '500', '1000', '5000', '10000', '50000'))
+STATS_SHARDS = 8
+
+
+def build_stats(apps, schema_editor):
+    """
+    Llena el resumen con un solo ``GROUP BY`` sobre los productos: los totales en la fila 0
+    de cada combinación (activo, rango) y el resto de las filas en cero.
+    """
+    Product = apps.get_model('products', 'Product')
+    ProductStatsBucket = apps.get_model('products', 'ProductStatsBucket')
+    alias = schema_editor.connection.alias
+
+    price_bucket = Case(
+        *[
+            When(precio__lt=upper, then=Value(index))
+            for index, upper in enumerate(PRICE_BUCKET_EDGES[1:])
+        ],
+        default=Value(len(PRICE_BUCKET_EDGES) - 1),
+    )
+    valor = ExpressionWrapper(F('precio') * F('stock'), output_field=DecimalField(max_digits=20, decimal_places=2))
+    rows = (
+        Product.objects.using(alias).order_by()
+        .annotate(bucket=price_bucket)
+        .values('activo', 'bucket')
+        .annotate(productos=Count('id'), stock_total=Sum('stock'), valor=Sum(valor))
+    )
+    actual = {
+        (row['activo'], row['bucket']): (row['productos'], row['stock_total'] or 0, row['valor'] or Decimal(0))
+        for row in rows
+    }
+
+    empty = (0, 0, Decimal(0))
+    buckets = []
+    for activo in (True, False):
+        for bucket in range(len(PRICE_BUCKET_EDGES)):
+            for shard in range(STATS_SHARDS):
+                productos, stock, valor = actual.get((activo, bucket), empty) if shard == 0 else empty
+                buckets.append(ProductStatsBucket(
+                    activo=activo, bucket=bucket, shard=shard, productos=productos, stock=stock, valor=valor,
+                ))
+    ProductStatsBucket.objects.using(alias).bulk_create(buckets)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductStatsBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo', models.BooleanField()),
+                ('bucket', models.PositiveSmallIntegerField(verbose_name='Rango de precio')),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('productos', models.BigIntegerField(default=0)),
+                ('stock', models.BigIntegerField(default=0)),
+                ('valor', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='Valor del stock')),
+            ],
+            options={
+                'verbose_name': 'Resumen de inventario',
+                'verbose_name_plural': 'Resumen de inventario',
+                'constraints': [models.UniqueConstraint(fields=('activo', 'bucket', 'shard'), name='product_stats_bucket_unique')],
+            },
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
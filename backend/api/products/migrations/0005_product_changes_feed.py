@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_stats_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.BigIntegerField(verbose_name='ID del producto eliminado')),
+                ('deleted_at', models.DateTimeField(verbose_name='Fecha de eliminación')),
+            ],
+            options={
+                'verbose_name': 'Producto eliminado',
+                'verbose_name_plural': 'Productos eliminados',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['last_update', 'id'], name='product_last_update_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producttombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='product_tombstone_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_changes_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchIndex',
+            fields=[
+                ('product', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='products.product')),
+                ('nombre', models.TextField()),
+            ],
+            options={
+                'db_table': 'products_product_fts',
+                'managed': False,
+            },
+        ),
+    ]
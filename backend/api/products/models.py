@@ -19,4 +19,71 @@ class Product(models.Model):
     class Meta:
         verbose_name = "Producto"
         verbose_name_plural = "Productos"
-        ordering = ['id']
\ No newline at end of file
+        ordering = ['id']
+        # Índices pensados para los filtros de get_all_products, todos terminan en "id"
+        # para que el orden del listado (y el cursor) se resuelva desde el propio índice.
+        indexes = [
+            models.Index(fields=['precio', 'id'], condition=models.Q(activo=True), name='product_activo_precio_idx'),
+            models.Index(fields=['precio', 'id'], name='product_precio_idx'),
+            models.Index(fields=['activo', 'id'], name='product_activo_idx'),
+            models.Index(fields=['stock', 'id'], name='product_stock_idx'),
+            # Orden del feed de cambios (/api/products/changes/).
+            models.Index(fields=['last_update', 'id'], name='product_last_update_idx'),
+        ]
+
+
+class ProductTombstone(models.Model):
+    """
+    Registro de un producto eliminado, para que el feed de cambios pueda informar las bajas.
+    Se guardan durante ``PRODUCTS_TOMBSTONE_RETENTION_DAYS`` días (``prune_product_tombstones``).
+    """
+    product_id = models.BigIntegerField(verbose_name="ID del producto eliminado")
+    deleted_at = models.DateTimeField(verbose_name="Fecha de eliminación")
+
+    class Meta:
+        verbose_name = "Producto eliminado"
+        verbose_name_plural = "Productos eliminados"
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='product_tombstone_idx'),
+        ]
+
+
+class ProductStatsBucket(models.Model):
+    """
+    Fila del resumen del inventario para un estado (activo/inactivo) y un rango de precio.
+
+    Las escrituras de ``ProductRepository`` mantienen estos totales con incrementos dentro de su
+    propia transacción; cada combinación se reparte en varias filas (``shard``) para evitar
+    contención, y el comando ``reconcile_product_stats`` corrige cualquier diferencia.
+    """
+    activo = models.BooleanField()
+    bucket = models.PositiveSmallIntegerField(verbose_name="Rango de precio")
+    shard = models.PositiveSmallIntegerField(default=0)
+    productos = models.BigIntegerField(default=0)
+    stock = models.BigIntegerField(default=0)
+    valor = models.DecimalField(max_digits=20, decimal_places=2, default=0, verbose_name="Valor del stock")
+
+    class Meta:
+        verbose_name = "Resumen de inventario"
+        verbose_name_plural = "Resumen de inventario"
+        constraints = [
+            models.UniqueConstraint(fields=['activo', 'bucket', 'shard'], name='product_stats_bucket_unique'),
+        ]
+
+
+class ProductSearchIndex(models.Model):
+    """
+    Tabla virtual FTS5 ``products_product_fts`` de SQLite (migración 0002), que la mantienen los triggers.
+
+    No la administra Django: el modelo solo permite unirla al listado en la búsqueda ``?q=``
+    (``SQLiteFTSSearchBackend``). En PostgreSQL la tabla no existe y el modelo no se usa.
+    """
+    product = models.OneToOneField(
+        Product, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_index',
+    )
+    nombre = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = 'products_product_fts'
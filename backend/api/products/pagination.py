@@ -0,0 +1,148 @@
+import base64
+import binascii
+import json
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """
+    Se lanza cuando el cursor recibido no se puede decodificar.
+    """
+
+
+class CursorPage(NamedTuple):
+    """
+    Resultado de una página: los registros y el cursor opaco de la siguiente página.
+    """
+    results: list
+    next_cursor: str | None
+
+
+class KeysetPagination:
+    """
+    Paginación por cursor (keyset) sobre el orden del queryset, que siempre termina en ``id``.
+
+    En lugar de usar OFFSET, cada página continúa desde la última posición vista
+    (``WHERE id > ultimo_id ORDER BY id LIMIT n``), por lo que el costo de una
+    página no depende de su profundidad y los registros insertados mientras el
+    cliente recorre el listado no desplazan ni duplican resultados.
+    Con la búsqueda por relevancia el orden es ``(-rank, id)`` y el cursor guarda ambos valores.
+    """
+
+    def __init__(self, page_size=None, max_page_size=None):
+        self.page_size = page_size or settings.PRODUCTS_PAGE_SIZE
+        self.max_page_size = max_page_size or settings.PRODUCTS_MAX_PAGE_SIZE
+
+    def get_page_size(self, page_size=None) -> int:
+        """
+        Normaliza el tamaño de página solicitado; los valores inválidos usan el valor por defecto.
+        """
+        try:
+            page_size = int(page_size)
+        except (TypeError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    @staticmethod
+    def encode_cursor(position: dict) -> str:
+        payload = json.dumps(position, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str, ordering=('id',)) -> dict:
+        """
+        Decodifica un cursor generado por ``encode_cursor`` para el orden indicado.
+
+        Raises:
+            InvalidCursor: Si el cursor no tiene el formato esperado.
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise InvalidCursor(f"El cursor {cursor} no es válido")
+
+        if not isinstance(position, dict) or not isinstance(position.get('id'), int):
+            raise InvalidCursor(f"El cursor {cursor} no es válido")
+
+        for field in ordering:
+            value = position.get(field.lstrip('-'))
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise InvalidCursor(f"El cursor {cursor} no es válido")
+        return position
+
+    @staticmethod
+    def _seek_filter(ordering, position):
+        """
+        Construye la condición "después de la posición" para un orden de varias columnas:
+        ``(a > x) OR (a = x AND b > y) ...`` respetando la dirección de cada columna.
+        """
+        condition = Q()
+        equal = {}
+        for field in ordering:
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': position[name]})
+            equal[name] = position[name]
+        return condition
+
+    def paginate_queryset(self, queryset, cursor=None, page_size=None, values=None) -> CursorPage:
+        """
+        Devuelve la página que sigue al cursor respetando el orden del queryset.
+
+        Se consulta un registro extra para saber si existe una página siguiente
+        sin necesidad de un ``COUNT``. Con ``values`` la página contiene tuplas de
+        esas columnas (``values_list``) en lugar de instancias del modelo.
+        """
+        page_size = self.get_page_size(page_size)
+        queryset, names = self._page_queryset(queryset, cursor, values)
+        rows = list(queryset[:page_size + 1])
+        return self._make_page(rows, names, page_size, values)
+
+    async def apaginate_queryset(self, queryset, cursor=None, page_size=None, values=None) -> CursorPage:
+        """
+        Versión asíncrona de ``paginate_queryset``.
+        """
+        page_size = self.get_page_size(page_size)
+        queryset, names = self._page_queryset(queryset, cursor, values)
+        rows = [row async for row in queryset[:page_size + 1]]
+        return self._make_page(rows, names, page_size, values)
+
+    def _page_queryset(self, queryset, cursor, values):
+        """
+        Aplica el orden, la condición del cursor y, con ``values``, las columnas a leer.
+        """
+        ordering = tuple(queryset.query.order_by) or ('id',)
+        queryset = queryset.order_by(*ordering)
+
+        if cursor:
+            position = self.decode_cursor(cursor, ordering)
+            queryset = queryset.filter(self._seek_filter(ordering, position))
+
+        names = [field.lstrip('-') for field in ordering]
+        if values is not None:
+            # Las columnas del orden se agregan al final de cada tupla para armar el cursor.
+            queryset = queryset.values_list(*values, *names)
+        return queryset, names
+
+    def _make_page(self, rows, names, page_size, values):
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        next_cursor = None
+        if has_next:
+            last = rows[-1]
+            if values is not None:
+                position = dict(zip(names, last[len(values):]))
+            else:
+                position = {name: getattr(last, name) for name in names}
+            next_cursor = self.encode_cursor(position)
+
+        if values is not None:
+            rows = [row[:len(values)] for row in rows]
+        return CursorPage(rows, next_cursor)
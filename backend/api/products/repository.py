@@ -1,59 +1,481 @@
-from django.shortcuts import get_object_or_404
-from .models import Product
+import csv
+import io
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Count, F, Max, Q, sql
+from django.http import Http404
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.utils import timezone
+from .cache import ProductListCache
+from .exceptions import InsufficientStock
+from .models import Product, ProductTombstone
+from .search import get_search_backend
+from .stats import ProductStatsTracker, StatsDelta
+
+# Columnas que afectan el resumen del inventario.
+STATS_FIELDS = ('activo', 'precio', 'stock')
+
+
+def supports_update_returning(connection):
+    """
+    Indica si la base de datos acepta ``UPDATE/DELETE ... RETURNING``. ``can_return_columns_from_insert``
+    solo habla del INSERT (MariaDB lo activa y no tiene ``UPDATE ... RETURNING``); en SQLite ese
+    indicador sí coincide con la versión que agregó RETURNING (3.35).
+    """
+    if connection.vendor == 'postgresql':
+        return True
+    return connection.vendor == 'sqlite' and connection.features.can_return_columns_from_insert
+
 
 class ProductRepository:
     """
     La clase ProductRepository es responsable de todas las operaciones de la base de datos relacionadas con el modelo de Producto.
     """
 
-    def get_all_products(self, filters=None):
-        queryset = Product.objects.all()
-        
-        if filters:
-            if 'nombre' in filters:
-                queryset = queryset.filter(nombre__icontains=filters['nombre'])
+    def __init__(self):
+        self.list_cache = ProductListCache()
+        self.stats = ProductStatsTracker()
 
-            if 'activo' in filters:
-                is_active_val = str(filters.get('activo', '')).lower() in ['true', '1', 'yes']
-                queryset = queryset.filter(activo=is_active_val)
+    @staticmethod
+    def normalize_filters(filters=None):
+        """
+        Convierte los filtros recibidos (query params) en valores tipados.
+        Los filtros con valores inválidos se descartan, igual que al consultar.
+        """
+        normalized = {}
+        if not filters:
+            return normalized
 
-            if 'precio_min' in filters:
-                try:
-                    precio_min_val = float(filters['precio_min'])
-                    queryset = queryset.filter(precio__gte=precio_min_val)
-                except (ValueError, TypeError):
-                    pass
+        if 'nombre' in filters:
+            normalized['nombre'] = filters['nombre']
 
-            if 'precio_max' in filters:
-                try:
-                    precio_max_val = float(filters['precio_max'])
-                    queryset = queryset.filter(precio__lte=precio_max_val)
-                except (ValueError, TypeError):
-                    pass
+        if 'activo' in filters:
+            normalized['activo'] = str(filters.get('activo', '')).lower() in ['true', '1', 'yes']
 
-            if 'stock' in filters:
+        for key in ('precio_min', 'precio_max'):
+            if key in filters:
                 try:
-                    stock_val = int(filters['stock'])
-                    queryset = queryset.filter(stock=stock_val)
+                    normalized[key] = float(filters[key])
                 except (ValueError, TypeError):
                     pass
 
+        if 'stock' in filters:
+            try:
+                normalized['stock'] = int(filters['stock'])
+            except (ValueError, TypeError):
+                pass
+
+        if filters.get('q'):
+            normalized['q'] = filters['q']
+
+        return normalized
+
+    def get_all_products(self, filters=None, only=None):
+        """
+        Devuelve el queryset filtrado y ordenado. Con ``only`` se leen solo esas columnas (y el id).
+        """
+        queryset = Product.objects.all()
+        if only:
+            queryset = queryset.only(*only)
+        filters = self.normalize_filters(filters)
+
+        if 'nombre' in filters:
+            queryset = queryset.filter(nombre__icontains=filters['nombre'])
+
+        if 'activo' in filters:
+            queryset = queryset.filter(activo=filters['activo'])
+
+        if 'precio_min' in filters:
+            queryset = queryset.filter(precio__gte=filters['precio_min'])
+
+        if 'precio_max' in filters:
+            queryset = queryset.filter(precio__lte=filters['precio_max'])
+
+        if 'stock' in filters:
+            queryset = queryset.filter(stock=filters['stock'])
+
+        # Búsqueda ordenada por relevancia, usando el índice de texto del motor de base de datos.
+        if 'q' in filters:
+            queryset = get_search_backend(queryset.db).search(queryset, filters['q'])
+            return queryset.order_by('-rank', 'id')
+
         return queryset.order_by('id')
 
-    def create_product(self, validated_data):
-        return Product.objects.create(**validated_data)
+    async def aget_all_products(self, filters=None, only=None):
+        """
+        Versión para código asíncrono de ``get_all_products``. Armar el queryset no consulta la base
+        de datos, salvo la búsqueda por relevancia en SQLite (revisa si existe la tabla FTS), que se
+        arma en un hilo.
+        """
+        if filters and filters.get('q'):
+            return await sync_to_async(self.get_all_products)(filters, only)
+        return self.get_all_products(filters, only)
+
+    def get_list_state(self, filters=None):
+        """
+        Obtiene ``MAX(last_update)`` y el total del listado filtrado; juntos cambian con
+        cualquier alta, modificación o baja, por lo que sirven como validador del listado.
+        """
+        return self.get_all_products(filters).order_by().aggregate(
+            last_update=Max('last_update'),
+            total=Count('id'),
+        )
 
-    def get_product_by_id(self, product_id):
-        return get_object_or_404(Product, id=product_id)
+    async def aget_list_state(self, filters=None):
+        queryset = await self.aget_all_products(filters)
+        return await queryset.order_by().aaggregate(
+            last_update=Max('last_update'),
+            total=Count('id'),
+        )
 
-    def update_product(self, product, validated_data):
-        product.nombre = validated_data.get('nombre', product.nombre)
-        product.precio = validated_data.get('precio', product.precio)
-        product.stock = validated_data.get('stock', product.stock)
-        product.activo = validated_data.get('activo', product.activo)
+    def catalog_changed(self):
+        """
+        Invalida el caché del listado al confirmarse la transacción en curso (o de inmediato si no hay una).
+        """
+        transaction.on_commit(self.list_cache.bump_version)
 
-        product.save()
+    def stats_delta(self, rows, sign=1):
+        """
+        Cambio del resumen para filas ``(id, activo, precio, stock)``: ``sign=1`` las suma y ``-1`` las resta.
+        """
+        delta = StatsDelta()
+        for product_id, activo, precio, stock in rows:
+            delta.add(activo, precio, stock, sign=sign, product_id=product_id)
+        return delta
+
+    def create_product(self, validated_data):
+        with transaction.atomic():
+            product = Product.objects.create(**validated_data)
+            self.stats.record(self.stats_delta([(product.id, product.activo, product.precio, product.stock)]))
+        self.catalog_changed()
         return product
 
-    def delete_product(self, product):
-        product.delete()
\ No newline at end of file
+    def get_product_by_id(self, product_id, only=None):
+        queryset = Product.objects.only(*only) if only else Product.objects.all()
+        return get_object_or_404(queryset, id=product_id)
+
+    async def aget_product_by_id(self, product_id, only=None):
+        queryset = Product.objects.only(*only) if only else Product.objects.all()
+        return await aget_object_or_404(queryset, id=product_id)
+
+    def update_product(self, product_id, validated_data):
+        """
+        Actualiza solo los campos enviados (y ``last_update``) con un único ``UPDATE ... WHERE id = %s``.
+
+        Si cambia el precio, el stock o el estado, antes se bloquean y leen esos valores para
+        actualizar el resumen del inventario en la misma transacción.
+
+        Raises:
+            Http404: Si el producto no existe.
+        """
+        queryset = Product.objects.filter(id=product_id)
+        with transaction.atomic():
+            old = None
+            if any(field in validated_data for field in STATS_FIELDS):
+                old = queryset.select_for_update().values_list('id', *STATS_FIELDS).first()
+                if old is None:
+                    raise Http404(f"El producto con ID {product_id} no existe")
+
+            updated = queryset.update(**validated_data, last_update=timezone.now())
+            if not updated:
+                raise Http404(f"El producto con ID {product_id} no existe")
+
+            if old is not None:
+                new = (product_id, *(validated_data.get(field, value) for field, value in zip(STATS_FIELDS, old[1:])))
+                self.stats.record(self.stats_delta([old], sign=-1).merge(self.stats_delta([new])))
+        self.catalog_changed()
+
+    def delete_product(self, product_id):
+        """
+        Elimina el producto con un único DELETE, sin leerlo antes.
+
+        Raises:
+            Http404: Si el producto no existe.
+        """
+        with transaction.atomic():
+            deleted = self._delete_returning(Product.objects.filter(id=product_id))
+            if not deleted:
+                raise Http404(f"El producto con ID {product_id} no existe")
+            self.stats.record(self.stats_delta(deleted, sign=-1))
+            self.record_tombstones(row[0] for row in deleted)
+        self.catalog_changed()
+
+    def record_tombstones(self, product_ids):
+        """
+        Registra las bajas para el feed de cambios, en la misma transacción que el DELETE.
+        """
+        now = timezone.now()
+        ProductTombstone.objects.bulk_create(
+            [ProductTombstone(product_id=product_id, deleted_at=now) for product_id in product_ids]
+        )
+
+    def get_changed_products(self, after, until, limit):
+        """
+        Productos con ``(last_update, id)`` posterior a ``after`` y ``last_update`` anterior a ``until``,
+        en ese orden (índice ``product_last_update_idx``).
+        """
+        return list(
+            Product.objects.filter(self._after(('last_update', 'id'), after), last_update__lt=until)
+            .order_by('last_update', 'id')[:limit]
+        )
+
+    def get_tombstones(self, after, until, limit):
+        return list(
+            ProductTombstone.objects.filter(self._after(('deleted_at', 'id'), after), deleted_at__lt=until)
+            .order_by('deleted_at', 'id')
+            .values_list('deleted_at', 'id', 'product_id')[:limit]
+        )
+
+    def prune_tombstones(self, before):
+        deleted, _ = ProductTombstone.objects.filter(deleted_at__lt=before).delete()
+        return deleted
+
+    @staticmethod
+    def _after(fields, position):
+        timestamp_field, id_field = fields
+        timestamp, pk = position
+        return Q(**{f'{timestamp_field}__gt': timestamp}) | Q(**{timestamp_field: timestamp, f'{id_field}__gt': pk})
+
+    def lock_existing_ids(self, product_ids):
+        """
+        Bloquea (en orden de id) los productos indicados y devuelve los ids que existen.
+        Debe llamarse dentro de una transacción.
+        """
+        if not product_ids:
+            return set()
+        queryset = Product.objects.select_for_update().filter(id__in=product_ids).order_by('id')
+        return set(queryset.values_list('id', flat=True))
+
+    def bulk_create_products(self, items):
+        products = Product.objects.bulk_create([Product(**item) for item in items])
+        if products:
+            self.stats.record(self.stats_delta(
+                (product.id, product.activo, product.precio, product.stock) for product in products
+            ))
+            self.catalog_changed()
+        return products
+
+    def upsert_products(self, items):
+        """
+        Inserta los productos y, si ya existe uno con el mismo id, actualiza sus campos
+        (``INSERT ... ON CONFLICT (id) DO UPDATE``). Los elementos sin id siempre se insertan.
+
+        Solo se sobrescriben los campos que trae cada elemento: un elemento sin ``activo`` no cambia
+        el estado de un producto existente. Los ids no deben repetirse entre los elementos.
+        """
+        now = timezone.now()
+        ids = [item['id'] for item in items if 'id' in item]
+        old = {}
+        if ids:
+            rows = Product.objects.select_for_update().filter(id__in=ids).values_list('id', *STATS_FIELDS)
+            old = {product_id: values for product_id, *values in rows}
+        delta = self.stats_delta(((product_id, *values) for product_id, values in old.items()), sign=-1)
+
+        # Cada sentencia actualiza un conjunto fijo de columnas, así que se agrupan por campos enviados.
+        groups = {}
+        for item in items:
+            groups.setdefault(tuple(sorted(field for field in item if field != 'id')), []).append(item)
+
+        written = []
+        for fields, group in groups.items():
+            products = Product.objects.bulk_create(
+                [Product(**item, last_update=now) for item in group],
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=[*fields, 'last_update'],
+            )
+            keeps_activo = 'activo' not in fields
+            written.extend(
+                (product.id, old[product.id][0] if keeps_activo and product.id in old else product.activo,
+                 product.precio, product.stock)
+                for product in products
+            )
+        if written:
+            self.stats.record(delta.merge(self.stats_delta(written)))
+            self.catalog_changed()
+        return len(written)
+
+    def copy_products(self, items):
+        """
+        Inserta los productos con ``COPY ... FROM STDIN`` (solo PostgreSQL), la vía más rápida
+        para cargas grandes: una sola sentencia por lote y sin armar parámetros por fila.
+        """
+        if not items:
+            return 0
+
+        now = timezone.now()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for item in items:
+            writer.writerow([item['nombre'], item['precio'], item['stock'], item.get('activo', True), now, now])
+        buffer.seek(0)
+
+        connection = connections[Product.objects.db]
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(Product._meta.get_field(name).column) for name in (
+            'nombre', 'precio', 'stock', 'activo', 'created_at', 'last_update',
+        ))
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(Product._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)',
+                buffer,
+            )
+        self.stats.record(self.stats_delta(
+            (None, item.get('activo', True), item['precio'], item['stock']) for item in items
+        ))
+        self.catalog_changed()
+        return len(items)
+
+    def reset_id_sequence(self):
+        """
+        Ajusta la secuencia de ids al máximo actual, necesario tras insertar ids explícitos.
+        """
+        connection = connections[Product.objects.db]
+        statements = connection.ops.sequence_reset_sql(no_style(), [Product])
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+    def bulk_update_products(self, items):
+        """
+        Actualiza varios productos sin leerlos previamente, escribiendo solo los campos enviados.
+
+        Los elementos se agrupan por el conjunto de campos que modifican para que cada grupo
+        se resuelva con un único ``bulk_update`` sin sobrescribir columnas no enviadas.
+        """
+        now = timezone.now()
+        groups = {}
+        for item in items:
+            fields = tuple(sorted(field for field in item if field != 'id'))
+            groups.setdefault(fields, []).append(Product(**item, last_update=now))
+
+        # Valores previos de los productos cuyo precio, stock o estado cambia, para el resumen del inventario.
+        tracked = {item['id']: item for item in items if any(field in item for field in STATS_FIELDS)}
+        old = []
+        if tracked:
+            old = list(Product.objects.select_for_update().filter(id__in=tracked).values_list('id', *STATS_FIELDS))
+
+        for fields, products in groups.items():
+            Product.objects.bulk_update(products, [*fields, 'last_update'])
+
+        if old:
+            new = [
+                (row[0], *(tracked[row[0]].get(field, value) for field, value in zip(STATS_FIELDS, row[1:])))
+                for row in old
+            ]
+            self.stats.record(self.stats_delta(old, sign=-1).merge(self.stats_delta(new)))
+        if items:
+            self.catalog_changed()
+
+    def bulk_delete_products(self, product_ids):
+        """
+        Elimina varios productos con una sola sentencia DELETE filtrada por id.
+        """
+        if not product_ids:
+            return 0
+        deleted = self._delete_returning(Product.objects.filter(id__in=product_ids))
+        if deleted:
+            self.stats.record(self.stats_delta(deleted, sign=-1))
+            self.record_tombstones(row[0] for row in deleted)
+            self.catalog_changed()
+        return len(deleted)
+
+    def reserve_stock(self, product_id, quantity):
+        """
+        Descuenta stock de forma atómica, solo si alcanza (``WHERE stock >= cantidad``).
+
+        Returns:
+            int: El stock resultante.
+
+        Raises:
+            Http404: Si el producto no existe.
+            InsufficientStock: Si el producto no tiene stock suficiente.
+        """
+        stock = self._apply_stock_delta(product_id, -quantity)
+        if stock is None:
+            if not Product.objects.filter(id=product_id).exists():
+                raise Http404(f"El producto con ID {product_id} no existe")
+            raise InsufficientStock(product_id, quantity)
+        return stock
+
+    def release_stock(self, product_id, quantity):
+        """
+        Devuelve stock de forma atómica.
+
+        Returns:
+            int: El stock resultante.
+
+        Raises:
+            Http404: Si el producto no existe.
+        """
+        stock = self._apply_stock_delta(product_id, quantity)
+        if stock is None:
+            raise Http404(f"El producto con ID {product_id} no existe")
+        return stock
+
+    def _apply_stock_delta(self, product_id, delta):
+        """
+        Aplica ``stock = stock + delta`` con un único UPDATE condicional y devuelve el stock resultante,
+        o None si ninguna fila cumplió la condición.
+        """
+        queryset = Product.objects.filter(id=product_id)
+        if delta < 0:
+            queryset = queryset.filter(stock__gte=-delta)
+        values = {'stock': F('stock') + delta, 'last_update': timezone.now()}
+
+        connection = connections[queryset.db]
+        with transaction.atomic(using=queryset.db):
+            if not supports_update_returning(connection):
+                if not queryset.update(**values):
+                    return None
+                row = Product.objects.filter(id=product_id).values_list('stock', 'precio', 'activo').get()
+            else:
+                # El UPDATE se construye con el ORM (filtros y F()) y solo se le agrega RETURNING,
+                # así el stock resultante llega en el mismo viaje a la base de datos.
+                query = queryset.query.chain(sql.UpdateQuery)
+                query.add_update_values(values)
+                update_sql, params = query.get_compiler(queryset.db).as_sql()
+                with connection.cursor() as cursor:
+                    cursor.execute(f'{update_sql} RETURNING {self._quoted_columns(connection, STATS_FIELDS[::-1])}', params)
+                    row = cursor.fetchone()
+                if row is None:
+                    return None
+
+            stock, precio, activo = row
+            # Solo cambia el stock: mismo rango y estado, así que el conteo de productos no se mueve.
+            self.stats.record(
+                self.stats_delta([(product_id, activo, self._decimal(precio), stock)])
+                .merge(self.stats_delta([(product_id, activo, self._decimal(precio), stock - delta)], sign=-1))
+            )
+        self.catalog_changed()
+        return stock
+
+    def _delete_returning(self, queryset):
+        """
+        Borra las filas del queryset y devuelve sus ``(id, activo, precio, stock)``, con ``DELETE ... RETURNING``
+        si la base de datos lo permite. Debe llamarse dentro de una transacción.
+        """
+        connection = connections[queryset.db]
+        if not supports_update_returning(connection):
+            rows = list(queryset.select_for_update().values_list('id', *STATS_FIELDS))
+            Product.objects.filter(id__in=[row[0] for row in rows]).delete()
+            return rows
+
+        query = queryset.query.chain(sql.DeleteQuery)
+        delete_sql, params = query.get_compiler(queryset.db).as_sql()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{delete_sql} RETURNING {self._quoted_columns(connection, ("id", *STATS_FIELDS))}', params)
+            return [(product_id, activo, self._decimal(precio), stock) for product_id, activo, precio, stock in cursor.fetchall()]
+
+    @staticmethod
+    def _quoted_columns(connection, fields):
+        return ', '.join(connection.ops.quote_name(Product._meta.get_field(field).column) for field in fields)
+
+    @staticmethod
+    def _decimal(value):
+        # Las consultas en crudo devuelven el precio como float en SQLite.
+        return value if isinstance(value, Decimal) else Decimal(str(value))
@@ -0,0 +1,206 @@
+from contextlib import contextmanager
+
+from django.db import connections, transaction
+from django.db.models import FloatField, Lookup, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Upper
+
+from .models import Product, ProductSearchIndex
+
+
+FTS_TABLE = ProductSearchIndex._meta.db_table
+FTS_INSERT_TRIGGER = f'{FTS_TABLE}_ai'
+# Los mismos que crea la migración 0002_product_search_index; deferred_search_index los quita y los vuelve a crear.
+FTS_INSERT_TRIGGER_SQL = (
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_INSERT_TRIGGER} AFTER INSERT ON products_product BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, nombre) VALUES (new.id, new.nombre); END"
+)
+TRIGRAM_INDEX = 'products_product_nombre_trgm'
+TRIGRAM_INDEX_SQL = (
+    f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} '
+    'ON products_product USING gin ((UPPER(nombre::text)) gin_trgm_ops)'
+)
+
+# Memoria de FTS5 para los términos pendientes (opción hashsize): la de una carga completa y la por defecto.
+FTS_FILL_HASHSIZE = 64 * 1024 * 1024
+FTS_DEFAULT_HASHSIZE = 1024 * 1024
+
+# Con menos de tres caracteres no se generan trigramas, por lo que no es posible usar el índice.
+MIN_INDEXED_QUERY_LENGTH = 3
+
+
+class SubstringSearchBackend:
+    """
+    Búsqueda por subcadena sin índice (``icontains``).
+    Se usa cuando el motor de base de datos no cuenta con un índice de texto disponible.
+    """
+
+    def search(self, queryset, query):
+        return queryset.filter(nombre__icontains=query).annotate(
+            rank=Value(1.0, output_field=FloatField())
+        )
+
+
+class PostgresTrigramSearchBackend(SubstringSearchBackend):
+    """
+    Búsqueda por similitud de trigramas (``pg_trgm``) en PostgreSQL.
+
+    Se apoya en el índice GIN ``products_product_nombre_trgm`` sobre ``UPPER(nombre)``,
+    el mismo que atiende el filtro ``nombre__icontains``, y ordena por ``word_similarity``.
+    """
+
+    def search(self, queryset, query):
+        if len(query) < MIN_INDEXED_QUERY_LENGTH:
+            return super().search(queryset, query)
+
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return queryset.alias(
+            nombre_upper=Upper('nombre')
+        ).filter(
+            nombre_upper__trigram_word_similar=query.upper()
+        ).annotate(
+            rank=TrigramWordSimilarity(query.upper(), Upper('nombre'))
+        )
+
+
+class FTSMatch(Lookup):
+    """
+    ``columna MATCH consulta`` de FTS5, que usa el índice de texto de la tabla virtual.
+    """
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+ProductSearchIndex._meta.get_field('nombre').register_lookup(FTSMatch)
+
+
+class SQLiteFTSSearchBackend(SubstringSearchBackend):
+    """
+    Búsqueda de texto completo con la tabla virtual FTS5 ``products_product_fts``
+    (tokenizador ``trigram``), ordenada por ``bm25``. Pensada para ejecuciones locales.
+    """
+
+    def search(self, queryset, query):
+        if len(query) < MIN_INDEXED_QUERY_LENGTH or not self._has_fts_table(queryset.db):
+            return super().search(queryset, query)
+
+        match = '"%s"' % query.replace('"', '""')
+
+        # Se une con la tabla FTS (``search_index``) en lugar de usar subconsultas correlacionadas:
+        # bm25 solo se calcula para las filas que coinciden con la búsqueda, una vez por fila.
+        return queryset.filter(search_index__nombre__match=match).annotate(
+            rank=RawSQL(f'-bm25({FTS_TABLE})', (), output_field=FloatField())
+        )
+
+    @staticmethod
+    def _has_fts_table(alias):
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            return FTS_TABLE in connection.introspection.table_names(cursor)
+
+
+@contextmanager
+def deferred_search_index(alias='default'):
+    """
+    Suspende el índice de búsqueda mientras se insertan muchos productos y lo completa al salir, de una vez:
+
+    - SQLite: quita el trigger que alimenta ``products_product_fts`` (indexa fila por fila y es lo más
+      lento de una carga masiva). Al salir restaura el trigger e indexa las filas nuevas con un solo
+      ``INSERT ... SELECT``, en la misma transacción, así ningún producto queda fuera del índice aunque
+      la carga falle a medias.
+    - PostgreSQL: quita el índice GIN de trigramas y lo vuelve a crear al salir.
+
+    Si el proceso muere durante la carga no llega a restaurarlos; la siguiente llamada lo hace antes de
+    empezar (ver ``restore_search_index``).
+    """
+    connection = connections[alias]
+    restore_search_index(alias)
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(TRIGRAM_INDEX_SQL)
+        return
+
+    if connection.vendor != 'sqlite' or not SQLiteFTSSearchBackend._has_fts_table(alias):
+        yield
+        return
+
+    product_table = Product._meta.db_table
+    with transaction.atomic(using=alias), connection.cursor() as cursor:
+        cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM "{product_table}"')
+        last_id = cursor.fetchone()[0]
+        cursor.execute(f'DROP TRIGGER {FTS_INSERT_TRIGGER}')
+
+    try:
+        yield
+    finally:
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute(FTS_INSERT_TRIGGER_SQL)
+            _fill_search_index(
+                cursor,
+                f'INSERT INTO {FTS_TABLE}(rowid, nombre) SELECT id, nombre FROM "{product_table}" WHERE id > %s',
+                [last_id],
+            )
+
+
+def restore_search_index(alias='default') -> bool:
+    """
+    Vuelve a crear el trigger (SQLite) o el índice de trigramas (PostgreSQL) que ``deferred_search_index``
+    quitó, si el proceso murió antes de restaurarlo. En SQLite no se sabe qué productos se insertaron
+    sin el trigger, así que el índice se reconstruye completo.
+
+    Returns:
+        bool: Si faltaba algo y se restauró.
+    """
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT to_regclass(%s) IS NULL', [TRIGRAM_INDEX])
+            if not cursor.fetchone()[0]:
+                return False
+            cursor.execute(TRIGRAM_INDEX_SQL)
+        return True
+
+    if connection.vendor != 'sqlite' or not SQLiteFTSSearchBackend._has_fts_table(alias):
+        return False
+
+    with transaction.atomic(using=alias), connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s", [FTS_INSERT_TRIGGER])
+        if cursor.fetchone() is not None:
+            return False
+        cursor.execute(FTS_INSERT_TRIGGER_SQL)
+        _fill_search_index(cursor, f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def _fill_search_index(cursor, sql, params=()):
+    """
+    Ejecuta una carga grande en ``products_product_fts`` con más memoria para los términos pendientes;
+    con el valor por defecto (1 MB) FTS5 escribe muchos segmentos chicos y después los tiene que fusionar.
+    Se vuelve al valor por defecto en la misma transacción.
+    """
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('hashsize', %s)", [FTS_FILL_HASHSIZE])
+    cursor.execute(sql, params)
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('hashsize', %s)", [FTS_DEFAULT_HASHSIZE])
+
+
+def get_search_backend(alias='default'):
+    """
+    Devuelve el backend de búsqueda adecuado para el motor de la base de datos.
+    """
+    vendor = connections[alias].vendor
+    if vendor == 'postgresql':
+        return PostgresTrigramSearchBackend()
+    if vendor == 'sqlite':
+        return SQLiteFTSSearchBackend()
+    return SubstringSearchBackend()
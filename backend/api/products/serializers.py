@@ -1,7 +1,11 @@
+from django.conf import settings
 from rest_framework import serializers
+
+from core.fieldsets import SparseFieldsMixin
+
 from .models import Product
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Maneja la validación y transformación de datos de producto entre la API (JSON)
     """
@@ -41,4 +45,137 @@ class ProductUpdateSerializer(ProductSerializer):
             'nombre': {'required': False},
             'precio': {'required': False},
             'stock': {'required': False},
-        }
\ No newline at end of file
+        }
+
+
+class ProductBulkUpdateSerializer(ProductUpdateSerializer):
+    """
+    Serializer para cada elemento de actualización en la operación masiva.
+    Igual que ProductUpdateSerializer pero el ID es obligatorio para identificar el producto.
+    """
+    id = serializers.IntegerField(min_value=1)
+
+    def validate(self, attrs):
+        """
+        Exige el ID aun cuando la validación es parcial.
+        """
+        if 'id' not in attrs:
+            raise serializers.ValidationError({'id': "This field is required."})
+        return attrs
+
+
+class ProductBulkSerializer(serializers.Serializer):
+    """
+    Valida la estructura de la petición masiva (crear, actualizar y eliminar).
+    Cada elemento se valida después con ProductSerializer / ProductBulkUpdateSerializer.
+    """
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
+
+    def validate_update(self, value):
+        """
+        Convierte el ID de cada elemento a entero para poder compararlo con los de ``delete``.
+        El resto de los campos se valida después con ProductBulkUpdateSerializer.
+        """
+        id_field = serializers.IntegerField(min_value=1)
+        items, errors = [], {}
+        for index, item in enumerate(value):
+            if 'id' in item:
+                try:
+                    item = {**item, 'id': id_field.run_validation(item['id'])}
+                except serializers.ValidationError as e:
+                    errors[index] = {'id': e.detail}
+            items.append(item)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return items
+
+    def validate(self, attrs):
+        """
+        Aplica el límite de elementos por petición y evita operar dos veces sobre el mismo producto.
+        """
+        total = len(attrs['create']) + len(attrs['update']) + len(attrs['delete'])
+        max_items = settings.PRODUCTS_BULK_MAX_ITEMS
+        if total == 0:
+            raise serializers.ValidationError("Debe enviar al menos un elemento en create, update o delete.")
+        if total > max_items:
+            raise serializers.ValidationError(
+                f"La petición contiene {total} elementos y el máximo permitido es {max_items}."
+            )
+
+        update_ids = [item.get('id') for item in attrs['update']]
+        target_ids = [pk for pk in update_ids if pk is not None] + attrs['delete']
+        if len(target_ids) != len(set(target_ids)):
+            raise serializers.ValidationError("Un producto solo puede aparecer una vez entre update y delete.")
+        return attrs
+
+
+class StockMovementSerializer(serializers.Serializer):
+    """
+    Cantidad de unidades a reservar o liberar de un producto.
+    """
+    cantidad = serializers.IntegerField(min_value=1)
+
+
+class StockReservationItemSerializer(StockMovementSerializer):
+    """
+    Elemento de una reservación de varios productos.
+    """
+    id = serializers.IntegerField(min_value=1)
+
+
+class StockReservationSerializer(serializers.Serializer):
+    """
+    Reservación de varios productos en una sola operación.
+    """
+    items = StockReservationItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, value):
+        """
+        Valida que cada producto aparezca una sola vez.
+        """
+        ids = [item['id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Cada producto solo puede aparecer una vez.")
+        return value
+
+
+class PriceBucketSerializer(serializers.Serializer):
+    """
+    Rango del histograma de precios (``hasta`` es nulo en el último rango).
+    """
+    desde = serializers.DecimalField(max_digits=10, decimal_places=2)
+    hasta = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    productos = serializers.IntegerField()
+
+
+class ProductStatsSerializer(serializers.Serializer):
+    """
+    Estadísticas del inventario.
+    """
+    productos = serializers.IntegerField()
+    activos = serializers.IntegerField()
+    inactivos = serializers.IntegerField()
+    stock_total = serializers.IntegerField()
+    valor_inventario = serializers.DecimalField(max_digits=20, decimal_places=2)
+    histograma_precios = PriceBucketSerializer(many=True)
+
+
+class ProductChangeSerializer(serializers.Serializer):
+    """
+    Cambio del feed: ``upsert`` con el producto completo en ``data`` o ``delete`` (``data`` nulo).
+    """
+    op = serializers.ChoiceField(choices=['upsert', 'delete'])
+    id = serializers.IntegerField()
+    at = serializers.DateTimeField()
+    data = ProductSerializer(allow_null=True)
+
+
+class ProductChangesSerializer(serializers.Serializer):
+    """
+    Página del feed de cambios.
+    """
+    next = serializers.CharField()
+    has_more = serializers.BooleanField()
+    results = ProductChangeSerializer(many=True)
@@ -1,4 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.conditional import make_etag
+from core.fast_serializers import get_fast_serializer
+from core.fieldsets import field_sources
+
+from .changes import START, ExpiredCursor, decode_cursor, merge_changes
+from .export import export_rows
+from .pagination import KeysetPagination
 from .repository import ProductRepository
+from .serializers import ProductSerializer
+from .stats import read_stats
 
 class ProductService:
     """
@@ -9,20 +24,224 @@ class ProductService:
 
     def __init__(self):
         self.repository = ProductRepository()
+        self.paginator = KeysetPagination()
+        self.fast_serialization = settings.FAST_SERIALIZATION
 
     def get_all_products(self, filters=None):
         return self.repository.get_all_products(filters)
 
+    def get_products_page(self, filters=None, cursor=None, page_size=None, fields=None):
+        """
+        Obtiene una página de productos filtrados a partir del cursor proporcionado.
+
+        Las páginas se guardan en caché según los filtros normalizados y la versión del catálogo,
+        que se incrementa con cada escritura en productos. Con ``fields`` solo se leen las columnas
+        de esos campos.
+
+        Con ``FAST_SERIALIZATION`` la página se lee con ``values_list`` y sus resultados ya vienen
+        serializados (y así se guardan en caché); si no, son instancias del modelo.
+        """
+        filters = self.repository.normalize_filters(filters)
+        page_size = self.paginator.get_page_size(page_size)
+
+        def load_page():
+            if not self.fast_serialization:
+                only = field_sources(ProductSerializer, fields) if fields else None
+                queryset = self.repository.get_all_products(filters, only=only)
+                return self.paginator.paginate_queryset(queryset, cursor, page_size)
+
+            fast_serializer = get_fast_serializer(ProductSerializer, fields)
+            queryset = self.repository.get_all_products(filters)
+            page = self.paginator.paginate_queryset(queryset, cursor, page_size, values=fast_serializer.sources)
+            return page._replace(results=fast_serializer.serialize_rows(page.results))
+
+        return self.repository.list_cache.get_or_set(
+            {
+                **filters,
+                'cursor': cursor,
+                'page_size': page_size,
+                'fields': fields,
+                'serialized': self.fast_serialization,
+            },
+            load_page,
+        )
+
+    async def aget_products_page(self, filters=None, cursor=None, page_size=None, fields=None):
+        """
+        Versión asíncrona de ``get_products_page``: misma caché y mismas páginas, leídas con el ORM asíncrono.
+        """
+        filters = self.repository.normalize_filters(filters)
+        page_size = self.paginator.get_page_size(page_size)
+
+        async def load_page():
+            if not self.fast_serialization:
+                only = field_sources(ProductSerializer, fields) if fields else None
+                queryset = await self.repository.aget_all_products(filters, only=only)
+                return await self.paginator.apaginate_queryset(queryset, cursor, page_size)
+
+            fast_serializer = get_fast_serializer(ProductSerializer, fields)
+            queryset = await self.repository.aget_all_products(filters)
+            page = await self.paginator.apaginate_queryset(queryset, cursor, page_size, values=fast_serializer.sources)
+            return page._replace(results=fast_serializer.serialize_rows(page.results))
+
+        return await self.repository.list_cache.aget_or_set(
+            {
+                **filters,
+                'cursor': cursor,
+                'page_size': page_size,
+                'fields': fields,
+                'serialized': self.fast_serialization,
+            },
+            load_page,
+        )
+
+    def get_products_list_etag(self, filters=None, cursor=None, page_size=None, fields=None):
+        """
+        Calcula el ETag de una página del listado sin consultar la página en sí.
+
+        Combina los parámetros de la petición con ``MAX(last_update)`` y el total del listado
+        filtrado. El agregado se guarda en el mismo caché versionado que las páginas.
+        """
+        filters = self.repository.normalize_filters(filters)
+        page_size = self.paginator.get_page_size(page_size)
+        state = self.repository.list_cache.get_or_set(
+            {**filters, 'validator': True},
+            lambda: self.repository.get_list_state(filters),
+        )
+        return make_etag('products', filters, cursor, page_size, fields, state['last_update'], state['total'])
+
+    async def aget_products_list_etag(self, filters=None, cursor=None, page_size=None, fields=None):
+        filters = self.repository.normalize_filters(filters)
+        page_size = self.paginator.get_page_size(page_size)
+        state = await self.repository.list_cache.aget_or_set(
+            {**filters, 'validator': True},
+            lambda: self.repository.aget_list_state(filters),
+        )
+        return make_etag('products', filters, cursor, page_size, fields, state['last_update'], state['total'])
+
+    def export_products(self, filters=None, export_format='ndjson', chunk_size=None):
+        """
+        Devuelve un generador con el catálogo filtrado en formato NDJSON o CSV, listo para transmitirse.
+        """
+        queryset = self.repository.get_all_products(filters)
+        return export_rows(queryset, export_format, chunk_size or settings.PRODUCTS_EXPORT_CHUNK_SIZE)
+
+    def get_changes(self, since=None, page_size=None):
+        """
+        Devuelve los productos creados o modificados y los eliminados después del cursor ``since``
+        (desde el principio si no se indica), ordenados por fecha.
+
+        Los cambios de los últimos ``PRODUCTS_CHANGES_SETTLE_SECONDS`` se dejan para la siguiente
+        consulta: una escritura cuya transacción aún no se confirma tiene una fecha anterior a la de
+        su confirmación y, si el cursor ya la hubiera pasado, el cliente no la vería nunca.
+
+        Raises:
+            InvalidCursor: Si el cursor no es válido.
+            ExpiredCursor: Si el cursor es anterior a la retención de bajas.
+        """
+        page_size = self.paginator.get_page_size(page_size)
+        products_after, deletes_after = decode_cursor(since) if since else (START, START)
+
+        now = timezone.now()
+        retention = settings.PRODUCTS_TOMBSTONE_RETENTION_DAYS
+        # Si las bajas siguen en START el cliente aún recorre su primera sincronización: no tenía
+        # productos antes de empezar, así que las bajas ya depuradas no le afectan.
+        if since and retention and deletes_after != START and deletes_after[0] < now - timedelta(days=retention):
+            raise ExpiredCursor("El cursor es anterior a la retención de bajas; vuelva a sincronizar el catálogo completo")
+
+        until = now - timedelta(seconds=settings.PRODUCTS_CHANGES_SETTLE_SECONDS)
+        products = self.repository.get_changed_products(products_after, until, page_size + 1)
+        tombstones = self.repository.get_tombstones(deletes_after, until, page_size + 1)
+        return merge_changes(products, tombstones, page_size, products_after, deletes_after, until)
+
+    def get_stats(self):
+        """
+        Devuelve las estadísticas del inventario desde el resumen que mantienen las escrituras,
+        sin recorrer la tabla de productos.
+        """
+        return read_stats()
+
     def create_product(self, validated_data):
         return self.repository.create_product(validated_data)
 
-    def get_product_by_id(self, product_id):
-        return self.repository.get_product_by_id(product_id)
+    def get_product_by_id(self, product_id, fields=None):
+        """
+        Con ``fields`` solo se leen esas columnas, más ``last_update`` para los validadores HTTP.
+        """
+        only = (*field_sources(ProductSerializer, fields), 'last_update') if fields else None
+        return self.repository.get_product_by_id(product_id, only=only)
+
+    async def aget_product_by_id(self, product_id, fields=None):
+        only = (*field_sources(ProductSerializer, fields), 'last_update') if fields else None
+        return await self.repository.aget_product_by_id(product_id, only=only)
 
     def update_product(self, product_id, validated_data):
-        product_instance = self.repository.get_product_by_id(product_id)
-        return self.repository.update_product(product_instance, validated_data)
+        self.repository.update_product(product_id, validated_data)
 
     def delete_product(self, product_id):
-        product_instance = self.repository.get_product_by_id(product_id)
-        self.repository.delete_product(product_instance)
\ No newline at end of file
+        self.repository.delete_product(product_id)
+
+    def bulk_apply(self, create_items, update_items, delete_ids):
+        """
+        Aplica en una sola transacción las altas, actualizaciones y bajas de la operación masiva.
+
+        Returns:
+            list: El resultado de cada elemento con su acción, posición, id y estado.
+        """
+        # El resumen del inventario se actualiza al final, una vez bloqueados todos los productos.
+        with transaction.atomic(), self.repository.stats.deferred():
+            update_ids = [item['id'] for item in update_items]
+            existing_ids = self.repository.lock_existing_ids(update_ids + list(delete_ids))
+
+            created = self.repository.bulk_create_products(create_items)
+            self.repository.bulk_update_products([item for item in update_items if item['id'] in existing_ids])
+            self.repository.bulk_delete_products([pk for pk in delete_ids if pk in existing_ids])
+
+        results = [
+            {"action": "create", "index": index, "id": product.id, "status": "created"}
+            for index, product in enumerate(created)
+        ]
+        results += [
+            {
+                "action": "update",
+                "index": index,
+                "id": pk,
+                "status": "updated" if pk in existing_ids else "not_found",
+            }
+            for index, pk in enumerate(update_ids)
+        ]
+        results += [
+            {
+                "action": "delete",
+                "index": index,
+                "id": pk,
+                "status": "deleted" if pk in existing_ids else "not_found",
+            }
+            for index, pk in enumerate(delete_ids)
+        ]
+        return results
+
+    def reserve_stock(self, product_id, quantity):
+        return self.repository.reserve_stock(product_id, quantity)
+
+    def release_stock(self, product_id, quantity):
+        return self.repository.release_stock(product_id, quantity)
+
+    def reserve_stock_many(self, items):
+        """
+        Reserva stock de varios productos en una sola transacción (todo o nada).
+
+        Los productos se actualizan en orden de id para que dos reservaciones concurrentes
+        bloqueen las filas en el mismo orden y no se produzcan interbloqueos.
+
+        Args:
+            items (dict): Cantidad a reservar por id de producto.
+
+        Returns:
+            dict: El stock resultante por id de producto.
+        """
+        with transaction.atomic(), self.repository.stats.deferred():
+            return {
+                product_id: self.repository.reserve_stock(product_id, quantity)
+                for product_id, quantity in sorted(items.items())
+            }
@@ -0,0 +1,212 @@
+import contextlib
+import random
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, Sum, Value, When
+
+from .models import Product, ProductStatsBucket
+
+
+# Límites inferiores de los rangos del histograma de precios; el último rango no tiene límite superior.
+PRICE_BUCKET_EDGES = tuple(Decimal(edge) for edge in ('0', '100', '500', '1000', '5000', '10000', '50000'))
+
+CENTS = Decimal('0.01')
+
+# Cada combinación (activo, rango) se reparte en varias filas para que escrituras concurrentes
+# sobre productos distintos no compitan por el mismo registro del resumen.
+STATS_SHARDS = 8
+
+
+def price_bucket(precio) -> int:
+    return max(bisect_right(PRICE_BUCKET_EDGES, Decimal(precio)) - 1, 0)
+
+
+def shard_for(product_id) -> int:
+    return product_id % STATS_SHARDS if product_id else random.randrange(STATS_SHARDS)
+
+
+class StatsDelta(dict):
+    """
+    Cambios pendientes del resumen: ``(activo, rango, fila) -> [productos, stock, valor]``.
+    """
+
+    def add(self, activo, precio, stock, sign=1, product_id=None):
+        key = (bool(activo), price_bucket(precio), shard_for(product_id))
+        totals = self.setdefault(key, [0, 0, Decimal(0)])
+        totals[0] += sign
+        totals[1] += sign * stock
+        totals[2] += sign * Decimal(precio) * stock
+        return self
+
+    def merge(self, other):
+        for key, (productos, stock, valor) in other.items():
+            totals = self.setdefault(key, [0, 0, Decimal(0)])
+            totals[0] += productos
+            totals[1] += stock
+            totals[2] += valor
+        return self
+
+
+class ProductStatsTracker:
+    """
+    Aplica los cambios del resumen del inventario dentro de la transacción de cada escritura.
+
+    Las escrituras de un solo producto aplican su cambio de inmediato (después de bloquear el producto).
+    Las que tocan varios productos lo acumulan con ``deferred()`` y lo aplican al final, en orden de
+    llave, para que todas las transacciones bloqueen las filas del resumen en el mismo orden.
+    """
+
+    def __init__(self):
+        self._pending = None
+
+    @contextlib.contextmanager
+    def deferred(self):
+        if self._pending is not None:
+            yield
+            return
+
+        self._pending = StatsDelta()
+        try:
+            yield
+            pending = self._pending
+        finally:
+            self._pending = None
+        self.apply(pending)
+
+    def record(self, delta):
+        if self._pending is not None:
+            self._pending.merge(delta)
+        else:
+            self.apply(delta)
+
+    @staticmethod
+    def apply(delta):
+        for (activo, bucket, shard), (productos, stock, valor) in sorted(delta.items()):
+            if not (productos or stock or valor):
+                continue
+            updates = {'productos': F('productos') + productos, 'stock': F('stock') + stock, 'valor': F('valor') + valor}
+            row = ProductStatsBucket.objects.filter(activo=activo, bucket=bucket, shard=shard)
+            if row.update(**updates):
+                continue
+            # La fila no existe (p. ej. se agregaron rangos): se crea; si otra transacción se adelantó, se actualiza.
+            try:
+                with transaction.atomic():
+                    ProductStatsBucket.objects.create(
+                        activo=activo, bucket=bucket, shard=shard, productos=productos, stock=stock, valor=valor,
+                    )
+            except IntegrityError:
+                row.update(**updates)
+
+
+def compute_buckets(product_model=Product):
+    """
+    Recalcula el resumen a partir de la tabla de productos con un solo ``GROUP BY``.
+
+    Returns:
+        dict: ``(activo, rango) -> (productos, stock, valor)``.
+    """
+    bucket = Case(
+        *[
+            When(precio__lt=upper, then=Value(index))
+            for index, upper in enumerate(PRICE_BUCKET_EDGES[1:])
+        ],
+        default=Value(len(PRICE_BUCKET_EDGES) - 1),
+    )
+    valor = ExpressionWrapper(F('precio') * F('stock'), output_field=DecimalField(max_digits=20, decimal_places=2))
+    rows = (
+        product_model.objects.order_by()
+        .annotate(bucket=bucket)
+        .values('activo', 'bucket')
+        .annotate(productos=Count('id'), stock_total=Sum('stock'), valor=Sum(valor))
+    )
+    return {
+        (row['activo'], row['bucket']): (row['productos'], row['stock_total'] or 0, (row['valor'] or Decimal(0)).quantize(CENTS))
+        for row in rows
+    }
+
+
+def rebuild_buckets(product_model=Product, bucket_model=ProductStatsBucket, fix=True):
+    """
+    Reescribe todas las filas del resumen con los valores reales y devuelve las diferencias encontradas
+    (con ``fix=False`` solo las devuelve).
+
+    Las filas del resumen se bloquean antes de contar: una escritura que aún no se confirma queda
+    esperando ese bloqueo y aplica su cambio sobre los valores corregidos.
+    """
+    with transaction.atomic():
+        rows = list(bucket_model.objects.select_for_update().order_by('activo', 'bucket', 'shard'))
+        current = {}
+        for row in rows:
+            totals = current.setdefault((row.activo, row.bucket), [0, 0, Decimal(0)])
+            totals[0] += row.productos
+            totals[1] += row.stock
+            totals[2] += row.valor
+
+        actual = compute_buckets(product_model)
+        drift = {}
+        for key in set(current) | set(actual):
+            expected = actual.get(key, (0, 0, Decimal(0)))
+            found = tuple(current.get(key, (0, 0, Decimal(0))))
+            if tuple(expected) != found:
+                drift[key] = {'esperado': expected, 'encontrado': found}
+        if not fix:
+            return drift
+
+        # Los totales reales quedan en la fila 0 de cada combinación y el resto de las filas en cero.
+        desired = {
+            (activo, bucket, shard): actual.get((activo, bucket), (0, 0, Decimal(0))) if shard == 0 else (0, 0, Decimal(0))
+            for activo in (True, False)
+            for bucket in range(len(PRICE_BUCKET_EDGES))
+            for shard in range(STATS_SHARDS)
+        }
+        for row in rows:
+            key = (row.activo, row.bucket, row.shard)
+            if key not in desired:
+                row.delete()
+                continue
+            productos, stock, valor = desired.pop(key)
+            if (row.productos, row.stock, row.valor) != (productos, stock, valor):
+                row.productos, row.stock, row.valor = productos, stock, valor
+                row.save(update_fields=['productos', 'stock', 'valor'])
+
+        bucket_model.objects.bulk_create([
+            bucket_model(activo=activo, bucket=bucket, shard=shard, productos=productos, stock=stock, valor=valor)
+            for (activo, bucket, shard), (productos, stock, valor) in desired.items()
+        ])
+    return drift
+
+
+def read_stats():
+    """
+    Arma las estadísticas del inventario leyendo solo las filas del resumen (su cantidad es fija).
+    """
+    rows = ProductStatsBucket.objects.values('activo', 'bucket').annotate(
+        productos_total=Sum('productos'), stock_total=Sum('stock'), valor_total=Sum('valor'),
+    )
+    productos = {True: 0, False: 0}
+    stock = 0
+    valor = Decimal(0)
+    histogram = [0] * len(PRICE_BUCKET_EDGES)
+    for row in rows:
+        productos[row['activo']] += row['productos_total']
+        stock += row['stock_total']
+        valor += row['valor_total']
+        histogram[min(row['bucket'], len(PRICE_BUCKET_EDGES) - 1)] += row['productos_total']
+
+    return {
+        'productos': productos[True] + productos[False],
+        'activos': productos[True],
+        'inactivos': productos[False],
+        'stock_total': stock,
+        'valor_inventario': valor,
+        'histograma_precios': [
+            {
+                'desde': PRICE_BUCKET_EDGES[index],
+                'hasta': PRICE_BUCKET_EDGES[index + 1] if index + 1 < len(PRICE_BUCKET_EDGES) else None,
+                'productos': count,
+            }
+            for index, count in enumerate(histogram)
+        ],
+    }
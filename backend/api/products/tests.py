@@ -1,3 +1,722 @@
-from django.test import TestCase
+import io
+import itertools
+from importlib import import_module
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.users.models import User
+
+from .cache import ProductListCache
+from .changes import START, decode_cursor, encode_cursor, merge_changes
+from .exceptions import InsufficientStock
+from .importing import ProductImporter
+from .models import Product, ProductStatsBucket
+from .pagination import KeysetPagination
+from .search import FTS_INSERT_TRIGGER, SQLiteFTSSearchBackend
+from .services import ProductService
+from .stats import PRICE_BUCKET_EDGES, STATS_SHARDS, rebuild_buckets
+
+
+class StockReservationConcurrencyTests(TransactionTestCase):
+    """
+    Prueba de estrés: muchos hilos reservan el mismo producto al mismo tiempo.
+    """
+
+    workers = 8
+    attempts_per_worker = 25
+
+    def _run_concurrently(self, target):
+        """
+        Ejecuta ``target`` en varios hilos que arrancan a la vez y devuelve los resultados de todos.
+        """
+        barrier = threading.Barrier(self.workers)
+        results = []
+        lock = threading.Lock()
+
+        def worker():
+            service = ProductService()
+            barrier.wait()
+            try:
+                for _ in range(self.attempts_per_worker):
+                    outcome = target(service)
+                    with lock:
+                        results.append(outcome)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @staticmethod
+    def _retry_when_locked(operation):
+        # SQLite serializa las escrituras y puede rechazar una mientras otra está en curso.
+        while True:
+            try:
+                return operation()
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+
+    def test_concurrent_reservations_never_oversell(self):
+        stock = 60
+        product = Product.objects.create(nombre="Producto concurrido", precio=10, stock=stock)
+
+        def reserve(service):
+            try:
+                return self._retry_when_locked(lambda: service.reserve_stock(product.id, 1))
+            except InsufficientStock:
+                return None
+
+        results = self._run_concurrently(reserve)
+        successful = [remaining for remaining in results if remaining is not None]
+
+        product.refresh_from_db()
+        self.assertEqual(len(successful), stock)
+        self.assertEqual(product.stock, 0)
+        # Cada reservación exitosa recibió un stock resultante distinto: no hubo actualizaciones perdidas.
+        self.assertEqual(sorted(successful), list(range(stock)))
+
+    def test_concurrent_reserve_and_release_keep_stock_consistent(self):
+        product = Product.objects.create(nombre="Producto concurrido", precio=10, stock=100)
+
+        def reserve_then_release(service):
+            self._retry_when_locked(lambda: service.reserve_stock(product.id, 2))
+            return self._retry_when_locked(lambda: service.release_stock(product.id, 2))
+
+        self._run_concurrently(reserve_then_release)
+
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 100)
+
+    def test_concurrent_multi_item_reservations_are_all_or_nothing(self):
+        first = Product.objects.create(nombre="Producto A", precio=10, stock=50)
+        second = Product.objects.create(nombre="Producto B", precio=10, stock=30)
+
+        calls = itertools.count()
+
+        def reserve_both(service):
+            # Se alterna el orden de los productos en la petición; el servicio siempre los bloquea por id.
+            items = {second.id: 1, first.id: 1} if next(calls) % 2 else {first.id: 1, second.id: 1}
+            try:
+                return self._retry_when_locked(lambda: service.reserve_stock_many(items))
+            except InsufficientStock:
+                return None
+
+        results = self._run_concurrently(reserve_both)
+        successful = [stocks for stocks in results if stocks is not None]
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(len(successful), 30)
+        self.assertEqual(second.stock, 0)
+        self.assertEqual(first.stock, 20)
+
+
+class ProductBulkValidationTests(TestCase):
+    """
+    Validación de la petición masiva antes de aplicar cualquier cambio.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='bulk', email='bulk@example.com'))
+        self.product = Product.objects.create(nombre="Producto masivo", precio=10, stock=5)
+
+    def post(self, body):
+        return self.client.post(reverse('product-bulk'), body, format='json')
+
+    def test_update_id_with_invalid_type_is_rejected(self):
+        for invalid in ([1], {}, 'abc', 0):
+            response = self.post({'update': [{'id': invalid, 'stock': 1}]})
+            self.assertEqual(response.status_code, 400, invalid)
+            self.assertIn('id', response.data['update'][0])
+
+    def test_same_product_in_update_and_delete_is_rejected(self):
+        response = self.post({'update': [{'id': str(self.product.id), 'stock': 1}], 'delete': [self.product.id]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Product.objects.filter(pk=self.product.pk, stock=5).exists())
+
+    def test_update_id_as_string_is_applied(self):
+        response = self.post({'update': [{'id': str(self.product.id), 'stock': 7}]})
+
+        self.assertEqual(response.status_code, 200)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 7)
+
+
+class ProductUpsertImportTests(TestCase):
+    """
+    Importación en modo upsert sobre productos existentes.
+    """
+
+    def setUp(self):
+        self.errors = []
+        self.importer = ProductImporter(method='upsert', on_error=lambda position, errors: self.errors.append(position))
+        self.product = ProductService().create_product({'nombre': "Existente", 'precio': '10.00', 'stock': 5, 'activo': False})
+
+    def test_row_without_activo_keeps_the_stored_state(self):
+        stats = self.importer.run(enumerate([
+            {'id': self.product.id, 'nombre': "Existente", 'precio': '12.00', 'stock': 7},
+            {'nombre': "Nuevo", 'precio': '3.00', 'stock': 1},
+        ], start=1))
+
+        self.assertEqual(stats['imported'], 2)
+        self.product.refresh_from_db()
+        self.assertFalse(self.product.activo)
+        self.assertEqual(self.product.stock, 7)
+        self.assertTrue(Product.objects.get(nombre="Nuevo").activo)
+        # El resumen del inventario quedó igual a los datos reales.
+        self.assertFalse(rebuild_buckets(fix=False))
+
+    def test_row_with_activo_overwrites_it(self):
+        self.importer.run([(1, {'id': self.product.id, 'nombre': "Existente", 'precio': '10.00', 'stock': 5, 'activo': 'true'})])
+
+        self.product.refresh_from_db()
+        self.assertTrue(self.product.activo)
+
+    def test_duplicate_id_in_a_batch_is_rejected(self):
+        stats = self.importer.run(enumerate([
+            {'id': self.product.id, 'nombre': "Primera", 'precio': '10.00', 'stock': 1},
+            {'id': self.product.id, 'nombre': "Segunda", 'precio': '10.00', 'stock': 2},
+        ], start=1))
+
+        self.assertEqual((stats['imported'], stats['invalid']), (1, 1))
+        self.assertEqual(self.errors, [2])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.nombre, "Primera")
+
+
+class MergeChangesTests(TestCase):
+    """
+    Mezcla de productos y bajas en una página del feed de cambios.
+    """
+
+    def setUp(self):
+        self.base = timezone.now() - timedelta(hours=1)
+        self.until = timezone.now()
+
+    def at(self, minutes):
+        return self.base + timedelta(minutes=minutes)
+
+    def product(self, pk, minutes):
+        return SimpleNamespace(id=pk, last_update=self.at(minutes))
+
+    def test_events_are_merged_by_date(self):
+        page = merge_changes(
+            [self.product(1, 1), self.product(2, 3)], [(self.at(2), 10, 5)], 5, START, START, self.until,
+        )
+
+        self.assertEqual([(change['op'], change['id']) for change in page.changes], [('upsert', 1), ('delete', 5), ('upsert', 2)])
+        self.assertFalse(page.has_more)
+        # Las dos secuencias se entregaron completas: avanzan hasta ``until``.
+        self.assertEqual(decode_cursor(page.next_cursor), ((self.until, 0), (self.until, 0)))
+
+    def test_partial_page_keeps_the_position_of_each_sequence(self):
+        page = merge_changes(
+            [self.product(1, 1), self.product(2, 3), self.product(3, 4)], [(self.at(2), 10, 5)], 2,
+            START, START, self.until,
+        )
+
+        self.assertEqual([change['id'] for change in page.changes], [1, 5])
+        self.assertTrue(page.has_more)
+        self.assertEqual(decode_cursor(page.next_cursor), ((self.at(1), 1), (self.until, 0)))
+
+
+@override_settings(PRODUCTS_CHANGES_SETTLE_SECONDS=0)
+class ProductChangesFeedTests(TestCase):
+    """
+    Sincronización completa e incremental a través del feed de cambios.
+    """
+
+    def setUp(self):
+        self.service = ProductService()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='feed', email='feed@example.com'))
+
+    def test_first_sync_continues_past_a_page_without_deletes(self):
+        products = [self.service.create_product({'nombre': f"Producto {i}", 'precio': '10.00', 'stock': 1}) for i in range(3)]
+        self.service.delete_product(products[0].id)
+
+        first = self.service.get_changes(None, 1)
+        second = self.service.get_changes(first.next_cursor, 5)
+
+        changes = [(change['op'], change['id']) for change in first.changes + second.changes]
+        self.assertEqual(changes, [('upsert', products[1].id), ('upsert', products[2].id), ('delete', products[0].id)])
+        self.assertFalse(second.has_more)
+
+    def test_invalid_cursor_returns_400(self):
+        response = self.client.get(reverse('product-changes'), {'since': 'no-es-un-cursor'})
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(PRODUCTS_TOMBSTONE_RETENTION_DAYS=30)
+    def test_cursor_older_than_retention_returns_410(self):
+        old = timezone.now() - timedelta(days=31)
+        response = self.client.get(reverse('product-changes'), {'since': encode_cursor((old, 1), (old, 1))})
+
+        self.assertEqual(response.status_code, 410)
+
+
+class SeedDataIndexesTests(TransactionTestCase):
+    """
+    ``seed_data`` quita los índices y el trigger de búsqueda durante la carga; nunca quedan sin restaurar.
+    """
+
+    def setUp(self):
+        if connection.vendor != 'sqlite' or not SQLiteFTSSearchBackend._has_fts_table('default'):
+            self.skipTest('Requiere la tabla FTS5 de SQLite')
+
+    def index_names(self):
+        with connection.cursor() as cursor:
+            return set(connection.introspection.get_constraints(cursor, Product._meta.db_table))
+
+    def search(self, query):
+        return list(SQLiteFTSSearchBackend().search(Product.objects.all(), query).values_list('nombre', flat=True))
+
+    def assert_indexes_restored(self):
+        self.assertLessEqual({index.name for index in Product._meta.indexes}, self.index_names())
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s", [FTS_INSERT_TRIGGER])
+            self.assertIsNotNone(cursor.fetchone())
+
+    def test_next_load_restores_what_a_killed_load_dropped(self):
+        # Lo que deja un proceso que muere a mitad de la carga.
+        with connection.schema_editor() as schema_editor:
+            for index in Product._meta.indexes:
+                schema_editor.remove_index(Product, index)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {FTS_INSERT_TRIGGER}')
+        Product.objects.create(nombre='Producto huérfano', precio=10, stock=1)
+        self.assertEqual(self.search('huérfano'), [])
+
+        output = io.StringIO()
+        call_command('seed_data', products=20, batch_size=8, stdout=output)
+
+        self.assertIn('Restored after an interrupted load', output.getvalue())
+        self.assert_indexes_restored()
+        self.assertEqual(self.search('huérfano'), ['Producto huérfano'])
+        seeded = Product.objects.order_by('id').last()
+        self.assertIn(seeded.nombre, self.search(seeded.nombre))
+
+    def test_failed_load_restores_indexes(self):
+        with mock.patch(
+            'api.users.management.commands.seed_data.insert_product_rows', side_effect=OperationalError('disk I/O error'),
+        ):
+            with self.assertRaises(OperationalError):
+                call_command('seed_data', products=20, stdout=io.StringIO())
+
+        self.assert_indexes_restored()
+        Product.objects.create(nombre='Producto posterior', precio=10, stock=1)
+        self.assertEqual(self.search('posterior'), ['Producto posterior'])
+
+
+class ProductSparseFieldsTests(TestCase):
+    """
+    Con ``?fields=`` la consulta del listado y del detalle solo trae las columnas pedidas.
+    """
+
+    def setUp(self):
+        self.product = Product.objects.create(nombre='Teclado disperso', precio=10, stock=3)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='campos', email='campos@example.com'))
+
+    def product_selects(self, captured):
+        return [query['sql'] for query in captured if query['sql'].startswith('SELECT "products_product"."id"')]
+
+    def test_list_reads_only_the_requested_columns(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('product-list-create'), {'fields': 'id,nombre'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [{'id': self.product.pk, 'nombre': 'Teclado disperso'}])
+        [sql] = self.product_selects(captured)
+        self.assertIn('"products_product"."nombre"', sql)
+        for column in ('precio', 'stock', 'activo', 'created_at'):
+            self.assertNotIn(f'"products_product"."{column}"', sql)
+
+    def test_detail_reads_only_the_requested_columns(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('product-detail', args=[self.product.pk]), {'fields': 'stock'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'stock': 3})
+        [sql] = self.product_selects(captured)
+        self.assertIn('"products_product"."stock"', sql)
+        for column in ('nombre', 'precio', 'activo'):
+            self.assertNotIn(f'"products_product"."{column}"', sql)
+
+    def test_unknown_field_returns_400(self):
+        response = self.client.get(reverse('product-list-create'), {'fields': 'id,proveedor'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'status': 'error', 'message': 'Campos no válidos: proveedor'})
+
+
+class ProductConditionalGetTests(TestCase):
+    """
+    Validadores HTTP del detalle (ETag y Last-Modified) y del listado (solo ETag): 304 mientras el
+    recurso no cambia y 200 después de una escritura.
+    """
+
+    def setUp(self):
+        self.product = Product.objects.create(nombre='Monitor condicional', precio=100, stock=5)
+        # Fecha anterior, para que Last-Modified cambie con la escritura aunque ocurra en el mismo segundo.
+        Product.objects.filter(pk=self.product.pk).update(last_update=timezone.now() - timedelta(hours=1))
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='condicional', email='condicional@example.com'))
+        self.detail_url = reverse('product-detail', args=[self.product.pk])
+        self.list_url = reverse('product-list-create')
+
+    def write(self, method, url, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(url, data, format='json')
+
+    def test_detail_returns_304_for_matching_validators(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, 200)
+
+        for header, value in (('HTTP_IF_NONE_MATCH', response['ETag']), ('HTTP_IF_MODIFIED_SINCE', response['Last-Modified'])):
+            with self.subTest(header):
+                self.assertEqual(self.client.get(self.detail_url, **{header: value}).status_code, 304)
+
+    def test_detail_returns_200_after_an_update(self):
+        first = self.client.get(self.detail_url)
+        self.assertEqual(self.write('patch', self.detail_url, {'stock': 6}).status_code, 200)
+
+        for header, value in (('HTTP_IF_NONE_MATCH', first['ETag']), ('HTTP_IF_MODIFIED_SINCE', first['Last-Modified'])):
+            with self.subTest(header):
+                response = self.client.get(self.detail_url, **{header: value})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data['stock'], 6)
+
+    def test_list_returns_304_until_a_create_or_delete(self):
+        first = self.client.get(self.list_url)
+        # El listado no tiene Last-Modified: una baja no cambia la fecha más reciente, solo el total.
+        self.assertNotIn('Last-Modified', first)
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        self.assertEqual(self.write('post', self.list_url, {'nombre': 'Nuevo', 'precio': '5.00', 'stock': 1}).status_code, 201)
+        after_create = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(after_create.status_code, 200)
+
+        self.assertEqual(self.write('delete', self.detail_url).status_code, 200)
+        after_delete = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=after_create['ETag'])
+        self.assertEqual(after_delete.status_code, 200)
+        self.assertEqual([item['nombre'] for item in after_delete.data['results']], ['Nuevo'])
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Recorrido del listado por cursor: sin duplicados ni saltos, también con empates en el orden.
+    """
+
+    def setUp(self):
+        # Los nombres largos se crean primero para que el orden por rank no coincida con el de id.
+        for index in range(4):
+            Product.objects.create(nombre=f'Cable empatado largo {index}', precio=20 + index, stock=1)
+        # Nombres repetidos: la búsqueda les asigna el mismo rank y el empate se resuelve por id.
+        for index in range(5):
+            Product.objects.create(nombre='Cable empatado', precio=10 + index, stock=index, activo=index % 2 == 0)
+        Product.objects.create(nombre='Mouse', precio=30, stock=1)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='cursor', email='cursor@example.com'))
+
+    def walk(self, url_name, params, page_size=2):
+        """
+        Recorre todas las páginas siguiendo ``next`` y devuelve los ids en el orden recibido.
+        """
+        ids, cursor = [], None
+        for _ in range(Product.objects.count() + 1):
+            query = {**params, 'page_size': page_size}
+            if cursor:
+                query['cursor'] = cursor
+            response = self.client.get(reverse(url_name), query)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), page_size)
+            ids.extend(item['id'] for item in response.data['results'])
+            cursor = response.data['next']
+            if cursor is None:
+                return ids
+        self.fail('El recorrido por cursor no terminó')
+
+    def test_walk_matches_the_unpaginated_order(self):
+        cases = (
+            ({}, list(Product.objects.order_by('id').values_list('id', flat=True))),
+            ({'activo': 'true', 'precio_min': '11'}, list(
+                Product.objects.filter(activo=True, precio__gte=11).order_by('id').values_list('id', flat=True)
+            )),
+        )
+        for url_name in ('product-list-create', 'product-list-async'):
+            for params, expected in cases:
+                with self.subTest(url_name, params=params):
+                    self.assertEqual(self.walk(url_name, params), expected)
+
+    def test_walk_with_search_keeps_ties_ordered_by_id(self):
+        tied = list(Product.objects.filter(nombre='Cable empatado').order_by('id').values_list('id', flat=True))
+        longer = set(Product.objects.filter(nombre__startswith='Cable empatado largo').values_list('id', flat=True))
+        for url_name in ('product-list-create', 'product-list-async'):
+            with self.subTest(url_name):
+                ids = self.walk(url_name, {'q': 'empatado'})
+
+                self.assertEqual(len(ids), len(set(ids)))
+                self.assertEqual(set(ids), set(tied) | longer)
+                # Los nombres más cortos puntúan más alto con bm25 y, entre ellos, el orden es por id.
+                self.assertEqual(ids[:len(tied)], tied)
+
+    def test_walk_with_search_and_filters(self):
+        expected = list(Product.objects.filter(nombre='Cable empatado', activo=False).order_by('id').values_list('id', flat=True))
+
+        ids = self.walk('product-list-create', {'q': 'empatado', 'activo': 'false'}, page_size=1)
+
+        self.assertEqual(ids, expected)
+
+    def test_malformed_cursor_returns_400(self):
+        encode = KeysetPagination.encode_cursor
+        cursors = {
+            'no es base64': '%%%',
+            'no es json': 'bm8gZXMganNvbg',
+            'no es un objeto': 'WzFd',
+            'id no entero': encode({'id': 'uno'}),
+            'sin rank con búsqueda': encode({'id': 1}),
+        }
+        for url_name in ('product-list-create', 'product-list-async'):
+            for label, cursor in cursors.items():
+                with self.subTest(url_name, cursor=label):
+                    params = {'cursor': cursor}
+                    if label == 'sin rank con búsqueda':
+                        params['q'] = 'empatado'
+                    response = self.client.get(reverse(url_name), params)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.data, {'status': 'error', 'message': 'El cursor proporcionado no es válido'})
+
+
+class ProductListCacheTests(TestCase):
+    """
+    Caché versionado del listado: contadores de aciertos y fallos, e invalidación por versión.
+    """
+
+    def setUp(self):
+        self.cache = ProductListCache(backend=LocMemCache('product-list-cache-tests', {}), timeout=60)
+        self.cache.backend.clear()
+
+    def test_get_or_set_counts_hits_and_misses(self):
+        loader = mock.Mock(return_value=['pagina'])
+
+        self.assertEqual(self.cache.get_or_set({'page_size': 2}, loader), ['pagina'])
+        self.assertEqual(self.cache.get_or_set({'page_size': 2}, loader), ['pagina'])
+        self.assertEqual(self.cache.get_or_set({'page_size': 3}, loader), ['pagina'])
+
+        self.assertEqual(loader.call_count, 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+        self.assertAlmostEqual(stats['hit_rate'], 1 / 3)
+
+        self.cache.reset_stats()
+        self.assertEqual(self.cache.stats()['hit_rate'], 0.0)
+
+    def test_bump_version_makes_the_next_read_miss(self):
+        loader = mock.Mock(side_effect=[['antes'], ['despues']])
+        self.cache.get_or_set({}, loader)
+        version = self.cache.get_version()
+
+        self.cache.bump_version()
+
+        self.assertEqual(self.cache.get_version(), version + 1)
+        self.assertEqual(self.cache.get_or_set({}, loader), ['despues'])
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+    def test_lost_version_does_not_reuse_old_pages(self):
+        self.cache.get_or_set({}, lambda: ['vieja'])
+        self.cache.backend.delete(ProductListCache.VERSION_KEY)
+
+        self.assertEqual(self.cache.get_or_set({}, lambda: ['nueva']), ['nueva'])
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'product-list-cache-invalidation-tests',
+}})
+class ProductListCacheInvalidationTests(TestCase):
+    """
+    Cada escritura sobre productos cambia la versión del catálogo: la siguiente lectura del listado falla en caché.
+    """
+
+    def setUp(self):
+        self.service = ProductService()
+        self.list_cache = self.service.repository.list_cache
+        self.list_cache.backend.clear()
+        self.product = Product.objects.create(nombre='Lámpara cacheada', precio=10, stock=5)
+
+    def read_names(self):
+        return [product.nombre for product in self.service.get_products_page(page_size=50).results]
+
+    def assert_write_invalidates(self, write, expected_names):
+        self.read_names()
+        before = self.list_cache.stats()
+        self.read_names()
+        self.assertEqual(self.list_cache.stats()['hits'], before['hits'] + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+
+        self.assertNotEqual(self.list_cache.stats()['version'], before['version'])
+        self.assertEqual(self.read_names(), expected_names)
+        self.assertEqual(self.list_cache.stats()['misses'], before['misses'] + 1)
+
+    def test_writes_bump_the_catalog_version(self):
+        edited = ['Lámpara editada', 'Nueva', 'Masiva']
+        writes = {
+            'create': (lambda: self.service.create_product({'nombre': 'Nueva', 'precio': 1, 'stock': 1}), ['Lámpara cacheada', 'Nueva']),
+            'update': (lambda: self.service.update_product(self.product.pk, {'nombre': 'Lámpara editada'}), ['Lámpara editada', 'Nueva']),
+            'bulk': (lambda: self.service.bulk_apply([{'nombre': 'Masiva', 'precio': 1, 'stock': 1}], [], []), edited),
+            'reserve': (lambda: self.service.reserve_stock(self.product.pk, 1), edited),
+            'reserve_many': (lambda: self.service.reserve_stock_many({self.product.pk: 1}), edited),
+            'release': (lambda: self.service.release_stock(self.product.pk, 2), edited),
+            'delete': (lambda: self.service.delete_product(self.product.pk), ['Nueva', 'Masiva']),
+        }
+        for label, (write, expected_names) in writes.items():
+            with self.subTest(label):
+                self.assert_write_invalidates(write, expected_names)
+
+    def test_stock_reservation_is_visible_in_the_next_page(self):
+        self.service.get_products_page(page_size=50)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.reserve_stock(self.product.pk, 2)
+
+        [product] = self.service.get_products_page(page_size=50).results
+        self.assertEqual(product.stock, 3)
+
+
+class ProductStatsBucketTests(TestCase):
+    """
+    El resumen del inventario se mantiene con cada escritura y coincide con un recálculo completo.
+    """
+
+    def setUp(self):
+        self.service = ProductService()
+        self.product = self.service.create_product({'nombre': 'Silla', 'precio': '80.00', 'stock': 4})
+
+    def assert_no_drift(self):
+        self.assertEqual(rebuild_buckets(fix=False), {})
+
+    def test_writes_keep_the_buckets_equal_to_a_fresh_compute(self):
+        other = self.service.create_product({'nombre': 'Escritorio', 'precio': '700.00', 'stock': 2, 'activo': False})
+        writes = {
+            'create': lambda: self.service.create_product({'nombre': 'Mesa', 'precio': '250.00', 'stock': 3}),
+            'price_bucket': lambda: self.service.update_product(self.product.pk, {'precio': '1200.00'}),
+            'activo': lambda: self.service.update_product(other.pk, {'activo': True}),
+            'reserve': lambda: self.service.reserve_stock(self.product.pk, 3),
+            'release': lambda: self.service.release_stock(self.product.pk, 1),
+            'reserve_many': lambda: self.service.reserve_stock_many({self.product.pk: 1, other.pk: 2}),
+            'bulk': lambda: self.service.bulk_apply(
+                [{'nombre': 'Lámpara', 'precio': '60000.00', 'stock': 1}],
+                [{'id': other.pk, 'precio': '5.00', 'stock': 9}],
+                [self.product.pk],
+            ),
+            'upsert': lambda: ProductImporter(method='upsert').run([(1, {'id': other.pk, 'nombre': 'Escritorio', 'precio': '15000.00', 'stock': 1})]),
+            'delete': lambda: self.service.delete_product(other.pk),
+        }
+        for label, write in writes.items():
+            with self.subTest(label):
+                write()
+                self.assert_no_drift()
+
+    def test_migration_builds_the_same_buckets_as_rebuild(self):
+        build_stats = import_module('api.products.migrations.0004_product_stats_bucket').build_stats
+        self.service.create_product({'nombre': 'Sofá', 'precio': '9999.99', 'stock': 2, 'activo': False})
+        ProductStatsBucket.objects.all().delete()
+
+        build_stats(django_apps, SimpleNamespace(connection=connection))
+
+        self.assert_no_drift()
+        self.assertEqual(ProductStatsBucket.objects.count(), 2 * len(PRICE_BUCKET_EDGES) * STATS_SHARDS)
+
+    def test_reconcile_check_reports_drift_without_fixing_it(self):
+        ProductStatsBucket.objects.filter(activo=True, bucket=0, shard=0).update(stock=F('stock') + 5)
+        out = io.StringIO()
+
+        with self.assertRaisesMessage(CommandError, '1 summary buckets drifted'):
+            call_command('reconcile_product_stats', '--check', stdout=out)
+
+        self.assertIn('active >= 0', out.getvalue())
+        self.assertIn('stock 9 -> 4', out.getvalue())
+        self.assertTrue(rebuild_buckets(fix=False))
+
+        call_command('reconcile_product_stats', stdout=io.StringIO())
+        out = io.StringIO()
+        call_command('reconcile_product_stats', '--check', stdout=out)
+        self.assertIn('No drift', out.getvalue())
+
+
+class ProductWriteQueriesTests(TestCase):
+    """
+    PATCH y DELETE del detalle: un solo UPDATE o DELETE sin leer antes el producto, y 404 si no existe.
+    """
+
+    def setUp(self):
+        self.product = ProductService().create_product({'nombre': 'Cámara', 'precio': '300.00', 'stock': 2})
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='escrituras', email='escrituras@example.com'))
+        self.missing_url = reverse('product-detail', args=[self.product.pk + 1000])
+
+    @staticmethod
+    def statements(captured):
+        """
+        Consultas ejecutadas, sin los SAVEPOINT que agrega ``transaction.atomic`` dentro de la prueba.
+        """
+        return [query['sql'] for query in captured if not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT'))]
+
+    def write(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as captured, self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(url, data, format='json')
+        return response, self.statements(captured)
+
+    def test_patch_issues_a_single_update(self):
+        response, statements = self.write('patch', reverse('product-detail', args=[self.product.pk]), {'nombre': 'Cámara nueva'})
+
+        self.assertEqual(response.status_code, 200)
+        [sql] = statements
+        self.assertTrue(sql.startswith('UPDATE "products_product"'), sql)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.nombre, 'Cámara nueva')
+
+    def test_patch_of_stats_fields_locks_before_updating(self):
+        response, statements = self.write('patch', reverse('product-detail', args=[self.product.pk]), {'stock': 5})
+
+        self.assertEqual(response.status_code, 200)
+        product_statements = [
+            sql.split()[0] for sql in statements
+            if sql.startswith(('SELECT "products_product"."id"', 'UPDATE "products_product" '))
+        ]
+        self.assertEqual(product_statements, ['SELECT', 'UPDATE'])
+        self.assertEqual(rebuild_buckets(fix=False), {})
+
+    def test_missing_product_returns_404_without_writing(self):
+        # Sin cambios en el resumen basta el UPDATE o el DELETE; con ellos, la lectura bloqueante corta antes.
+        cases = (('patch', {'nombre': 'Nada'}, 'UPDATE'), ('patch', {'precio': '1.00'}, 'SELECT'), ('delete', None, 'DELETE'))
+        for method, data, statement in cases:
+            with self.subTest(method, data=data):
+                response, statements = self.write(method, self.missing_url, data)
+
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual([sql.split()[0] for sql in statements], [statement])
+        self.assertEqual(Product.objects.count(), 1)
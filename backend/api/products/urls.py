@@ -1,10 +1,28 @@
 from django.urls import path
 from .views import (
     ProductListCreateAPIView,
-    ProductRetrieveUpdateDestroyAPIView
+    ProductRetrieveUpdateDestroyAPIView,
+    ProductBulkAPIView,
+    ProductExportAPIView,
+    ProductChangesAPIView,
+    ProductListAsyncAPIView,
+    ProductRetrieveAsyncAPIView,
+    ProductStatsAPIView,
+    ProductStockReserveAPIView,
+    ProductStockReleaseAPIView,
+    ProductStockBulkReserveAPIView,
 )
 
 urlpatterns = [
     path('', ProductListCreateAPIView.as_view(), name='product-list-create'),
+    path('bulk/', ProductBulkAPIView.as_view(), name='product-bulk'),
+    path('export/', ProductExportAPIView.as_view(), name='product-export'),
+    path('async/', ProductListAsyncAPIView.as_view(), name='product-list-async'),
+    path('async/<int:product_id>/', ProductRetrieveAsyncAPIView.as_view(), name='product-detail-async'),
+    path('changes/', ProductChangesAPIView.as_view(), name='product-changes'),
+    path('stats/', ProductStatsAPIView.as_view(), name='product-stats'),
+    path('reserve/', ProductStockBulkReserveAPIView.as_view(), name='product-stock-reserve-many'),
     path('<int:product_id>/', ProductRetrieveUpdateDestroyAPIView.as_view(), name='product-detail'),
+    path('<int:product_id>/reserve/', ProductStockReserveAPIView.as_view(), name='product-stock-reserve'),
+    path('<int:product_id>/release/', ProductStockReleaseAPIView.as_view(), name='product-stock-release'),
 ]
\ No newline at end of file
@@ -1,3 +1,4 @@
+from django.http import StreamingHttpResponse
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework.views import APIView
@@ -5,7 +6,25 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
-from .serializers import ProductSerializer, ProductUpdateSerializer
+from core.async_views import AsyncAPIView
+from core.conditional import conditional_get, make_etag, set_validators
+from core.fast_serializers import get_fast_serializer
+from core.fieldsets import InvalidFields, parse_fields
+
+from .exceptions import InsufficientStock
+from .changes import ExpiredCursor
+from .export import EXPORT_FORMATS
+from .pagination import InvalidCursor
+from .serializers import (
+    ProductSerializer,
+    ProductUpdateSerializer,
+    ProductBulkSerializer,
+    ProductBulkUpdateSerializer,
+    ProductChangesSerializer,
+    ProductStatsSerializer,
+    StockMovementSerializer,
+    StockReservationSerializer,
+)
 from .services import ProductService
 
 
@@ -21,7 +40,10 @@ class ProductListCreateAPIView(APIView):
         operation_description=(
             "Obtiene la lista de productos registrados en el sistema. "
             "Permite aplicar filtros opcionales como nombre, estado activo, "
-            "rango de precios y stock."
+            "rango de precios y stock.\n\n"
+            "Los resultados se paginan por cursor: la respuesta incluye `next`, "
+            "que debe enviarse en el parámetro `cursor` para obtener la siguiente página "
+            "(`null` cuando no hay más resultados)."
         ),
         manual_parameters=[
             openapi.Parameter(
@@ -30,6 +52,15 @@ class ProductListCreateAPIView(APIView):
                 description="Filtra productos por nombre (búsqueda parcial, sin distinción de mayúsculas).",
                 type=openapi.TYPE_STRING
             ),
+            openapi.Parameter(
+                'q',
+                openapi.IN_QUERY,
+                description=(
+                    "Búsqueda por nombre ordenada por relevancia (índice de trigramas en PostgreSQL, "
+                    "FTS5 en SQLite). Se combina con el resto de los filtros."
+                ),
+                type=openapi.TYPE_STRING
+            ),
             openapi.Parameter(
                 'activo',
                 openapi.IN_QUERY,
@@ -42,19 +73,78 @@ class ProductListCreateAPIView(APIView):
                 description="Filtra productos por cantidad exacta de stock.",
                 type=openapi.TYPE_INTEGER
             ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description="Cursor opaco devuelto en `next` por la página anterior.",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size',
+                openapi.IN_QUERY,
+                description="Cantidad de productos por página (limitada por el máximo configurado).",
+                type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'fields',
+                openapi.IN_QUERY,
+                description="Campos a devolver separados por coma, p. ej. `id,nombre,precio` (por defecto todos).",
+                type=openapi.TYPE_STRING
+            ),
         ],
         responses={
             200: openapi.Response(
-                description="Lista de productos obtenida correctamente.",
-                schema=ProductSerializer(many=True)
+                description="Página de productos obtenida correctamente.",
+                examples={
+                    "application/json": {
+                        "next": "eyJpZCI6NTB9",
+                        "results": [
+                            {
+                                "id": 1,
+                                "nombre": "Laptop Dell XPS 13",
+                                "precio": "25999.00",
+                                "stock": 15,
+                                "activo": True,
+                                "created": "2025-11-12T04:25:13Z",
+                                "last_update": "2025-11-12T04:25:13Z",
+                            }
+                        ],
+                    }
+                },
+            ),
+            304: openapi.Response(
+                description="La página no cambió desde la última consulta (If-None-Match)."
+            ),
+            400: openapi.Response(
+                description="Cursor o campos inválidos."
             ),
         },
     )
     
     def get(self, request):
-        products = self.service.get_all_products(request.query_params)
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
+        cursor = request.query_params.get('cursor')
+        page_size = request.query_params.get('page_size')
+        try:
+            fields = parse_fields(request.query_params.get('fields'), ProductSerializer)
+        except InvalidFields as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # El validador sale de un agregado barato; si el cliente ya tiene esta página se responde 304.
+        etag = self.service.get_products_list_etag(request.query_params, cursor, page_size, fields)
+        not_modified = conditional_get(request, etag)
+        if not_modified:
+            return not_modified
+
+        try:
+            page = self.service.get_products_page(request.query_params, cursor=cursor, page_size=page_size, fields=fields)
+        except InvalidCursor:
+            return Response({"status": "error", "message": "El cursor proporcionado no es válido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if self.service.fast_serialization:
+            results = page.results
+        else:
+            results = ProductSerializer(page.results, many=True, fields=fields).data
+        return set_validators(Response({"next": page.next_cursor, "results": results}), etag)
     
     @swagger_auto_schema(
         operation_summary="Crear un nuevo producto",
@@ -129,12 +219,24 @@ class ProductRetrieveUpdateDestroyAPIView(APIView):
                 type=openapi.TYPE_INTEGER,
                 required=True
             ),
+            openapi.Parameter(
+                'fields',
+                openapi.IN_QUERY,
+                description="Campos a devolver separados por coma, p. ej. `id,nombre,precio` (por defecto todos).",
+                type=openapi.TYPE_STRING
+            ),
         ],
         responses={
             200: openapi.Response(
                 description="Producto obtenido correctamente",
                 schema=ProductSerializer()
             ),
+            304: openapi.Response(
+                description="El producto no cambió desde la última consulta (If-None-Match / If-Modified-Since)"
+            ),
+            400: openapi.Response(
+                description="Campos inválidos"
+            ),
             404: openapi.Response(
                 description="Producto no encontrado"
             ),
@@ -142,9 +244,23 @@ class ProductRetrieveUpdateDestroyAPIView(APIView):
     )
     def get(self, request, product_id):
         """Obtiene un producto por su ID."""
-        product = self.service.get_product_by_id(product_id)
-        serializer = ProductSerializer(product)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        try:
+            fields = parse_fields(request.query_params.get('fields'), ProductSerializer)
+        except InvalidFields as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        product = self.service.get_product_by_id(product_id, fields=fields)
+
+        etag = make_etag('product', product.id, product.last_update, fields)
+        not_modified = conditional_get(request, etag, product.last_update)
+        if not_modified:
+            return not_modified
+
+        if self.service.fast_serialization:
+            data = get_fast_serializer(ProductSerializer, fields).serialize_instance(product)
+        else:
+            data = ProductSerializer(product, fields=fields).data
+        return set_validators(Response(data, status=status.HTTP_200_OK), etag, product.last_update)
     
 
     @swagger_auto_schema(
@@ -191,8 +307,7 @@ class ProductRetrieveUpdateDestroyAPIView(APIView):
         """Actualiza parcialmente un producto existente."""
         serializer = ProductUpdateSerializer(data=request.data, partial=True)
         if serializer.is_valid():
-            updated_product = self.service.update_product(product_id, serializer.validated_data)
-            response_serializer = ProductSerializer(updated_product)
+            self.service.update_product(product_id, serializer.validated_data)
             return Response({
                 "status": "success",
                 "message": "El producto ha sido actualizado correctamente",
@@ -240,4 +355,437 @@ class ProductRetrieveUpdateDestroyAPIView(APIView):
                 "message": f"El producto con ID {product_id} ha sido eliminado correctamente."
             },
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+
+class ProductBulkAPIView(APIView):
+    """
+    Altas, actualizaciones y bajas masivas de productos en una sola transacción.
+    Endpoint: /products/bulk/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = ProductService()
+
+    @swagger_auto_schema(
+        operation_summary="Operación masiva de productos",
+        operation_description=(
+            "Crea, actualiza parcialmente y elimina productos en una sola transacción.\n\n"
+            "Si algún elemento es inválido no se aplica ningún cambio y se devuelven los errores "
+            "por elemento, en el mismo orden en que se enviaron.\n\n"
+            "Ejemplo de cuerpo JSON:\n"
+            "```\n"
+            "{\n"
+            "  \"create\": [{\"nombre\": \"Mouse\", \"precio\": \"199.00\", \"stock\": 10}],\n"
+            "  \"update\": [{\"id\": 5, \"stock\": 3}],\n"
+            "  \"delete\": [7, 8]\n"
+            "}\n"
+            "```"
+        ),
+        request_body=ProductBulkSerializer,
+        responses={
+            200: openapi.Response(
+                description="Operación aplicada, devuelve el resultado de cada elemento",
+                examples={
+                    "application/json": {
+                        "status": "success",
+                        "results": [
+                            {"action": "create", "index": 0, "id": 21, "status": "created"},
+                            {"action": "update", "index": 0, "id": 5, "status": "updated"},
+                            {"action": "delete", "index": 0, "id": 7, "status": "deleted"},
+                            {"action": "delete", "index": 1, "id": 8, "status": "not_found"},
+                        ],
+                    }
+                },
+            ),
+            400: openapi.Response(
+                description="Estructura inválida, límite de elementos excedido o errores de validación por elemento"
+            ),
+        },
+    )
+    def post(self, request):
+        serializer = ProductBulkSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        create_serializer = ProductSerializer(data=serializer.validated_data['create'], many=True)
+        update_serializer = ProductBulkUpdateSerializer(
+            data=serializer.validated_data['update'], many=True, partial=True
+        )
+        create_valid = create_serializer.is_valid()
+        update_valid = update_serializer.is_valid()
+        if not (create_valid and update_valid):
+            return Response(
+                {
+                    "status": "error",
+                    "message": "Algunos elementos no son válidos, no se aplicó ningún cambio",
+                    "errors": {
+                        "create": create_serializer.errors if not create_valid else [],
+                        "update": update_serializer.errors if not update_valid else [],
+                    },
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = self.service.bulk_apply(
+            create_serializer.validated_data,
+            update_serializer.validated_data,
+            serializer.validated_data['delete'],
+        )
+        return Response({"status": "success", "results": results}, status=status.HTTP_200_OK)
+
+
+class ProductExportAPIView(APIView):
+    """
+    Exportación completa del catálogo, transmitida fila por fila.
+    Endpoint: /products/export/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = ProductService()
+
+    @swagger_auto_schema(
+        operation_summary="Exportar productos",
+        operation_description=(
+            "Transmite todos los productos que cumplen los filtros como NDJSON (un objeto JSON por línea) "
+            "o CSV. Acepta los mismos filtros que el listado y no tiene paginación: la respuesta se "
+            "genera por lotes, sin cargar el catálogo completo en memoria."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                'formato',
+                openapi.IN_QUERY,
+                description="Formato de salida: ndjson (por defecto) o csv.",
+                type=openapi.TYPE_STRING,
+                enum=list(EXPORT_FORMATS),
+            ),
+            openapi.Parameter('nombre', openapi.IN_QUERY, description="Filtra por nombre (búsqueda parcial).", type=openapi.TYPE_STRING),
+            openapi.Parameter('q', openapi.IN_QUERY, description="Búsqueda por nombre ordenada por relevancia.", type=openapi.TYPE_STRING),
+            openapi.Parameter('activo', openapi.IN_QUERY, description="Filtra por estado activo (true/false).", type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('precio_min', openapi.IN_QUERY, description="Precio mínimo.", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('precio_max', openapi.IN_QUERY, description="Precio máximo.", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('stock', openapi.IN_QUERY, description="Filtra por cantidad exacta de stock.", type=openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: openapi.Response(description="Catálogo exportado (application/x-ndjson o text/csv)"),
+            400: openapi.Response(description="Formato de exportación no soportado"),
+        },
+    )
+    def get(self, request):
+        export_format = request.query_params.get('formato', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"status": "error", "message": f"Formato no soportado. Opciones: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = self.service.export_products(request.query_params, export_format)
+        response = StreamingHttpResponse(rows, content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="products.{export_format}"'
+        return response
+
+
+class ProductListAsyncAPIView(AsyncAPIView):
+    """
+    Variante asíncrona del listado de productos, para despliegues ASGI.
+    Endpoint: /products/async/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = ProductService()
+
+    @swagger_auto_schema(
+        operation_summary="Listar productos (async)",
+        operation_description=(
+            "Mismo resultado, filtros, paginación y validadores que `GET /products/`, atendido con el ORM "
+            "asíncrono: bajo ASGI la petición no ocupa un hilo mientras espera a la base de datos."
+        ),
+        manual_parameters=[
+            openapi.Parameter('nombre', openapi.IN_QUERY, description="Filtra por nombre (búsqueda parcial).", type=openapi.TYPE_STRING),
+            openapi.Parameter('q', openapi.IN_QUERY, description="Búsqueda por nombre ordenada por relevancia.", type=openapi.TYPE_STRING),
+            openapi.Parameter('activo', openapi.IN_QUERY, description="Filtra por estado activo (true/false).", type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('stock', openapi.IN_QUERY, description="Filtra por cantidad exacta de stock.", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Cursor opaco devuelto en `next` por la página anterior.", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Cantidad de productos por página.", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('fields', openapi.IN_QUERY, description="Campos a devolver separados por coma.", type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: ProductSerializer(many=True),
+            304: openapi.Response(description="La página no cambió desde la última consulta (If-None-Match)."),
+            400: openapi.Response(description="Cursor o campos inválidos."),
+        },
+    )
+    async def get(self, request):
+        cursor = request.query_params.get('cursor')
+        page_size = request.query_params.get('page_size')
+        try:
+            fields = parse_fields(request.query_params.get('fields'), ProductSerializer)
+        except InvalidFields as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag = await self.service.aget_products_list_etag(request.query_params, cursor, page_size, fields)
+        not_modified = conditional_get(request, etag)
+        if not_modified:
+            return not_modified
+
+        try:
+            page = await self.service.aget_products_page(request.query_params, cursor=cursor, page_size=page_size, fields=fields)
+        except InvalidCursor:
+            return Response({"status": "error", "message": "El cursor proporcionado no es válido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if self.service.fast_serialization:
+            results = page.results
+        else:
+            results = ProductSerializer(page.results, many=True, fields=fields).data
+        return set_validators(Response({"next": page.next_cursor, "results": results}), etag)
+
+
+class ProductRetrieveAsyncAPIView(AsyncAPIView):
+    """
+    Variante asíncrona del detalle de un producto, para despliegues ASGI.
+    Endpoint: /products/async/<int:product_id>/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = ProductService()
+
+    @swagger_auto_schema(
+        operation_summary="Obtener producto por ID (async)",
+        operation_description="Mismo resultado que `GET /products/<id>/`, atendido con el ORM asíncrono.",
+        manual_parameters=[
+            openapi.Parameter('product_id', openapi.IN_PATH, description="ID del producto.", type=openapi.TYPE_INTEGER, required=True),
+            openapi.Parameter('fields', openapi.IN_QUERY, description="Campos a devolver separados por coma.", type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: ProductSerializer,
+            304: openapi.Response(description="El producto no cambió desde la última consulta."),
+            400: openapi.Response(description="Campos inválidos"),
+            404: openapi.Response(description="Producto no encontrado"),
+        },
+    )
+    async def get(self, request, product_id):
+        try:
+            fields = parse_fields(request.query_params.get('fields'), ProductSerializer)
+        except InvalidFields as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        product = await self.service.aget_product_by_id(product_id, fields=fields)
+
+        etag = make_etag('product', product.id, product.last_update, fields)
+        not_modified = conditional_get(request, etag, product.last_update)
+        if not_modified:
+            return not_modified
+
+        if self.service.fast_serialization:
+            data = get_fast_serializer(ProductSerializer, fields).serialize_instance(product)
+        else:
+            data = ProductSerializer(product, fields=fields).data
+        return set_validators(Response(data, status=status.HTTP_200_OK), etag, product.last_update)
+
+
+class ProductChangesAPIView(APIView):
+    """
+    Feed de cambios del catálogo para clientes que lo replican.
+    Endpoint: /products/changes/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = ProductService()
+
+    @swagger_auto_schema(
+        operation_summary="Cambios de productos desde un cursor",
+        operation_description=(
+            "Devuelve los productos creados o modificados (`upsert`) y los eliminados (`delete`) después del "
+            "cursor `since`, ordenados por fecha. Sin `since` se recorre el catálogo completo. Mientras "
+            "`has_more` sea true se pide la página siguiente con `next`; al terminar, `next` se guarda para la "
+            "próxima sincronización. Si el cursor es anterior a la retención de bajas se responde 410 y el "
+            "cliente debe volver a sincronizar desde cero."
+        ),
+        manual_parameters=[
+            openapi.Parameter('since', openapi.IN_QUERY, description="Cursor `next` de la consulta anterior.", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Cantidad de cambios por página.", type=openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: ProductChangesSerializer,
+            400: openapi.Response(description="Cursor inválido"),
+            410: openapi.Response(description="Cursor vencido: hay que sincronizar el catálogo completo"),
+        },
+    )
+    def get(self, request):
+        try:
+            page = self.service.get_changes(request.query_params.get('since'), request.query_params.get('page_size'))
+        except ExpiredCursor as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_410_GONE)
+        except InvalidCursor:
+            return Response({"status": "error", "message": "El cursor proporcionado no es válido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = ProductChangesSerializer({"next": page.next_cursor, "has_more": page.has_more, "results": page.changes})
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ProductStatsAPIView(APIView):
+    """
+    Estadísticas del inventario, leídas de un resumen de tamaño fijo.
+    Endpoint: /products/stats/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = ProductService()
+
+    @swagger_auto_schema(
+        operation_summary="Estadísticas del inventario",
+        operation_description=(
+            "Devuelve la cantidad de productos (activos e inactivos), el stock total, el valor del inventario "
+            "(precio × stock) y un histograma de precios. Los valores se mantienen con cada escritura, así que "
+            "el tiempo de respuesta no depende del tamaño del catálogo."
+        ),
+        responses={
+            200: ProductStatsSerializer,
+        },
+    )
+    def get(self, request):
+        serializer = ProductStatsSerializer(self.service.get_stats())
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ProductStockReserveAPIView(APIView):
+    """
+    Reserva stock de un producto con un único UPDATE condicional.
+    Endpoint: /products/<int:product_id>/reserve/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = ProductService()
+
+    @swagger_auto_schema(
+        operation_summary="Reservar stock de un producto",
+        operation_description=(
+            "Descuenta `cantidad` unidades del stock del producto solo si hay existencia suficiente. "
+            "La operación es atómica, por lo que reservaciones concurrentes nunca dejan el stock negativo."
+        ),
+        request_body=StockMovementSerializer,
+        responses={
+            200: openapi.Response(
+                description="Stock reservado, devuelve el stock resultante",
+                examples={"application/json": {"status": "success", "data": {"id": 5, "stock": 12}}},
+            ),
+            400: openapi.Response(description="Cantidad inválida"),
+            404: openapi.Response(description="Producto no encontrado"),
+            409: openapi.Response(description="Stock insuficiente"),
+        },
+    )
+    def post(self, request, product_id):
+        serializer = StockMovementSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            stock = self.service.reserve_stock(product_id, serializer.validated_data['cantidad'])
+        except InsufficientStock as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_409_CONFLICT)
+
+        return Response({"status": "success", "data": {"id": product_id, "stock": stock}}, status=status.HTTP_200_OK)
+
+
+class ProductStockReleaseAPIView(APIView):
+    """
+    Libera (devuelve) stock de un producto.
+    Endpoint: /products/<int:product_id>/release/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = ProductService()
+
+    @swagger_auto_schema(
+        operation_summary="Liberar stock de un producto",
+        operation_description="Suma `cantidad` unidades al stock del producto de forma atómica.",
+        request_body=StockMovementSerializer,
+        responses={
+            200: openapi.Response(
+                description="Stock liberado, devuelve el stock resultante",
+                examples={"application/json": {"status": "success", "data": {"id": 5, "stock": 14}}},
+            ),
+            400: openapi.Response(description="Cantidad inválida"),
+            404: openapi.Response(description="Producto no encontrado"),
+        },
+    )
+    def post(self, request, product_id):
+        serializer = StockMovementSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        stock = self.service.release_stock(product_id, serializer.validated_data['cantidad'])
+        return Response({"status": "success", "data": {"id": product_id, "stock": stock}}, status=status.HTTP_200_OK)
+
+
+class ProductStockBulkReserveAPIView(APIView):
+    """
+    Reserva stock de varios productos en una sola transacción (todo o nada).
+    Endpoint: /products/reserve/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = ProductService()
+
+    @swagger_auto_schema(
+        operation_summary="Reservar stock de varios productos",
+        operation_description=(
+            "Reserva todas las cantidades indicadas o ninguna. Los productos se bloquean en orden "
+            "de ID para evitar interbloqueos entre reservaciones concurrentes.\n\n"
+            "Ejemplo de cuerpo JSON:\n"
+            "```\n"
+            "{\"items\": [{\"id\": 5, \"cantidad\": 2}, {\"id\": 9, \"cantidad\": 1}]}\n"
+            "```"
+        ),
+        request_body=StockReservationSerializer,
+        responses={
+            200: openapi.Response(
+                description="Stock reservado, devuelve el stock resultante de cada producto",
+                examples={
+                    "application/json": {
+                        "status": "success",
+                        "data": [{"id": 5, "stock": 12}, {"id": 9, "stock": 0}],
+                    }
+                },
+            ),
+            400: openapi.Response(description="Datos inválidos"),
+            404: openapi.Response(description="Algún producto no existe"),
+            409: openapi.Response(description="Algún producto no tiene stock suficiente"),
+        },
+    )
+    def post(self, request):
+        serializer = StockReservationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = {item['id']: item['cantidad'] for item in serializer.validated_data['items']}
+        try:
+            stocks = self.service.reserve_stock_many(items)
+        except InsufficientStock as e:
+            return Response(
+                {"status": "error", "message": str(e), "id": e.product_id},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(
+            {"status": "success", "data": [{"id": pk, "stock": stock} for pk, stock in stocks.items()]},
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,199 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.caching import is_shared_cache
+
+
+class UserCache:
+    """
+    Caché de los usuarios que resuelve la autenticación JWT, por id y en dos niveles:
+
+    - memoria del proceso, con un TTL corto (``AUTH_USER_CACHE_LOCAL_TIMEOUT``) y un máximo de entradas;
+    - el caché compartido de Django (``AUTH_USER_CACHE_TIMEOUT``), para que los demás procesos
+      no tengan que consultar la base de datos. Solo se usa si el backend lo comparten todos los
+      procesos: con la memoria local un worker no vería las invalidaciones de los demás.
+
+    Las escrituras sobre usuarios llaman a ``invalidate``, que borra la entrada en este proceso e
+    incrementa la generación del usuario en el caché compartido. Cada entrada compartida guarda la
+    generación que se leyó antes de consultar la base de datos; si no coincide con la actual se
+    descarta, así una petición que leyó el usuario antes de una escritura no puede dejar guardada
+    la copia vieja. Los demás procesos pueden ver el valor anterior hasta que venza su TTL local.
+    """
+
+    KEY = 'users:auth:{}'
+    GENERATION_KEY = 'users:auth:generation:{}'
+
+    def __init__(self, backend=None, timeout=None, local_timeout=None, max_local_entries=10_000):
+        self.backend = backend or cache
+        self.timeout = settings.AUTH_USER_CACHE_TIMEOUT if timeout is None else timeout
+        self.local_timeout = settings.AUTH_USER_CACHE_LOCAL_TIMEOUT if local_timeout is None else local_timeout
+        self.shared = self.timeout > 0 and is_shared_cache(self.backend)
+        self.max_local_entries = max_local_entries
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        # Invalidaciones en este proceso: una lectura que empezó antes de una no se guarda en memoria.
+        self._invalidations = 0
+        self._counters = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.shared or self.local_timeout > 0
+
+    def get(self, user_id, loader):
+        """
+        Devuelve el usuario (una copia, para que los cambios de una petición no lleguen a otra)
+        o lo obtiene con ``loader``, que debe lanzar una excepción si el usuario no existe.
+        """
+        if not self.enabled:
+            return loader()
+
+        user = self._get_local(user_id)
+        if user is not None:
+            return user
+
+        invalidations = self._invalidations
+        generation = None
+        if self.shared:
+            keys = (self.KEY.format(user_id), self.GENERATION_KEY.format(user_id))
+            entry, generation = self._shared_entry(self.backend.get_many(keys), keys)
+            if entry is not None:
+                self._count('shared_hits')
+                user = entry
+            elif generation is None:
+                generation = self._new_generation(keys[1])
+        if user is None:
+            self._count('misses')
+            user = loader()
+            if self.shared:
+                self.backend.set(self.KEY.format(user_id), (generation, user), timeout=self.timeout)
+
+        self._set_local(user_id, user, invalidations)
+        return copy.copy(user)
+
+    async def aget(self, user_id, loader):
+        """
+        Versión asíncrona de ``get``; ``loader`` es una corrutina. El acierto en memoria no sale del event loop.
+        """
+        if not self.enabled:
+            return await loader()
+
+        user = self._get_local(user_id)
+        if user is not None:
+            return user
+
+        invalidations = self._invalidations
+        generation = None
+        if self.shared:
+            keys = (self.KEY.format(user_id), self.GENERATION_KEY.format(user_id))
+            entry, generation = self._shared_entry(await self.backend.aget_many(keys), keys)
+            if entry is not None:
+                self._count('shared_hits')
+                user = entry
+            elif generation is None:
+                generation = await self._anew_generation(keys[1])
+        if user is None:
+            self._count('misses')
+            user = await loader()
+            if self.shared:
+                await self.backend.aset(self.KEY.format(user_id), (generation, user), timeout=self.timeout)
+
+        self._set_local(user_id, user, invalidations)
+        return copy.copy(user)
+
+    def invalidate(self, user_id):
+        """
+        Borra la entrada del usuario al confirmarse la transacción en curso (o de inmediato si no hay una).
+        """
+        transaction.on_commit(lambda: self._invalidate_now(user_id))
+
+    def stats(self) -> dict:
+        """
+        Contadores de este proceso y su tasa de aciertos (en memoria y en el caché compartido).
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            counters['local_entries'] = len(self._local)
+        total = counters['local_hits'] + counters['shared_hits'] + counters['misses']
+        counters['hit_rate'] = (counters['local_hits'] + counters['shared_hits']) / total if total else 0.0
+        return counters
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def _invalidate_now(self, user_id):
+        with self._lock:
+            self._local.pop(str(user_id), None)
+            self._invalidations += 1
+        if self.shared:
+            try:
+                self.backend.incr(self.GENERATION_KEY.format(user_id))
+            except ValueError:
+                self._new_generation(self.GENERATION_KEY.format(user_id))
+            self.backend.delete(self.KEY.format(user_id))
+
+    @staticmethod
+    def _shared_entry(values, keys):
+        """
+        Devuelve ``(usuario, generación)``; el usuario es None si no hay entrada o es de otra generación.
+        """
+        entry, generation = values.get(keys[0]), values.get(keys[1])
+        if entry is None or generation is None or entry[0] != generation:
+            return None, generation
+        return entry[1], generation
+
+    def _new_generation(self, key):
+        # Igual que la versión del catálogo: si se perdió se parte de un valor nuevo basado en el
+        # tiempo, distinto de cualquiera que tenga guardado una entrada anterior.
+        self.backend.add(key, time.time_ns(), timeout=None)
+        return self.backend.get(key)
+
+    async def _anew_generation(self, key):
+        await self.backend.aadd(key, time.time_ns(), timeout=None)
+        return await self.backend.aget(key)
+
+    def _get_local(self, user_id):
+        if self.local_timeout <= 0:
+            return None
+        with self._lock:
+            entry = self._local.get(str(user_id))
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._local[str(user_id)]
+                return None
+            self._local.move_to_end(str(user_id))
+            self._counters['local_hits'] += 1
+        return copy.copy(user)
+
+    def _set_local(self, user_id, user, invalidations):
+        if self.local_timeout <= 0:
+            return
+        with self._lock:
+            if invalidations != self._invalidations:
+                return
+            # El id llega como entero desde el repositorio y puede llegar como texto desde el token.
+            self._local[str(user_id)] = (time.monotonic() + self.local_timeout, user)
+            self._local.move_to_end(str(user_id))
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+
+# Una instancia por proceso: el nivel en memoria se comparte entre todas las peticiones.
+user_cache = UserCache()
@@ -0,0 +1,11 @@
+class DuplicateEmail(Exception):
+    """
+    Se lanza cuando otro usuario ya tiene el email (sin distinguir mayúsculas). El serializer lo valida
+    antes, pero dos peticiones simultáneas pueden pasar ambas esa validación; el índice único
+    ``users_user_email_lower_uniq`` rechaza la segunda al escribir.
+    """
+
+    message = "Ya existe un usuario con este email."
+
+    def __init__(self):
+        super().__init__(self.message)
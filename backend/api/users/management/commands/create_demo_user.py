@@ -37,7 +37,7 @@ class Command(BaseCommand):
             )
             return
 
-        if User.objects.filter(email=email).exists():
+        if User.objects.filter_by_email(email).exists():
             self.stdout.write(
                 self.style.WARNING(f'Demo user with email "{email}" already exists')
             )
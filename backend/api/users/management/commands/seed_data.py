@@ -0,0 +1,169 @@
+import itertools
+import json
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+
+from api.products.models import Product
+from api.products.repository import ProductRepository
+from api.products.search import deferred_search_index, restore_search_index
+from api.products.seeding import ProductProfile, generate_product_rows, insert_product_rows
+from api.users.models import User
+from api.users.seeding import UserProfile, generate_user_rows, insert_user_rows
+from core.bulk_insert import INSERT_METHODS, default_insert_method, deferred_indexes, prepare_bulk_load, restore_indexes
+
+# Listas del vocabulario que se pueden reemplazar con --vocabulary.
+PRODUCT_VOCABULARY = ('product_types', 'brands', 'attributes')
+USER_VOCABULARY = ('first_names', 'last_names', 'email_domains')
+
+PRODUCT_DEFAULTS = ProductProfile()
+USER_DEFAULTS = UserProfile()
+
+
+def decimal_argument(value):
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(value)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate realistic users and products in bulk with deterministic seeds and configurable '
+        'distributions, to reproduce production-sized tables locally'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=0, help='Users to insert (default: 0)')
+        parser.add_argument('--products', type=int, default=0, help='Products to insert (default: 0)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, same seed gives the same data (default: 0)')
+        parser.add_argument('--batch-size', type=int, default=50_000, help='Rows per transaction (default: 50000)')
+        parser.add_argument(
+            '--method',
+            choices=['auto', *INSERT_METHODS],
+            default='auto',
+            help='Insert method: COPY (PostgreSQL only), executemany or bulk_create (default: copy on PostgreSQL, executemany otherwise)'
+        )
+        parser.add_argument(
+            '--password',
+            default='12345',
+            help='Password shared by every generated user, hashed once (default: 12345)'
+        )
+        parser.add_argument(
+            '--vocabulary',
+            help=f'JSON file with lists replacing the built-in vocabulary: {", ".join(PRODUCT_VOCABULARY + USER_VOCABULARY)}'
+        )
+
+        products = parser.add_argument_group('product distributions')
+        products.add_argument('--price-distribution', choices=['lognormal', 'uniform'], default='lognormal')
+        products.add_argument('--price-min', type=decimal_argument, default=PRODUCT_DEFAULTS.price_min)
+        products.add_argument('--price-max', type=decimal_argument, default=PRODUCT_DEFAULTS.price_max)
+        products.add_argument('--price-median', type=decimal_argument, default=PRODUCT_DEFAULTS.price_median,
+                              help='Median price of the lognormal distribution (default: %(default)s)')
+        products.add_argument('--price-sigma', type=float, default=PRODUCT_DEFAULTS.price_sigma,
+                              help='Spread of the lognormal distribution (default: %(default)s)')
+        products.add_argument('--stock-distribution', choices=['uniform', 'exponential'], default='uniform')
+        products.add_argument('--stock-max', type=int, default=PRODUCT_DEFAULTS.stock_max,
+                              help='Upper bound of the uniform stock (default: %(default)s)')
+        products.add_argument('--stock-mean', type=float, default=PRODUCT_DEFAULTS.stock_mean,
+                              help='Mean of the exponential stock (default: %(default)s)')
+        products.add_argument('--out-of-stock-ratio', type=float, default=PRODUCT_DEFAULTS.out_of_stock_ratio)
+        products.add_argument('--product-active-ratio', type=float, default=PRODUCT_DEFAULTS.active_ratio)
+
+        users = parser.add_argument_group('user distributions')
+        users.add_argument('--user-active-ratio', type=float, default=USER_DEFAULTS.active_ratio)
+        users.add_argument('--age-min', type=int, default=USER_DEFAULTS.age_min)
+        users.add_argument('--age-max', type=int, default=USER_DEFAULTS.age_max)
+        users.add_argument('--missing-age-ratio', type=float, default=USER_DEFAULTS.missing_age_ratio)
+
+    def handle(self, *args, **options):
+        if options['users'] <= 0 and options['products'] <= 0:
+            raise CommandError('Pass --users and/or --products')
+        method = default_insert_method() if options['method'] == 'auto' else options['method']
+        vocabulary = self.load_vocabulary(options['vocabulary'])
+        now = timezone.now()
+        prepare_bulk_load()
+
+        if options['users'] > 0:
+            profile = UserProfile(
+                active_ratio=options['user_active_ratio'],
+                age_min=options['age_min'],
+                age_max=options['age_max'],
+                missing_age_ratio=options['missing_age_ratio'],
+                **{name: vocabulary[name] for name in USER_VOCABULARY if name in vocabulary},
+            )
+            # Los números de username y email siguen al último id, así una segunda carga no choca con la primera.
+            offset = (User.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+            rows = generate_user_rows(
+                options['users'], make_password(options['password']),
+                seed=options['seed'], offset=offset, profile=profile, now=now,
+            )
+            self.load('users', rows, insert_user_rows, method, options['batch_size'])
+
+        if options['products'] > 0:
+            profile = ProductProfile(
+                price_distribution=options['price_distribution'],
+                price_min=options['price_min'],
+                price_max=options['price_max'],
+                price_median=options['price_median'],
+                price_sigma=options['price_sigma'],
+                stock_distribution=options['stock_distribution'],
+                stock_max=options['stock_max'],
+                stock_mean=options['stock_mean'],
+                out_of_stock_ratio=options['out_of_stock_ratio'],
+                active_ratio=options['product_active_ratio'],
+                **{name: vocabulary[name] for name in PRODUCT_VOCABULARY if name in vocabulary},
+            )
+            rows = generate_product_rows(options['products'], seed=options['seed'], profile=profile, now=now)
+            # Una carga anterior que se interrumpió pudo dejar sin crear el índice de búsqueda o los índices.
+            restored = restore_indexes(Product) + (['search index'] if restore_search_index() else [])
+            if restored:
+                self.stdout.write(self.style.WARNING(f'Restored after an interrupted load: {", ".join(restored)}'))
+
+            # Los índices y el índice de búsqueda se arman al final, de una vez (ver deferred_indexes
+            # y deferred_search_index).
+            started = time.perf_counter()
+            with deferred_search_index(), deferred_indexes(Product):
+                inserted = self.load('products', rows, insert_product_rows, method, options['batch_size'])
+                indexing = time.perf_counter()
+            finished = time.perf_counter()
+            elapsed = finished - started
+            self.stdout.write(self.style.SUCCESS(
+                f'Indexes rebuilt in {finished - indexing:.1f}s, '
+                f'{inserted} products loaded and indexed in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/s)'
+            ))
+            ProductRepository().catalog_changed()
+
+    def load(self, name, rows, insert, method, batch_size):
+        started = time.perf_counter()
+        inserted = 0
+        while batch := list(itertools.islice(rows, batch_size)):
+            inserted += insert(batch, method)
+            self.stdout.write(f'{name}: {inserted} rows', ending='\r')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Inserted {inserted} {name} in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/s) using {method}'
+        ))
+        return inserted
+
+    @staticmethod
+    def load_vocabulary(path):
+        if not path:
+            return {}
+        try:
+            with open(path, encoding='utf-8') as file:
+                vocabulary = json.load(file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read the vocabulary {path}: {e}')
+
+        known = PRODUCT_VOCABULARY + USER_VOCABULARY
+        for name, words in vocabulary.items():
+            if name not in known:
+                raise CommandError(f'Unknown vocabulary list {name}, expected one of {", ".join(known)}')
+            if not isinstance(words, list) or not words or not all(isinstance(word, str) and word for word in words):
+                raise CommandError(f'Vocabulary list {name} must be a non-empty list of strings')
+        return {name: tuple(words) for name, words in vocabulary.items()}
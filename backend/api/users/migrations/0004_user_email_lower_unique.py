@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:46
+
+import api.users.models
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """
+    Antes de crear el índice único informa los emails repetidos (sin distinguir mayúsculas) con los
+    ids de sus usuarios; hay que corregirlos a mano, la migración no elige cuál conservar.
+    """
+    User = apps.get_model('users', 'User')
+    duplicates = list(
+        User.objects
+        .exclude(email='')
+        .annotate(email_lower=Lower('email'))
+        .values('email_lower')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .order_by('-total', 'email_lower')
+    )
+    if not duplicates:
+        return
+
+    lines = []
+    for row in duplicates[:50]:
+        ids = list(
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower=row['email_lower'])
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+        lines.append(f"  {row['email_lower']}: usuarios {', '.join(map(str, ids))}")
+    if len(duplicates) > 50:
+        lines.append(f'  ... y {len(duplicates) - 50} emails más')
+    raise RuntimeError(
+        f'Hay {len(duplicates)} emails repetidos (sin distinguir mayúsculas); cambie o vacíe el email '
+        'de los usuarios sobrantes y vuelva a ejecutar migrate:\n' + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0003_user_created_at'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', api.users.models.UserManager()),
+            ],
+        ),
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='users_user_email_lower_uniq'),
+        ),
+    ]
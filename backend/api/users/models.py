@@ -1,5 +1,26 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as DjangoUserManager
+from django.db.models.functions import Lower
+
+
+class UserManager(DjangoUserManager):
+
+    def filter_by_email(self, email):
+        """
+        Usuarios con ese email sin distinguir mayúsculas. La consulta repite la expresión y la
+        condición del índice único ``users_user_email_lower_uniq`` para que la base de datos lo use
+        (con ``email__iexact`` se compararía ``UPPER(email)`` y se recorrería la tabla).
+        """
+        return (
+            self.get_queryset()
+            .alias(email_lower=Lower('email'))
+            .filter(email_lower=Lower(models.Value(email)))
+            .exclude(email='')
+        )
+
+    def get_by_email(self, email):
+        return self.filter_by_email(email).get()
+
 
 class User(AbstractUser):
     """
@@ -11,5 +32,17 @@ class User(AbstractUser):
 
     # se puede agrega mas campos si se requiere
 
+    objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Un email por usuario sin distinguir mayúsculas; los usuarios sin email (blank) quedan fuera.
+            models.UniqueConstraint(
+                Lower('email'),
+                condition=~models.Q(email=''),
+                name='users_user_email_lower_uniq',
+            ),
+        ]
+
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return self.username
@@ -1,13 +1,50 @@
-from django.shortcuts import get_object_or_404
+import contextlib
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Count, Max
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.utils import timezone
+from .cache import user_cache
+from .exceptions import DuplicateEmail
 from .models import User
 
+# Índice único de ``User.Meta.constraints`` sobre ``LOWER(email)``.
+EMAIL_CONSTRAINT = 'users_user_email_lower_uniq'
+
+
+@contextlib.contextmanager
+def unique_email(using='default'):
+    """
+    Convierte la violación del índice único de email en ``DuplicateEmail``; el resto de los errores
+    de integridad se propaga. Dentro de una transacción se usa un savepoint para que siga siendo usable;
+    fuera de ella (autocommit) cada sentencia ya es su propia transacción y no hace falta.
+    """
+    in_transaction = connections[using].in_atomic_block
+    try:
+        with transaction.atomic(using=using) if in_transaction else contextlib.nullcontext():
+            yield
+    except IntegrityError as e:
+        if EMAIL_CONSTRAINT in str(e):
+            raise DuplicateEmail() from e
+        raise
+
+
 class UserRepository:
     """
     La clase UserRepository es responsable de todas las operaciones de la base de datos relacionado con el modelo de Usuario.
     """
 
-    def get_all_users(self, filters=None):
+    # Campos que se pueden modificar al actualizar un usuario.
+    UPDATABLE_FIELDS = ('username', 'first_name', 'last_name', 'email', 'age')
+
+    def get_all_users(self, filters=None, only=None):
+        """
+        Devuelve el queryset filtrado y ordenado. Con ``only`` se leen solo esas columnas (y el id).
+        """
         queryset = User.objects.all()
+        if only:
+            queryset = queryset.only(*only)
         if filters:
             if 'username' in filters:
                 queryset = queryset.filter(username__icontains=filters['username'])
@@ -31,34 +68,74 @@ class UserRepository:
             
         return queryset.order_by('id')
 
+    def get_list_state(self, filters=None):
+        """
+        Obtiene ``MAX(last_update)`` y el total del listado filtrado, usados como validador del listado.
+        """
+        return self.get_all_users(filters).order_by().aggregate(
+            last_update=Max('last_update'),
+            total=Count('id'),
+        )
+
+    async def aget_list_state(self, filters=None):
+        return await self.get_all_users(filters).order_by().aaggregate(
+            last_update=Max('last_update'),
+            total=Count('id'),
+        )
+
     def create_user(self, validated_data):
+        """
+        Raises:
+            DuplicateEmail: Si otro usuario ya tiene el email.
+        """
         password = validated_data.pop('password', None)
-        
-        user = User.objects.create_user(**validated_data)
-        
-        if password:
-            user.set_password(password)
-            user.save()
-        
-        return user
 
-    def get_user_by_id(self, user_id):
-        return get_object_or_404(User, id=user_id)
+        with unique_email():
+            user = User.objects.create_user(**validated_data)
 
-    def update_user(self, user, validated_data):
-        password = validated_data.pop('password', None)
+            if password:
+                user.set_password(password)
+                user.save()
 
-        user.username = validated_data.get('username', user.username)
-        user.first_name = validated_data.get('first_name', user.first_name)
-        user.last_name = validated_data.get('last_name', user.last_name)
-        user.email = validated_data.get('email', user.email)
-        user.age = validated_data.get('age', user.age)
-        
-        if password:
-            user.set_password(password)
-            
-        user.save()
         return user
 
-    def delete_user(self, user):
-        user.delete()
+    def get_user_by_id(self, user_id, only=None):
+        queryset = User.objects.only(*only) if only else User.objects.all()
+        return get_object_or_404(queryset, id=user_id)
+
+    async def aget_user_by_id(self, user_id, only=None):
+        queryset = User.objects.only(*only) if only else User.objects.all()
+        return await aget_object_or_404(queryset, id=user_id)
+
+    def update_user(self, user_id, validated_data):
+        """
+        Actualiza solo los campos enviados (y ``last_update``) con un único ``UPDATE ... WHERE id = %s``,
+        sin leer antes el usuario. La contraseña se guarda ya cifrada.
+
+        Returns:
+            int: Cantidad de filas actualizadas (0 si el usuario no existe).
+
+        Raises:
+            DuplicateEmail: Si otro usuario ya tiene el email.
+        """
+        fields = {field: validated_data[field] for field in self.UPDATABLE_FIELDS if field in validated_data}
+        if validated_data.get('password'):
+            fields['password'] = make_password(validated_data['password'])
+
+        with unique_email():
+            updated = User.objects.filter(id=user_id).update(**fields, last_update=timezone.now())
+        if updated:
+            user_cache.invalidate(user_id)
+        return updated
+
+    def delete_user(self, user_id):
+        """
+        Elimina el usuario y sus relaciones (grupos, permisos, bitácora del admin, tokens). Django lee
+        antes el usuario para borrarlas en cascada; si no existe, esa lectura es la única consulta.
+
+        Returns:
+            int: Cantidad de usuarios eliminados (0 si el usuario no existe).
+        """
+        deleted, per_model = User.objects.filter(id=user_id).delete()
+        user_cache.invalidate(user_id)
+        return per_model.get(User._meta.label, 0)
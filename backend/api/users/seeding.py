@@ -0,0 +1,123 @@
+import random
+import unicodedata
+from typing import NamedTuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.bulk_insert import insert_rows
+
+from .models import User
+
+
+FIRST_NAMES = [
+    'María', 'José', 'Juan', 'Ana', 'Luis', 'Carmen', 'Carlos', 'Laura', 'Jorge', 'Lucía', 'Miguel',
+    'Sofía', 'Pedro', 'Valentina', 'Andrés', 'Camila', 'Diego', 'Isabel', 'Fernando', 'Daniela',
+    'Ricardo', 'Gabriela', 'Alejandro', 'Paula', 'Javier', 'Elena', 'Raúl', 'Marta', 'Sergio', 'Rosa',
+]
+
+LAST_NAMES = [
+    'García', 'Rodríguez', 'González', 'Fernández', 'López', 'Martínez', 'Sánchez', 'Pérez', 'Gómez',
+    'Martín', 'Jiménez', 'Ruiz', 'Hernández', 'Díaz', 'Moreno', 'Muñoz', 'Álvarez', 'Romero', 'Torres',
+    'Ramírez', 'Flores', 'Castillo', 'Vargas', 'Rojas', 'Morales', 'Ortiz', 'Silva', 'Castro', 'Núñez',
+]
+
+EMAIL_DOMAINS = ['example.com', 'example.org', 'example.net', 'correo.example', 'mail.example']
+
+
+def generate_users(count: int, offset: int = 0):
+    """
+    Genera usuarios de prueba (sin guardar) con username y email ``bench{n}``; ``offset`` evita repetir
+    los de una carga anterior. La contraseña queda inutilizable (``!``).
+    """
+    for i in range(count):
+        yield User(
+            username=f'bench{offset + i}',
+            first_name=f'Nombre{i}',
+            last_name=f'Apellido{i}',
+            email=f'bench{offset + i}@example.com',
+            age=18 + i % 60,
+            is_active=i % 10 != 0,
+            password='!',
+        )
+
+
+def seed_users(count: int, offset: int = 0, batch_size: int = 5000) -> int:
+    """
+    Inserta ``count`` usuarios generados en lotes con ``bulk_create``.
+
+    Returns:
+        int: La cantidad de usuarios insertados.
+    """
+    created = 0
+    batch = []
+    for user in generate_users(count, offset):
+        batch.append(user)
+        if len(batch) >= batch_size:
+            User.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+
+    if batch:
+        User.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+# Columnas de las filas de generate_user_rows, en orden.
+USER_ROW_FIELDS = (
+    'password', 'username', 'first_name', 'last_name', 'email', 'age', 'is_active',
+    'is_staff', 'is_superuser', 'date_joined', 'created_at', 'last_update',
+)
+
+
+class UserProfile(NamedTuple):
+    """
+    Distribuciones de los usuarios que genera ``seed_data``: proporción de activos, edad uniforme
+    en ``[age_min, age_max]`` (``missing_age_ratio`` sin edad) y vocabulario de nombres y dominios.
+    """
+    active_ratio: float = 0.9
+    age_min: int = 18
+    age_max: int = 80
+    missing_age_ratio: float = 0.1
+    first_names: tuple = tuple(FIRST_NAMES)
+    last_names: tuple = tuple(LAST_NAMES)
+    email_domains: tuple = tuple(EMAIL_DOMAINS)
+
+
+def _slug(value: str) -> str:
+    return unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode().lower().replace(' ', '')
+
+
+def generate_user_rows(count: int, password_hash: str, seed: int = 0, offset: int = 0,
+                       profile: UserProfile = UserProfile(), now=None):
+    """
+    Genera filas ``USER_ROW_FIELDS`` de forma determinista a partir de la semilla. Todas comparten
+    ``password_hash`` (cifrado una sola vez). El número ``offset + i`` hace únicos el username y el email.
+    """
+    now = now or timezone.now()
+    rng = random.Random(seed)
+    random_value = rng.random
+    first_names = [(name, _slug(name)) for name in profile.first_names]
+    last_names = [(name, _slug(name)) for name in profile.last_names]
+    domains = profile.email_domains
+    ages = profile.age_max - profile.age_min + 1
+
+    for number in range(offset, offset + count):
+        first_name, first_slug = first_names[int(random_value() * len(first_names))]
+        last_name, last_slug = last_names[int(random_value() * len(last_names))]
+        username = f'{first_slug}.{last_slug}{number}'
+        age = None if random_value() < profile.missing_age_ratio else profile.age_min + int(random_value() * ages)
+        yield (
+            password_hash, username, first_name, last_name,
+            f'{username}@{domains[int(random_value() * len(domains))]}', age,
+            random_value() < profile.active_ratio, False, False, now, now, now,
+        )
+
+
+def insert_user_rows(rows, method: str) -> int:
+    """
+    Inserta un lote de filas ``USER_ROW_FIELDS`` con ``insert_rows``.
+    """
+    with transaction.atomic():
+        return insert_rows(User, USER_ROW_FIELDS, rows, method)
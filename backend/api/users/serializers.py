@@ -1,7 +1,11 @@
 from rest_framework import serializers
+
+from core.fieldsets import SparseFieldsMixin
+
+from .exceptions import DuplicateEmail
 from .models import User
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Maneja la validación y transformación de datos de usuario entre la API (JSON)
     """
@@ -27,6 +31,18 @@ class UserSerializer(serializers.ModelSerializer):
             'last_update',
             'password',
         ]
+        # Campos que se pueden pedir con ?fields= (la contraseña nunca se puede seleccionar).
+        sparse_fields = [
+            'id',
+            'username',
+            'nombre',
+            'apellido',
+            'email',
+            'edad',
+            'activo',
+            'created',
+            'last_update',
+        ]
         extra_kwargs = {
             # campos de solo escritura.
             'password': {'write_only': True},
@@ -34,6 +50,20 @@ class UserSerializer(serializers.ModelSerializer):
             'email': {'required': True},
         }
 
+    def validate_email(self, value):
+        """
+        El email es único sin distinguir mayúsculas (índice ``users_user_email_lower_uniq``). Al actualizar,
+        el usuario se excluye con ``user_id`` del contexto, ya que la vista no carga la instancia.
+        """
+        if value:
+            users = User.objects.filter_by_email(value)
+            user_id = self.context.get('user_id', getattr(self.instance, 'pk', None))
+            if user_id is not None:
+                users = users.exclude(pk=user_id)
+            if users.exists():
+                raise serializers.ValidationError(DuplicateEmail.message)
+        return value
+
 class UserUpdateSerializer(UserSerializer):
     """
     Serializer para actualización de usuarios (PUT/PATCH).
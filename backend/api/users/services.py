@@ -1,4 +1,10 @@
+from django.conf import settings
+
+from core.conditional import make_etag
+from core.fieldsets import field_sources
+
 from .repository import UserRepository
+from .serializers import UserSerializer
 
 class UserService:
     """
@@ -9,10 +15,32 @@ class UserService:
 
     def __init__(self):
         self.repository = UserRepository()
+        self.fast_serialization = settings.FAST_SERIALIZATION
+
+    def get_all_users(self, filters=None, fields=None):
+        """Obtener todo los usarios, leyendo solo las columnas de ``fields`` si se indican"""
+        only = field_sources(UserSerializer, fields) if fields else None
+        return self.repository.get_all_users(filters, only=only)
+
+    async def aget_all_users(self, filters=None, fields=None):
+        """
+        Lee el listado con ``aiterator`` y devuelve la lista de usuarios.
+        """
+        users = self.get_all_users(filters, fields=fields)
+        return [user async for user in users.aiterator()]
+
+    def get_users_list_etag(self, filters=None, fields=None):
+        """
+        Calcula el ETag del listado a partir de los filtros, ``MAX(last_update)`` y el total.
+        """
+        state = self.repository.get_list_state(filters)
+        params = dict(filters.items()) if filters else {}
+        return make_etag('users', params, fields, state['last_update'], state['total'])
 
-    def get_all_users(self, filters=None):
-        """Obtener todo los usarios"""
-        return self.repository.get_all_users(filters)
+    async def aget_users_list_etag(self, filters=None, fields=None):
+        state = await self.repository.aget_list_state(filters)
+        params = dict(filters.items()) if filters else {}
+        return make_etag('users', params, fields, state['last_update'], state['total'])
     
     def create_user(self, validated_data):
         """
@@ -20,14 +48,28 @@ class UserService:
         """
         return self.repository.create_user(validated_data)
     
-    def get_user_by_id(self, user_id):
-        return self.repository.get_user_by_id(user_id)
+    def get_user_by_id(self, user_id, fields=None):
+        """
+        Con ``fields`` solo se leen esas columnas, más ``last_update`` para los validadores HTTP.
+        """
+        only = (*field_sources(UserSerializer, fields), 'last_update') if fields else None
+        return self.repository.get_user_by_id(user_id, only=only)
+
+    async def aget_user_by_id(self, user_id, fields=None):
+        only = (*field_sources(UserSerializer, fields), 'last_update') if fields else None
+        return await self.repository.aget_user_by_id(user_id, only=only)
 
     def update_user(self, user_id, validated_data):
-        user_instance = self.repository.get_user_by_id(user_id)
-        return self.repository.update_user(user_instance, validated_data)
+        """
+        Returns:
+            bool: False si el usuario no existe.
+        """
+        return self.repository.update_user(user_id, validated_data) > 0
 
     def delete_user(self, user_id):
-        user_instance = self.repository.get_user_by_id(user_id)
-        self.repository.delete_user(user_instance)
+        """
+        Returns:
+            bool: False si el usuario no existe.
+        """
+        return self.repository.delete_user(user_id) > 0
 
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User, dispatch_uid='users_invalidate_cached_user_on_save')
+def invalidate_cached_user_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Cualquier ``save()`` del usuario (admin, cambio de contraseña, ``is_active``) invalida su entrada
+    en el caché de autenticación. Solo actualizar ``last_login`` no cambia nada de lo que se valida.
+    """
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=User, dispatch_uid='users_invalidate_cached_user_on_delete')
+def invalidate_cached_user_on_delete(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
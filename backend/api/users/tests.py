@@ -1,3 +1,321 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from api.auth.authentication import CachedJWTAuthentication
+from api.auth.hashers import PBKDF2PasswordHasher
+from api.auth.tokens import RefreshToken
+
+from .cache import UserCache, user_cache
+from .exceptions import DuplicateEmail
+from .models import User
+from .serializers import UserSerializer
+from .services import UserService
+
+
+class CachedUserInvalidationTests(TestCase):
+    """
+    La autenticación JWT nunca devuelve el usuario guardado en caché después de que cambió.
+    """
+
+    def setUp(self):
+        user_cache.clear_local()
+        self.user = User.objects.create(username='cacheado', email='cacheado@example.com', password='x')
+        self.token = RefreshToken.for_user(self.user).access_token
+        self.authentication = CachedJWTAuthentication()
+        # Primera lectura: queda guardado en el caché.
+        self.authentication.get_user(self.token)
+
+    def authenticate(self):
+        return self.authentication.get_user(self.token)
+
+    def test_cached_user_is_served_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate().pk, self.user.pk)
+
+    def test_update_through_the_service_is_visible(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            UserService().update_user(self.user.pk, {'username': 'renombrado'})
+
+        self.assertEqual(self.authenticate().username, 'renombrado')
+
+    def test_deactivated_user_is_rejected(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_password_change_is_visible(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('otra-Password-123')
+            self.user.save()
+
+        self.assertTrue(self.authenticate().check_password('otra-Password-123'))
+
+    def test_deleted_user_is_rejected(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            UserService().delete_user(self.user.pk)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+
+class SharedUserCacheTests(TestCase):
+    """
+    Dos procesos (dos instancias sin memoria local) sobre el mismo caché compartido.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        backend = FileBasedCache(directory.name, {})
+        self.worker, self.other = (UserCache(backend=backend, timeout=60, local_timeout=0) for _ in range(2))
+        self.user = User.objects.create(username='compartido', email='compartido@example.com')
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return User.objects.get(pk=self.user.pk)
+
+    def test_process_local_backend_skips_the_shared_tier(self):
+        self.assertFalse(UserCache(backend=LocMemCache('users-test', {}), timeout=60).shared)
+        self.assertFalse(user_cache.shared)
+        self.assertTrue(self.worker.shared)
+
+    def test_invalidation_reaches_other_processes(self):
+        self.worker.get(self.user.pk, self.load)
+        self.other.get(self.user.pk, self.load)
+        self.assertEqual(self.loads, 1)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.worker._invalidate_now(self.user.pk)
+
+        self.assertFalse(self.other.get(self.user.pk, self.load).is_active)
+        self.assertEqual(self.loads, 2)
+
+    def test_copy_read_before_an_invalidation_is_not_served(self):
+        def load_then_invalidate():
+            # La lectura termina antes de que se confirme la escritura de otra petición.
+            stale = self.load()
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+            self.other._invalidate_now(self.user.pk)
+            return stale
+
+        self.assertTrue(self.worker.get(self.user.pk, load_then_invalidate).is_active)
+
+        self.assertFalse(self.other.get(self.user.pk, self.load).is_active)
+
+
+class DuplicateEmailRaceTests(TestCase):
+    """
+    Dos altas o cambios simultáneos con el mismo email: los dos pasan la validación del serializer
+    y el índice único rechaza el segundo con el mismo 400 que da la validación.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin-email', email='admin@example.com'))
+        self.existing = User.objects.create(username='ana', email='Ana@Example.com')
+        # Simula la petición que validó antes de que se confirmara la otra.
+        patcher = mock.patch.object(UserSerializer, 'validate_email', lambda self, value: value)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_create_with_taken_email_returns_400(self):
+        response = self.client.post(reverse('user-list-create'), {
+            'username': 'otra-ana', 'nombre': 'Ana', 'apellido': 'López',
+            'email': 'ana@example.com', 'password': 'una-Password-123',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'email': [DuplicateEmail.message]})
+        self.assertFalse(User.objects.filter(username='otra-ana').exists())
+
+    def test_update_to_taken_email_returns_400(self):
+        other = User.objects.create(username='beto', email='beto@example.com')
+
+        response = self.client.put(reverse('user-detail', args=[other.pk]), {'email': 'ANA@example.com'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'email': [DuplicateEmail.message]})
+        other.refresh_from_db()
+        self.assertEqual(other.email, 'beto@example.com')
+
+
+class SparseFieldsTests(TestCase):
+    """
+    ``?fields=`` solo acepta los campos de ``Meta.sparse_fields``: la contraseña nunca se lee ni se devuelve,
+    y la consulta solo trae las columnas pedidas.
+    """
+
+    def setUp(self):
+        hasher = PBKDF2PasswordHasher()
+        self.user = User.objects.create(
+            username='disperso', email='disperso@example.com', first_name='Dora', last_name='Díaz',
+            password=hasher.encode('una-Password-123', hasher.salt(), 1000),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def user_selects(self, captured):
+        return [query['sql'] for query in captured if query['sql'].startswith('SELECT "users_user"."id"')]
+
+    def test_password_cannot_be_selected(self):
+        for url in (reverse('user-list-create'), reverse('user-detail', args=[self.user.pk])):
+            for fields in ('password,id', 'password'):
+                with self.subTest(url=url, fields=fields):
+                    response = self.client.get(url, {'fields': fields})
+
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.data['message'], 'Campos no válidos: password')
+                    self.assertNotIn(self.user.password.encode(), response.content)
+
+    def test_unknown_field_returns_400(self):
+        response = self.client.get(reverse('user-list-create'), {'fields': 'id,telefono'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'status': 'error', 'message': 'Campos no válidos: telefono'})
+
+    def test_password_is_never_returned(self):
+        for fast_serialization in (False, True):
+            with self.subTest(fast_serialization=fast_serialization), override_settings(FAST_SERIALIZATION=fast_serialization):
+                for url in (reverse('user-list-create'), reverse('user-detail', args=[self.user.pk])):
+                    response = self.client.get(url)
+
+                    self.assertEqual(response.status_code, 200)
+                    self.assertNotIn(b'password', response.content)
+                    self.assertNotIn(self.user.password.encode(), response.content)
+
+    def test_list_reads_only_the_requested_columns(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('user-list-create'), {'fields': 'id,nombre'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{'id': self.user.pk, 'nombre': 'Dora'}])
+        [sql] = self.user_selects(captured)
+        self.assertIn('"users_user"."first_name"', sql)
+        for column in ('password', 'email', 'last_name'):
+            self.assertNotIn(f'"users_user"."{column}"', sql)
+
+    def test_detail_reads_only_the_requested_columns(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('user-detail', args=[self.user.pk]), {'fields': 'email'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'email': 'disperso@example.com'})
+        [sql] = self.user_selects(captured)
+        self.assertIn('"users_user"."email"', sql)
+        for column in ('password', 'first_name', 'username'):
+            self.assertNotIn(f'"users_user"."{column}"', sql)
+
+
+class UserConditionalGetTests(TestCase):
+    """
+    Validadores HTTP del detalle (ETag y Last-Modified) y del listado (solo ETag): 304 mientras el
+    recurso no cambia y 200 después de una escritura.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin-condicional', email='admin-condicional@example.com')
+        self.user = User.objects.create(username='condicional', email='condicional@example.com')
+        # Fecha anterior, para que Last-Modified cambie con la escritura aunque ocurra en el mismo segundo.
+        User.objects.filter(pk=self.user.pk).update(last_update=timezone.now() - timedelta(hours=1))
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.detail_url = reverse('user-detail', args=[self.user.pk])
+        self.list_url = reverse('user-list-create')
+
+    def test_detail_returns_304_for_matching_validators(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, 200)
+
+        for header, value in (('HTTP_IF_NONE_MATCH', response['ETag']), ('HTTP_IF_MODIFIED_SINCE', response['Last-Modified'])):
+            with self.subTest(header):
+                self.assertEqual(self.client.get(self.detail_url, **{header: value}).status_code, 304)
+
+    def test_detail_returns_200_after_an_update(self):
+        first = self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.put(self.detail_url, {'username': 'renombrado'}, format='json').status_code, 200)
+
+        for header, value in (('HTTP_IF_NONE_MATCH', first['ETag']), ('HTTP_IF_MODIFIED_SINCE', first['Last-Modified'])):
+            with self.subTest(header):
+                response = self.client.get(self.detail_url, **{header: value})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data['username'], 'renombrado')
+
+    def test_list_returns_304_until_a_create_or_delete(self):
+        first = self.client.get(self.list_url)
+        # El listado no tiene Last-Modified: una baja no cambia la fecha más reciente, solo el total.
+        self.assertNotIn('Last-Modified', first)
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        User.objects.create(username='nuevo', email='nuevo@example.com')
+        after_create = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(after_create.status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(self.detail_url).status_code, 200)
+        after_delete = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=after_create['ETag'])
+        self.assertEqual(after_delete.status_code, 200)
+        self.assertNotIn('condicional', [item['username'] for item in after_delete.data])
+
+
+class UserWriteQueriesTests(TestCase):
+    """
+    Detalle de usuarios: el PUT es un solo UPDATE sin leer antes el usuario, y con un id inexistente
+    cada método responde 404 después de una sola consulta.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin-escrituras', email='admin-escrituras@example.com')
+        self.user = User.objects.create(username='escrito', email='escrito@example.com', first_name='Eva')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.missing_id = self.user.pk + 1000
+
+    @staticmethod
+    def statements(captured):
+        """
+        Consultas ejecutadas, sin los SAVEPOINT que agrega ``transaction.atomic`` dentro de la prueba.
+        """
+        return [query['sql'] for query in captured if not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT'))]
+
+    def test_put_issues_a_single_update(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.put(reverse('user-detail', args=[self.user.pk]), {'nombre': 'Elena'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        [sql] = self.statements(captured)
+        self.assertTrue(sql.startswith('UPDATE "users_user"'), sql)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Elena')
+
+    def test_missing_user_returns_404(self):
+        cases = (
+            ('get', 'user-detail', None, 'SELECT'),
+            ('get', 'user-detail-async', None, 'SELECT'),
+            ('put', 'user-detail', {'nombre': 'Nadie'}, 'UPDATE'),
+            # El borrado en cascada lee primero el usuario: sin usuario no hay nada que borrar.
+            ('delete', 'user-detail', None, 'SELECT'),
+        )
+        for method, url_name, data, statement in cases:
+            with self.subTest(method, url_name=url_name):
+                with CaptureQueriesContext(connection) as captured:
+                    response = getattr(self.client, method)(reverse(url_name, args=[self.missing_id]), data, format='json')
+
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual([sql.split()[0] for sql in self.statements(captured)], [statement])
+        self.assertEqual(User.objects.count(), 2)
@@ -1,10 +1,14 @@
 from django.urls import path
 from .views import (
     UserListCreateAPIView,
-    UserRetrieveUpdateDestroyAPIView
+    UserRetrieveUpdateDestroyAPIView,
+    UserListAsyncAPIView,
+    UserRetrieveAsyncAPIView,
 )
 
 urlpatterns = [
     path('', UserListCreateAPIView.as_view(), name='user-list-create'),
     path('<int:user_id>/', UserRetrieveUpdateDestroyAPIView.as_view(), name='user-detail'),
+    path('async/', UserListAsyncAPIView.as_view(), name='user-list-async'),
+    path('async/<int:user_id>/', UserRetrieveAsyncAPIView.as_view(), name='user-detail-async'),
 ]
@@ -5,6 +5,12 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
+from core.async_views import AsyncAPIView
+from core.conditional import conditional_get, make_etag, set_validators
+from core.fast_serializers import get_fast_serializer
+from core.fieldsets import InvalidFields, parse_fields
+
+from .exceptions import DuplicateEmail
 from .serializers import UserSerializer,UserUpdateSerializer
 from .services import UserService
 
@@ -36,13 +42,38 @@ class UserListCreateAPIView(APIView):
                 description="Filtrar usuario por active status (optional)",
                 type=openapi.TYPE_BOOLEAN
             ),
+            openapi.Parameter(
+                'fields',
+                openapi.IN_QUERY,
+                description="Campos a devolver separados por coma, p. ej. `id,username,email` (optional)",
+                type=openapi.TYPE_STRING
+            ),
         ],
-        responses={200: UserSerializer(many=True)}
+        responses={
+            200: UserSerializer(many=True),
+            304: openapi.Response(description="El listado no cambió desde la última consulta (If-None-Match)"),
+            400: openapi.Response(description="Campos inválidos"),
+        }
     )
     def get(self, request):
-        users = self.service.get_all_users(request.query_params)
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        try:
+            fields = parse_fields(request.query_params.get('fields'), UserSerializer)
+        except InvalidFields as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # El validador sale de un agregado barato; si el cliente ya tiene este listado se responde 304.
+        etag = self.service.get_users_list_etag(request.query_params, fields)
+        not_modified = conditional_get(request, etag)
+        if not_modified:
+            return not_modified
+
+        if self.service.fast_serialization:
+            users = self.service.get_all_users(request.query_params)
+            data = get_fast_serializer(UserSerializer, fields).serialize_queryset(users)
+        else:
+            users = self.service.get_all_users(request.query_params, fields=fields)
+            data = UserSerializer(users, many=True, fields=fields).data
+        return set_validators(Response(data), etag)
 
     @swagger_auto_schema(
         request_body=UserSerializer,
@@ -56,7 +87,10 @@ class UserListCreateAPIView(APIView):
     def post(self, request):
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
-            self.service.create_user(serializer.validated_data)
+            try:
+                self.service.create_user(serializer.validated_data)
+            except DuplicateEmail as e:
+                return Response({"email": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
             return Response({
                 "status": "success",
                 "message": f"El usuario se ha creado"
@@ -80,6 +114,8 @@ class UserRetrieveUpdateDestroyAPIView(APIView):
         operation_description="Devuelve la información detallada de un usuario específico.",
         responses={
             200: UserSerializer,
+            304: openapi.Response(description="El usuario no cambió desde la última consulta (If-None-Match / If-Modified-Since)"),
+            400: openapi.Response(description="Campos inválidos"),
             404: openapi.Response(description="Usuario no encontrado")
         },
         manual_parameters=[
@@ -89,17 +125,36 @@ class UserRetrieveUpdateDestroyAPIView(APIView):
                 description="ID del usuario a consultar",
                 type=openapi.TYPE_INTEGER,
                 required=True
-            )
+            ),
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Campos a devolver separados por coma, p. ej. `id,username,email` (optional)",
+                type=openapi.TYPE_STRING
+            ),
         ],
     )
     def get(self, request, user_id):
         """Obtiene un usuario por su ID."""
-        user = self.service.get_user_by_id(user_id)
+        try:
+            fields = parse_fields(request.query_params.get('fields'), UserSerializer)
+        except InvalidFields as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = self.service.get_user_by_id(user_id, fields=fields)
         if not user:
             return Response({"status": "error", "message": f"Usuario no encontrado."}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = UserSerializer(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        etag = make_etag('user', user.id, user.last_update, fields)
+        not_modified = conditional_get(request, etag, user.last_update)
+        if not_modified:
+            return not_modified
+
+        if self.service.fast_serialization:
+            data = get_fast_serializer(UserSerializer, fields).serialize_instance(user)
+        else:
+            data = UserSerializer(user, fields=fields).data
+        return set_validators(Response(data, status=status.HTTP_200_OK), etag, user.last_update)
 
     @swagger_auto_schema(
         operation_summary="Actualizar usuario por ID",
@@ -122,12 +177,14 @@ class UserRetrieveUpdateDestroyAPIView(APIView):
     )
     def put(self, request, user_id):
         """Actualiza completamente un usuario existente."""
-        serializer = UserUpdateSerializer(data=request.data, partial=True)
+        serializer = UserUpdateSerializer(data=request.data, partial=True, context={'user_id': user_id})
         if serializer.is_valid():
-            updated_user = self.service.update_user(user_id, serializer.validated_data)
-            if not updated_user:
+            try:
+                updated = self.service.update_user(user_id, serializer.validated_data)
+            except DuplicateEmail as e:
+                return Response({"email": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+            if not updated:
                 return Response({"status": "error", "message": "Usuario no encontrado."}, status=status.HTTP_404_NOT_FOUND)
-            response_serializer = UserSerializer(updated_user)
             return Response({"status": "succes", "message": f"El usuario ha sido actualizado"}, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -149,7 +206,8 @@ class UserRetrieveUpdateDestroyAPIView(APIView):
         },
     )
     def delete(self, request, user_id):
-        self.service.delete_user(user_id)
+        if not self.service.delete_user(user_id):
+            return Response({"status": "error", "message": "Usuario no encontrado."}, status=status.HTTP_404_NOT_FOUND)
         return Response(
             {
                 "status": "success",
@@ -158,3 +216,93 @@ class UserRetrieveUpdateDestroyAPIView(APIView):
             status=status.HTTP_200_OK
         )
 
+
+class UserListAsyncAPIView(AsyncAPIView):
+    """
+    Variante asíncrona del listado de usuarios, para despliegues ASGI.
+    Endpoint: /users/async/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = UserService()
+
+    @swagger_auto_schema(
+        operation_summary="Listar usuarios (async)",
+        operation_description="Mismo resultado y filtros que `GET /users/`, atendido con el ORM asíncrono.",
+        manual_parameters=[
+            openapi.Parameter('nombre', openapi.IN_QUERY, description="Filtrar usuario por nombre (optional)", type=openapi.TYPE_STRING),
+            openapi.Parameter('email', openapi.IN_QUERY, description="Filtrar usuario por email (optional)", type=openapi.TYPE_STRING),
+            openapi.Parameter('activo', openapi.IN_QUERY, description="Filtrar usuario por active status (optional)", type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('fields', openapi.IN_QUERY, description="Campos a devolver separados por coma (optional)", type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: UserSerializer(many=True),
+            304: openapi.Response(description="El listado no cambió desde la última consulta (If-None-Match)"),
+            400: openapi.Response(description="Campos inválidos"),
+        }
+    )
+    async def get(self, request):
+        try:
+            fields = parse_fields(request.query_params.get('fields'), UserSerializer)
+        except InvalidFields as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag = await self.service.aget_users_list_etag(request.query_params, fields)
+        not_modified = conditional_get(request, etag)
+        if not_modified:
+            return not_modified
+
+        if self.service.fast_serialization:
+            users = self.service.get_all_users(request.query_params)
+            data = await get_fast_serializer(UserSerializer, fields).aserialize_queryset(users)
+        else:
+            users = await self.service.aget_all_users(request.query_params, fields=fields)
+            data = UserSerializer(users, many=True, fields=fields).data
+        return set_validators(Response(data), etag)
+
+
+class UserRetrieveAsyncAPIView(AsyncAPIView):
+    """
+    Variante asíncrona del detalle de un usuario, para despliegues ASGI.
+    Endpoint: /users/async/<int:user_id>/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = UserService()
+
+    @swagger_auto_schema(
+        operation_summary="Obtener usuario por ID (async)",
+        operation_description="Mismo resultado que `GET /users/<id>/`, atendido con el ORM asíncrono.",
+        responses={
+            200: UserSerializer,
+            304: openapi.Response(description="El usuario no cambió desde la última consulta"),
+            400: openapi.Response(description="Campos inválidos"),
+            404: openapi.Response(description="Usuario no encontrado")
+        },
+        manual_parameters=[
+            openapi.Parameter("user_id", openapi.IN_PATH, description="ID del usuario a consultar", type=openapi.TYPE_INTEGER, required=True),
+            openapi.Parameter("fields", openapi.IN_QUERY, description="Campos a devolver separados por coma (optional)", type=openapi.TYPE_STRING),
+        ],
+    )
+    async def get(self, request, user_id):
+        try:
+            fields = parse_fields(request.query_params.get('fields'), UserSerializer)
+        except InvalidFields as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = await self.service.aget_user_by_id(user_id, fields=fields)
+
+        etag = make_etag('user', user.id, user.last_update, fields)
+        not_modified = conditional_get(request, etag, user.last_update)
+        if not_modified:
+            return not_modified
+
+        if self.service.fast_serialization:
+            data = get_fast_serializer(UserSerializer, fields).serialize_instance(user)
+        else:
+            data = UserSerializer(user, fields=fields).data
+        return set_validators(Response(data, status=status.HTTP_200_OK), etag, user.last_update)
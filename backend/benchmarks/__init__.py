@@ -0,0 +1,14 @@
+"""
+Benchmarks de los endpoints de ``core/urls.py`` con el cliente de pruebas de Django.
+
+Se ejecutan con el resto de las pruebas (``python manage.py test``) o solos
+(``python manage.py test benchmarks``). Variables de entorno:
+
+- ``BENCHMARK_ITERATIONS``: peticiones medidas por ruta (5 por defecto).
+- ``BENCHMARK_STRICT``: además del presupuesto de consultas, falla si la latencia (p50) o la memoria
+  superan la línea base en más de ``BENCHMARK_THRESHOLD`` (0.5 = 50 % por defecto).
+- ``BENCHMARK_REPORT``: ruta de un archivo JSON donde guardar los resultados; también los imprime.
+- ``BENCHMARK_UPDATE_BASELINE``: reescribe ``baseline.json`` con los resultados en lugar de compararlos.
+
+La línea base incluida se generó con SQLite; con otro motor la cantidad de consultas puede cambiar.
+"""
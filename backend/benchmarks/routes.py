@@ -0,0 +1,139 @@
+"""
+Rutas que mide la suite: una entrada por cada par (ruta, método) de ``core/urls.py``, más algunas
+variantes de consulta de los listados. ``build`` arma la petición antes de cada iteración (fuera
+del tiempo medido); las rutas que crean o eliminan registros preparan uno nuevo cada vez.
+"""
+import json
+from typing import Callable, NamedTuple
+
+from django.urls import reverse
+
+from api.auth.last_login import last_login_buffer
+from api.auth.throttling import local_buckets
+from api.auth.tokens import RefreshToken
+from api.products.services import ProductService
+from api.users.models import User
+
+
+class Route(NamedTuple):
+    name: str
+    url_name: str
+    method: str
+    build: Callable
+    status: int = 200
+
+
+def api_request(fixtures, method, path, body=None, auth=True) -> dict:
+    request = {'method': method, 'path': path, 'headers': fixtures.auth_headers() if auth else {}}
+    if body is not None:
+        request.update(data=json.dumps(body), content_type='application/json')
+    return request
+
+
+def product_path(name, product_id=None, query=''):
+    return reverse(name, args=[] if product_id is None else [product_id]) + query
+
+
+def new_product(fixtures):
+    return ProductService().create_product({
+        'nombre': f'Producto benchmark {fixtures.next()}', 'precio': '199.00', 'stock': 10,
+    })
+
+
+def new_user(fixtures):
+    number = fixtures.next()
+    return User.objects.create(
+        username=f'benchmark-delete-{number}', email=f'benchmark-delete-{number}@example.com',
+        password=fixtures.password_hash,
+    )
+
+
+def signin(fixtures):
+    # El límite de intentos y la escritura diferida de last_login no son parte de lo que se mide.
+    local_buckets.clear()
+    last_login_buffer.flush()
+    return api_request(fixtures, 'POST', reverse('signin'), {'email': fixtures.email, 'password': fixtures.password}, auth=False)
+
+
+ROUTES = [
+    # Productos
+    Route('products.list', 'product-list-create', 'GET',
+          lambda f: api_request(f, 'GET', product_path('product-list-create', query='?page_size=50'))),
+    Route('products.list.filtered', 'product-list-create', 'GET',
+          lambda f: api_request(f, 'GET', product_path(
+              'product-list-create', query='?activo=true&precio_min=100&precio_max=1000&page_size=50'))),
+    Route('products.list.search', 'product-list-create', 'GET',
+          lambda f: api_request(f, 'GET', product_path('product-list-create', query='?q=Samsung&page_size=50'))),
+    Route('products.create', 'product-list-create', 'POST',
+          lambda f: api_request(f, 'POST', product_path('product-list-create'), {
+              'nombre': f'Producto nuevo {f.next()}', 'precio': '199.00', 'stock': 10,
+          }), status=201),
+    Route('products.detail', 'product-detail', 'GET',
+          lambda f: api_request(f, 'GET', product_path('product-detail', f.product_ids[0]))),
+    Route('products.update', 'product-detail', 'PATCH',
+          lambda f: api_request(f, 'PATCH', product_path('product-detail', f.product_ids[1]), {
+              'stock': f.next() % 100 + 1,
+          })),
+    Route('products.delete', 'product-detail', 'DELETE',
+          lambda f: api_request(f, 'DELETE', product_path('product-detail', new_product(f).id))),
+    Route('products.bulk', 'product-bulk', 'POST',
+          lambda f: api_request(f, 'POST', product_path('product-bulk'), {
+              'create': [{'nombre': f'Producto masivo {f.next()}', 'precio': '99.00', 'stock': 5} for _ in range(10)],
+              'update': [{'id': product_id, 'stock': f.next() % 100 + 1} for product_id in f.product_ids[10:20]],
+              'delete': [new_product(f).id for _ in range(10)],
+          })),
+    Route('products.export', 'product-export', 'GET',
+          lambda f: api_request(f, 'GET', product_path('product-export', query='?formato=ndjson'))),
+    Route('products.list.async', 'product-list-async', 'GET',
+          lambda f: api_request(f, 'GET', product_path('product-list-async', query='?page_size=50'))),
+    Route('products.detail.async', 'product-detail-async', 'GET',
+          lambda f: api_request(f, 'GET', product_path('product-detail-async', f.product_ids[0]))),
+    Route('products.changes', 'product-changes', 'GET',
+          lambda f: api_request(f, 'GET', product_path('product-changes'))),
+    Route('products.stats', 'product-stats', 'GET',
+          lambda f: api_request(f, 'GET', product_path('product-stats'))),
+    Route('products.reserve', 'product-stock-reserve', 'POST',
+          lambda f: api_request(f, 'POST', product_path('product-stock-reserve', f.stock_ids[0]), {'cantidad': 1})),
+    Route('products.release', 'product-stock-release', 'POST',
+          lambda f: api_request(f, 'POST', product_path('product-stock-release', f.stock_ids[0]), {'cantidad': 1})),
+    Route('products.reserve_many', 'product-stock-reserve-many', 'POST',
+          lambda f: api_request(f, 'POST', product_path('product-stock-reserve-many'), {
+              'items': [{'id': product_id, 'cantidad': 1} for product_id in f.stock_ids],
+          })),
+
+    # Usuarios
+    Route('users.list', 'user-list-create', 'GET',
+          lambda f: api_request(f, 'GET', reverse('user-list-create'))),
+    Route('users.create', 'user-list-create', 'POST',
+          lambda f: api_request(f, 'POST', reverse('user-list-create'), {
+              'username': f'benchmark-{f.next()}', 'nombre': 'Ana', 'apellido': 'López',
+              'email': f'benchmark-{f.next()}@example.com', 'password': 'benchmark-Password-123',
+          }), status=201),
+    Route('users.detail', 'user-detail', 'GET',
+          lambda f: api_request(f, 'GET', reverse('user-detail', args=[f.user_ids[0]]))),
+    Route('users.update', 'user-detail', 'PUT',
+          lambda f: api_request(f, 'PUT', reverse('user-detail', args=[f.user_ids[1]]), {'nombre': f'Nombre {f.next()}'})),
+    Route('users.delete', 'user-detail', 'DELETE',
+          lambda f: api_request(f, 'DELETE', reverse('user-detail', args=[new_user(f).id]))),
+    Route('users.list.async', 'user-list-async', 'GET',
+          lambda f: api_request(f, 'GET', reverse('user-list-async'))),
+    Route('users.detail.async', 'user-detail-async', 'GET',
+          lambda f: api_request(f, 'GET', reverse('user-detail-async', args=[f.user_ids[0]]))),
+
+    # Autenticación
+    Route('auth.signin', 'signin', 'POST', signin),
+    Route('auth.refresh', 'token_refresh', 'POST',
+          lambda f: api_request(f, 'POST', reverse('token_refresh'), {'refresh': str(RefreshToken.for_user(f.user))}, auth=False)),
+    Route('auth.logout', 'logout', 'POST',
+          lambda f: api_request(f, 'POST', reverse('logout'), {'refresh': str(RefreshToken.for_user(f.user))}), status=205),
+
+    # Documentación, métricas y administración
+    Route('swagger.ui', 'schema-swagger-ui', 'GET',
+          lambda f: {'method': 'GET', 'path': reverse('schema-swagger-ui')}),
+    Route('swagger.schema', 'schema-swagger-ui', 'GET',
+          lambda f: {'method': 'GET', 'path': reverse('schema-swagger-ui') + '?format=openapi'}),
+    Route('metrics', 'metrics', 'GET',
+          lambda f: {'method': 'GET', 'path': reverse('metrics')}),
+    Route('admin.index', 'admin:index', 'GET',
+          lambda f: {'method': 'GET', 'path': reverse('admin:index')}),
+]
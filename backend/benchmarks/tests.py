@@ -0,0 +1,165 @@
+import itertools
+import os
+import sys
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import URLResolver, get_resolver
+
+from api.auth.blacklist import token_blacklist
+from api.auth.last_login import last_login_buffer
+from api.auth.passwords import password_verifier
+from api.auth.throttling import local_buckets
+from api.auth.tokens import RefreshToken
+from api.products.models import Product
+from api.products.seeding import generate_product_rows, insert_product_rows
+from api.products.services import ProductService
+from api.users.cache import user_cache
+from api.users.models import User
+from api.users.seeding import generate_user_rows, insert_user_rows
+from core.benchmark import compare, format_table, load_baseline, measure, write_results
+from core.bulk_insert import default_insert_method
+
+from .routes import ROUTES
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+
+ITERATIONS = int(os.getenv('BENCHMARK_ITERATIONS', 5))
+THRESHOLD = float(os.getenv('BENCHMARK_THRESHOLD', 0.5))
+STRICT = os.getenv('BENCHMARK_STRICT', '').lower() in ('1', 'true', 'yes')
+REPORT_PATH = os.getenv('BENCHMARK_REPORT')
+UPDATE_BASELINE = os.getenv('BENCHMARK_UPDATE_BASELINE', '').lower() in ('1', 'true', 'yes')
+
+SEEDED_USERS = 500
+SEEDED_PRODUCTS = 2000
+
+
+class Fixtures:
+    """
+    Datos que las rutas usan para armar sus peticiones.
+    """
+
+    def __init__(self, user, email, password, password_hash, product_ids, stock_ids, user_ids):
+        self.user = user
+        self.email = email
+        self.password = password
+        self.password_hash = password_hash
+        self.product_ids = product_ids
+        self.stock_ids = stock_ids
+        self.user_ids = user_ids
+        self._numbers = itertools.count()
+        self._access = str(RefreshToken.for_user(user).access_token)
+
+    def next(self) -> int:
+        return next(self._numbers)
+
+    def auth_headers(self) -> dict:
+        return {'authorization': f'Bearer {self._access}'}
+
+
+def declared_routes():
+    """
+    Pares ``(nombre de la url, método)`` de ``core/urls.py``. El admin cuenta como una sola ruta.
+    """
+    for entry in get_resolver().url_patterns:
+        if isinstance(entry, URLResolver) and entry.namespace == 'admin':
+            yield 'admin:index', 'GET'
+            continue
+        for pattern in entry.url_patterns if isinstance(entry, URLResolver) else [entry]:
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if view_class is None:
+                # Vista de función (p. ej. /metrics): se mide con GET.
+                yield pattern.name, 'GET'
+                continue
+            for method in view_class.http_method_names:
+                if method not in ('head', 'options') and hasattr(view_class, method):
+                    yield pattern.name, method.upper()
+
+
+class EndpointBenchmarkTests(TestCase):
+    """
+    Mide cada ruta contra datos sembrados y la compara con ``baseline.json`` (ver ``benchmarks``).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        password = 'benchmark-Password-123'
+        password_hash = make_password(password)
+        method = default_insert_method()
+        insert_user_rows(list(generate_user_rows(SEEDED_USERS, password_hash, offset=1)), method)
+        insert_product_rows(list(generate_product_rows(SEEDED_PRODUCTS)), method)
+
+        email = 'benchmark@example.com'
+        cls.user = User.objects.create(
+            username='benchmark', email=email, password=password_hash,
+            is_staff=True, is_superuser=True,
+        )
+        service = ProductService()
+        cls.stock_ids = [
+            service.create_product({'nombre': f'Producto con stock {i}', 'precio': '10.00', 'stock': 10 ** 6}).id
+            for i in range(3)
+        ]
+        cls.product_ids = list(Product.objects.order_by('id').values_list('id', flat=True)[:20])
+        cls.user_ids = list(User.objects.exclude(pk=cls.user.pk).order_by('id').values_list('id', flat=True)[:2])
+        cls.credentials = (email, password, password_hash)
+
+    @classmethod
+    def tearDownClass(cls):
+        password_verifier.shutdown()
+        super().tearDownClass()
+
+    def setUp(self):
+        # Como en producción, last_login queda en el buffer y no se escribe en la petición medida; sin el
+        # hilo de escritura, que correría en paralelo a la prueba: lo escriben ``signin`` y ``tearDown``.
+        for patcher in (
+            mock.patch.object(last_login_buffer, 'interval', 3600),
+            mock.patch.object(last_login_buffer, '_start'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        email, password, password_hash = self.credentials
+        self.fixtures = Fixtures(
+            self.user, email, password, password_hash, self.product_ids, self.stock_ids, self.user_ids,
+        )
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        last_login_buffer.flush()
+
+    @staticmethod
+    def reset_caches():
+        # Cada ruta empieza con los cachés vacíos: el calentamiento los llena y las consultas medidas
+        # no dependen de qué rutas se midieron antes.
+        cache.clear()
+        user_cache.clear_local()
+        token_blacklist.reset()
+        local_buckets.clear()
+
+    def test_every_route_is_measured(self):
+        measured = {(route.url_name, route.method) for route in ROUTES}
+        missing = sorted(set(declared_routes()) - measured)
+        self.assertFalse(missing, f'Rutas sin benchmark: {missing}')
+
+    def test_endpoints_within_budget(self):
+        results = []
+        for route in ROUTES:
+            self.reset_caches()
+            result = measure(route.name, self.client, lambda: route.build(self.fixtures), ITERATIONS)
+            self.assertEqual(
+                set(result.statuses), {route.status},
+                f'{route.name} respondió {result.statuses}, se esperaba {route.status}',
+            )
+            results.append(result)
+
+        if REPORT_PATH:
+            write_results(REPORT_PATH, results)
+            sys.stderr.write('\n' + format_table(results) + '\n')
+        if UPDATE_BASELINE:
+            write_results(BASELINE_PATH, results)
+            return
+
+        problems = compare(results, load_baseline(BASELINE_PATH), THRESHOLD, strict=STRICT)
+        self.assertFalse(problems, '\n' + '\n'.join(problems))
@@ -0,0 +1,69 @@
+"""
+Vistas de DRF con manejadores asíncronos (``async def``).
+
+DRF solo despacha vistas síncronas, así que bajo ASGI cada petición pasa por el pool de hilos
+y ocupa un hilo mientras espera a la base de datos. ``AsyncAPIView`` despacha en el event loop:
+autentica con ``aauthenticate`` cuando el autenticador lo ofrece, ejecuta el resto de ``initial()``
+(negociación de contenido, permisos y throttling, que con la configuración del proyecto no hacen
+E/S) y espera al manejador.
+"""
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView cuyos manejadores (salvo ``options``) son corrutinas. Bajo WSGI Django la ejecuta
+    con ``async_to_sync``, por lo que también funciona con el servidor de desarrollo y en pruebas.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aperform_authentication(request)
+            self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aperform_authentication(self, request):
+        """
+        Equivalente asíncrono de ``Request._authenticate``. Deja ``request.user`` y ``request.auth``
+        resueltos, así ``initial()`` ya no consulta la base de datos al autenticar.
+        """
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, 'aauthenticate'):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
@@ -0,0 +1,176 @@
+"""
+Medición de endpoints con el cliente de pruebas de Django y comparación contra una línea base.
+
+Por cada ruta se registra la latencia de varias peticiones, las consultas SQL de la peor de
+ellas y el pico de memoria asignada (``tracemalloc``) en una petición aparte, ya que rastrear
+las asignaciones vuelve más lenta la ejecución y distorsionaría la latencia.
+"""
+import json
+import math
+import platform
+import time
+import tracemalloc
+from typing import NamedTuple
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class EndpointResult(NamedTuple):
+    name: str
+    statuses: list
+    latencies: list
+    queries: list
+    peak_kib: float
+
+    @property
+    def max_queries(self) -> int:
+        return max((len(captured) for captured in self.queries), default=0)
+
+    def worst_queries(self) -> list:
+        """
+        SQL de la petición que más consultas hizo, para los mensajes de error.
+        """
+        return max(self.queries, key=len, default=[])
+
+    def percentile(self, percent) -> float:
+        """
+        Percentil de la latencia en milisegundos (método del rango más cercano).
+        """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+        return ordered[index] * 1000
+
+    def as_dict(self) -> dict:
+        return {
+            'runs': len(self.latencies),
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'queries': self.max_queries,
+            'peak_kib': round(self.peak_kib, 1),
+        }
+
+
+def _send(client, request):
+    response = client.generic(**request)
+    # Las respuestas en streaming (exportación) solo hacen su trabajo al recorrerlas.
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def measure(name, client, build_request, iterations, using='default') -> EndpointResult:
+    """
+    Envía una petición de calentamiento (no se mide), ``iterations`` peticiones medidas y una más
+    con ``tracemalloc``. ``build_request()`` se llama antes de cada petición, fuera del tiempo medido,
+    y devuelve los argumentos de ``Client.generic`` (``method``, ``path``, ``data``, ``content_type``,
+    ``headers``); así las rutas que modifican datos pueden preparar un registro nuevo cada vez.
+    """
+    connection = connections[using]
+    _send(client, build_request())
+
+    statuses, latencies, queries = [], [], []
+    for _ in range(iterations):
+        request = build_request()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = _send(client, request)
+            latencies.append(time.perf_counter() - started)
+        statuses.append(response.status_code)
+        queries.append([query['sql'] for query in captured.captured_queries])
+
+    request = build_request()
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        response = _send(client, request)
+        peak = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    statuses.append(response.status_code)
+
+    return EndpointResult(name=name, statuses=statuses, latencies=latencies, queries=queries, peak_kib=peak / 1024)
+
+
+def compare(results, baseline, threshold, strict=False) -> list:
+    """
+    Compara los resultados con la línea base y devuelve los problemas encontrados (vacío si no hay).
+
+    Las consultas SQL son deterministas y su presupuesto siempre se exige. La latencia (p50) y la
+    memoria dependen de la máquina, así que solo se comparan con ``strict`` y fallan cuando superan
+    la línea base en más de ``threshold`` (0.5 = 50 %).
+    """
+    problems = []
+    routes = baseline.get('routes', {})
+    for result in results:
+        expected = routes.get(result.name)
+        if expected is None:
+            problems.append(f'{result.name}: no tiene línea base; regenérela con BENCHMARK_UPDATE_BASELINE=1')
+            continue
+
+        if result.max_queries > expected['queries']:
+            sql = '\n    '.join(result.worst_queries())
+            problems.append(
+                f"{result.name}: {result.max_queries} consultas, el presupuesto es {expected['queries']}\n    {sql}"
+            )
+
+        if not strict:
+            continue
+        limit = expected['p50_ms'] * (1 + threshold)
+        if result.percentile(50) > limit:
+            problems.append(
+                f"{result.name}: p50 de {result.percentile(50):.2f} ms, la línea base es "
+                f"{expected['p50_ms']:.2f} ms (límite {limit:.2f} ms)"
+            )
+        limit = expected['peak_kib'] * (1 + threshold)
+        if result.peak_kib > limit:
+            problems.append(
+                f"{result.name}: pico de memoria de {result.peak_kib:.1f} KiB, la línea base es "
+                f"{expected['peak_kib']:.1f} KiB (límite {limit:.1f} KiB)"
+            )
+
+    missing = set(routes) - {result.name for result in results}
+    problems.extend(f'{name}: está en la línea base pero ya no se mide' for name in sorted(missing))
+    return problems
+
+
+def load_baseline(path) -> dict:
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {'routes': {}}
+
+
+def write_results(path, results, using='default'):
+    """
+    Guarda los resultados con el mismo formato de la línea base (sirve para regenerarla).
+    """
+    data = {
+        'environment': {
+            'python': platform.python_version(),
+            'database': connections[using].vendor,
+        },
+        'routes': {result.name: result.as_dict() for result in sorted(results, key=lambda result: result.name)},
+    }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=2, ensure_ascii=False)
+        file.write('\n')
+
+
+def format_table(results) -> str:
+    lines = [f"{'route':<32} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'peak KiB':>9}"]
+    for result in results:
+        row = result.as_dict()
+        lines.append(
+            f"{result.name:<32} {row['runs']:>5} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+            f"{row['p99_ms']:>9.2f} {row['queries']:>8} {row['peak_kib']:>9.1f}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,142 @@
+"""
+Inserción masiva de filas ya armadas (tuplas con los valores de ``fields`` en orden).
+
+``bulk_create`` arma un objeto por fila y prepara cada valor con el compilador del ORM; para
+cargas de millones de filas eso limita a unos pocos miles de filas por segundo. Aquí las filas
+van directo a la base de datos:
+
+- ``copy``: ``COPY ... FROM STDIN`` en CSV (solo PostgreSQL);
+- ``executemany``: un ``INSERT`` parametrizado ejecutado por lote (SQLite y el resto);
+- ``bulk``: ``bulk_create`` del ORM, el más lento pero igual al resto del código.
+"""
+import csv
+import io
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.db import connections, models
+
+INSERT_METHODS = ('copy', 'executemany', 'bulk')
+
+
+def default_insert_method(using='default') -> str:
+    return 'copy' if connections[using].vendor == 'postgresql' else 'executemany'
+
+
+def prepare_bulk_load(using='default', cache_mb=256):
+    """
+    Ajusta la conexión (solo esta sesión) para una carga masiva:
+
+    - SQLite: caché de páginas de ``cache_mb`` MB; con la caché por defecto (2 MB) los índices de una
+      tabla grande no caben en memoria y cada inserción lee páginas del disco. Los ordenamientos de
+      ``CREATE INDEX`` (ver ``deferred_indexes``) se hacen en memoria en lugar de archivos temporales.
+    - PostgreSQL: ``synchronous_commit = off``; cada lote confirma sin esperar el WAL en disco. Una caída
+      puede perder los últimos lotes confirmados, nunca dejar datos inconsistentes. ``CREATE INDEX`` puede
+      usar ``cache_mb`` MB para ordenar.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'PRAGMA cache_size = -{int(cache_mb) * 1024}')
+            cursor.execute('PRAGMA temp_store = MEMORY')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SET synchronous_commit = off')
+            cursor.execute(f"SET maintenance_work_mem = '{int(cache_mb)}MB'")
+
+
+@contextmanager
+def deferred_indexes(model, using='default'):
+    """
+    Quita los índices de ``Meta.indexes`` de ``model`` durante una carga masiva y los vuelve a crear
+    al salir: armar cada índice de una vez, ordenando la tabla, cuesta menos que actualizarlo con cada
+    fila insertada. Las claves primarias y las restricciones únicas se mantienen.
+
+    Si el proceso muere durante la carga no llega a crearlos; la siguiente llamada lo hace antes de
+    empezar (ver ``restore_indexes``). No se puede usar dentro de una transacción en SQLite.
+    """
+    restore_indexes(model, using)
+    with connections[using].schema_editor() as schema_editor:
+        for index in model._meta.indexes:
+            schema_editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        restore_indexes(model, using)
+
+
+def restore_indexes(model, using='default') -> list:
+    """
+    Crea los índices de ``Meta.indexes`` de ``model`` que falten en la base de datos.
+
+    Returns:
+        list: Los nombres de los índices creados.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        existing = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    missing = [index for index in model._meta.indexes if index.name not in existing]
+    if missing:
+        with connection.schema_editor() as schema_editor:
+            for index in missing:
+                schema_editor.add_index(model, index)
+    return [index.name for index in missing]
+
+
+def insert_rows(model, fields, rows, method, using='default') -> int:
+    """
+    Inserta las filas (una lista por lote, en la transacción en curso) y devuelve cuántas se insertaron.
+    """
+    if not rows:
+        return 0
+    if method not in INSERT_METHODS:
+        raise ValueError(f'Unknown insert method {method}, expected one of {", ".join(INSERT_METHODS)}')
+    if method == 'copy' and connections[using].vendor != 'postgresql':
+        raise ValueError('COPY is only available on PostgreSQL')
+
+    if method == 'bulk':
+        names = [model._meta.get_field(field).attname for field in fields]
+        model.objects.using(using).bulk_create([model(**dict(zip(names, row))) for row in rows])
+        return len(rows)
+
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(field).column) for field in fields)
+    rows = _adapt_datetimes(connection, model, fields, rows)
+
+    with connection.cursor() as cursor:
+        if method == 'copy':
+            buffer = io.StringIO()
+            # Con QUOTE_NONNUMERIC los textos van entre comillas ("" es texto vacío) y None queda vacío, que COPY lee como NULL.
+            csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+        else:
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})', rows)
+    return len(rows)
+
+
+def _adapt_datetimes(connection, model, fields, rows):
+    """
+    Convierte las fechas al formato de la base de datos (en SQLite, texto UTC sin zona como el ORM).
+    Las filas suelen compartir la misma fecha, así que cada valor distinto se convierte una sola vez.
+    """
+    positions = [
+        index for index, field in enumerate(fields)
+        if isinstance(model._meta.get_field(field), models.DateTimeField)
+    ]
+    if not positions:
+        return rows
+
+    adapted = {}
+    result = []
+    for row in rows:
+        row = list(row)
+        for index in positions:
+            value = row[index]
+            if value.__class__ is datetime:
+                if value not in adapted:
+                    adapted[value] = connection.ops.adapt_datetimefield_value(value)
+                row[index] = adapted[value]
+        result.append(row)
+    return result
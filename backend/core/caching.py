@@ -0,0 +1,21 @@
+"""
+Utilidades comunes para los cachés que se apoyan en el caché de Django.
+"""
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Backends cuyo contenido no ven los demás procesos (o que no guardan nada).
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared_cache(backend) -> bool:
+    """
+    Indica si lo que un proceso escribe en ``backend`` lo leen también los demás workers.
+    Con la memoria local (el valor por defecto de ``CACHES``) cada proceso tiene su propia copia,
+    así que no sirve para avisar de una invalidación a los demás.
+    """
+    if backend is cache:
+        # ``django.core.cache.cache`` es un proxy hacia el backend por defecto.
+        backend = caches[DEFAULT_CACHE_ALIAS]
+    return not isinstance(backend, PROCESS_LOCAL_BACKENDS)
@@ -0,0 +1,45 @@
+"""
+Utilidades para responder peticiones GET condicionales (ETag / Last-Modified).
+
+Las vistas calculan sus validadores a partir de datos baratos de obtener
+(``last_update`` o un agregado) y, si el cliente ya tiene la versión vigente,
+responden 304 sin serializar ni transferir el cuerpo.
+"""
+import hashlib
+import json
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts) -> str:
+    """
+    Construye un ETag a partir de los valores que determinan la representación.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return '"%s"' % hashlib.md5(payload.encode(), usedforsecurity=False).hexdigest()
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Agrega las cabeceras ETag y Last-Modified a la respuesta.
+    """
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def conditional_get(request, etag, last_modified=None):
+    """
+    Evalúa If-None-Match / If-Modified-Since contra los validadores actuales.
+
+    Returns:
+        HttpResponse | None: Un 304 (o 412 si falla una precondición) cuando no hay que
+        enviar el cuerpo, o None si la vista debe responder normalmente.
+    """
+    validators = set_validators(HttpResponse(), etag, last_modified)
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp, response=validators)
+    return None if response is validators else response
@@ -0,0 +1,161 @@
+"""
+Serialización rápida, de solo lectura, para listados y detalles.
+
+``FastSerializer`` toma un serializer de DRF y, a partir de sus campos, arma una lista de
+conversores por campo que se aplican a tuplas obtenidas con ``values_list()``. Así se evita
+construir instancias del modelo y recorrer campo por campo el ``to_representation`` de DRF,
+produciendo exactamente la misma salida.
+"""
+import datetime
+import decimal
+import functools
+
+from rest_framework import fields as drf_fields
+from rest_framework.settings import api_settings
+
+
+class UnsupportedSerializer(ValueError):
+    """
+    El serializer tiene campos que no se pueden leer directamente de una columna.
+    """
+
+
+def _str(value):
+    return value if type(value) is str else str(value)
+
+
+def _int(value):
+    return value if type(value) is int else int(value)
+
+
+def _bool(value):
+    return value if type(value) is bool else drf_fields.BooleanField().to_representation(value)
+
+
+def _decimal_converter(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if field.normalize_output or field.localize or not coerce_to_string or field.decimal_places is None:
+        return field.to_representation
+
+    # Mismo redondeo que DecimalField.quantize, con el exponente y el contexto calculados una sola vez.
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        if type(value) is not decimal.Decimal:
+            value = decimal.Decimal(str(value).strip())
+        return f'{value.quantize(exponent, rounding=rounding, context=context):f}'
+    return convert
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != drf_fields.ISO_8601:
+        return field.to_representation
+
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if field_timezone is None:
+        return field.to_representation
+    field_is_utc = field_timezone is datetime.timezone.utc or getattr(field_timezone, 'key', None) in ('UTC', 'Etc/UTC')
+
+    def convert(value):
+        if not value:
+            return None
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        if field_is_utc and value.tzinfo is datetime.timezone.utc:
+            # Caso habitual (USE_TZ con UTC): la conversión de zona no cambia el valor.
+            return value.replace(tzinfo=None).isoformat() + 'Z'
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def _converter_for(field):
+    # El orden importa: EmailField hereda de CharField y DecimalField no hereda de IntegerField.
+    if isinstance(field, drf_fields.BooleanField):
+        return _bool
+    if isinstance(field, drf_fields.CharField):
+        return _str
+    if isinstance(field, drf_fields.IntegerField):
+        return _int
+    if isinstance(field, drf_fields.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, drf_fields.DateTimeField):
+        return _datetime_converter(field)
+    return field.to_representation
+
+
+class FastSerializer:
+    """
+    Versión de solo lectura de un serializer de DRF que trabaja sobre tuplas de ``values_list()``.
+    Solo admite campos cuyo ``source`` es una columna del propio modelo. Con ``fields`` se limita
+    a esos campos (y a sus columnas).
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        self.serializer_class = serializer_class
+        model = serializer_class.Meta.model
+        readable = [
+            field for name, field in serializer_class().fields.items()
+            if not field.write_only and (fields is None or name in fields)
+        ]
+
+        nullable = []
+        for field in readable:
+            if len(field.source_attrs) != 1 or field.source == '*':
+                raise UnsupportedSerializer(f'El campo {field.field_name} no se puede leer de una columna')
+            nullable.append(model._meta.get_field(field.source).null)
+
+        self.fields = readable
+        self.nullable = tuple(nullable)
+        self.names = tuple(field.field_name for field in readable)
+        self.sources = tuple(field.source for field in readable)
+
+    def compile(self):
+        """
+        Genera la función que convierte una tupla en el diccionario de salida, con el conversor
+        de cada campo ya resuelto. Se llama una vez por respuesta, ya que la zona horaria activa
+        puede cambiar entre peticiones.
+        """
+        namespace = {}
+        items = []
+        for index, (name, field) in enumerate(zip(self.names, self.fields)):
+            namespace[f'convert_{index}'] = _converter_for(field)
+            expression = f'convert_{index}(row[{index}])'
+            if self.nullable[index]:
+                expression = f'(None if row[{index}] is None else {expression})'
+            items.append(f'{name!r}: {expression}')
+
+        source = 'def convert_row(row):\n    return {%s}\n' % ', '.join(items)
+        exec(source, namespace)
+        return namespace['convert_row']
+
+    def serialize_rows(self, rows):
+        convert_row = self.compile()
+        return [convert_row(row) for row in rows]
+
+    def serialize_queryset(self, queryset):
+        return self.serialize_rows(queryset.values_list(*self.sources))
+
+    async def aserialize_queryset(self, queryset):
+        # Sin aiterator(): en Django 5.2 el iterable de values_list() ejecuta la consulta al crearse,
+        # fuera del hilo que usa aiterator, y falla en contexto asíncrono.
+        return self.serialize_rows([row async for row in queryset.values_list(*self.sources)])
+
+    def serialize_instance(self, instance):
+        row = tuple(getattr(instance, source) for source in self.sources)
+        return self.serialize_rows([row])[0]
+
+
+@functools.lru_cache(maxsize=None)
+def get_fast_serializer(serializer_class, fields=None):
+    """
+    Devuelve (y reutiliza) el ``FastSerializer`` de un serializer de DRF para la tupla de campos dada.
+    """
+    return FastSerializer(serializer_class, fields)
@@ -0,0 +1,80 @@
+"""
+Campos dispersos (``?fields=id,nombre``) para los listados y detalles del API.
+
+El parámetro se valida contra los campos legibles del serializer (o contra ``Meta.sparse_fields``
+si el serializer define su propia lista blanca) y se traduce a las columnas del modelo, para que
+la consulta solo lea lo que se va a devolver.
+"""
+import functools
+
+
+class InvalidFields(ValueError):
+    """
+    Se pidieron campos que no existen o que no se pueden seleccionar.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        super().__init__(f"Campos no válidos: {', '.join(names)}")
+
+
+@functools.lru_cache(maxsize=None)
+def selectable_fields(serializer_class) -> dict:
+    """
+    Devuelve ``{campo del API: columna del modelo}`` de los campos que se pueden pedir, en el orden del serializer.
+    """
+    readable = {
+        name: field.source
+        for name, field in serializer_class().fields.items()
+        if not field.write_only
+    }
+    whitelist = getattr(serializer_class.Meta, 'sparse_fields', None)
+    if whitelist is None:
+        return readable
+    return {name: source for name, source in readable.items() if name in whitelist}
+
+
+def parse_fields(value, serializer_class):
+    """
+    Convierte el valor de ``?fields=`` en una tupla de campos en el orden del serializer.
+
+    Returns:
+        tuple | None: None si no se pidió un subconjunto de campos.
+
+    Raises:
+        InvalidFields: Si algún campo no se puede seleccionar.
+    """
+    if not value:
+        return None
+
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    if not requested:
+        return None
+
+    selectable = selectable_fields(serializer_class)
+    invalid = sorted(requested - set(selectable))
+    if invalid:
+        raise InvalidFields(invalid)
+    return tuple(name for name in selectable if name in requested)
+
+
+def field_sources(serializer_class, fields):
+    """
+    Columnas del modelo que hay que leer para los campos pedidos (todas las seleccionables si es None).
+    """
+    selectable = selectable_fields(serializer_class)
+    names = selectable if fields is None else fields
+    return tuple(selectable[name] for name in names)
+
+
+class SparseFieldsMixin:
+    """
+    Permite construir el serializer con ``fields=(...)`` para devolver solo esos campos.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -0,0 +1,168 @@
+"""
+Generador de carga HTTP/1.1 para comparar despliegues (WSGI contra ASGI).
+
+Cada conexión es keep-alive y envía la siguiente petición en cuanto recibe la respuesta
+anterior (carga de lazo cerrado), así la concurrencia es la cantidad de conexiones abiertas.
+El cliente usa asyncio con sockets crudos y puede repartirse en varios procesos para que
+no sea el cuello de botella.
+"""
+import asyncio
+import math
+import multiprocessing
+import time
+from collections import Counter
+from typing import NamedTuple
+
+
+class LoadResult(NamedTuple):
+    requests: int
+    errors: int
+    elapsed: float
+    latencies: list
+    statuses: dict
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, percent) -> float:
+        """
+        Percentil de la latencia en milisegundos (método del rango más cercano).
+        """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+        return ordered[index] * 1000
+
+
+def build_requests(host, port, paths, headers=None):
+    """
+    Arma las peticiones GET ya codificadas; las conexiones las recorren en ciclo.
+    """
+    extra = ''.join(f'{name}: {value}\r\n' for name, value in (headers or {}).items())
+    return [
+        f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: keep-alive\r\n{extra}\r\n'.encode()
+        for path in paths
+    ]
+
+
+async def _read_response(reader):
+    """
+    Lee una respuesta completa y devuelve ``(status, cerrar_conexion)``.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed by the server')
+    status = int(status_line.split()[1])
+
+    length = None
+    chunked = close = False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.partition(b':')
+        name = name.strip().lower()
+        value = value.strip().lower()
+        if name == b'content-length':
+            length = int(value)
+        elif name == b'transfer-encoding':
+            chunked = b'chunked' in value
+        elif name == b'connection':
+            close = value == b'close'
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length is not None:
+        await reader.readexactly(length)
+    elif status not in (204, 304):
+        await reader.read()
+        close = True
+    return status, close
+
+
+async def _connection(host, port, requests, offset, deadline, measure_from, results):
+    reader = writer = None
+    index = offset
+    while time.perf_counter() < deadline:
+        if writer is None:
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+            except OSError:
+                results['errors'] += 1
+                await asyncio.sleep(0.05)
+                continue
+
+        started = time.perf_counter()
+        try:
+            writer.write(requests[index % len(requests)])
+            await writer.drain()
+            status, close = await _read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            status, close = None, True
+        finished = time.perf_counter()
+        index += 1
+
+        if started >= measure_from:
+            if status is None or status >= 400:
+                results['errors'] += 1
+            else:
+                results['latencies'].append(finished - started)
+            results['statuses'][status] += 1
+
+        if close:
+            writer.close()
+            writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def _run_connections(host, port, requests, connections, duration, warmup, first_offset):
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+    results = {'latencies': [], 'errors': 0, 'statuses': Counter()}
+    await asyncio.gather(*[
+        _connection(host, port, requests, first_offset + i, deadline, measure_from, results)
+        for i in range(connections)
+    ])
+    return results
+
+
+def _client_process(args):
+    return asyncio.run(_run_connections(*args))
+
+
+def run_load(host, port, requests, concurrency, duration, warmup=1.0, processes=1) -> LoadResult:
+    """
+    Mantiene ``concurrency`` conexiones durante ``warmup + duration`` segundos y mide solo después
+    del calentamiento. Con ``processes > 1`` las conexiones se reparten entre varios procesos.
+    """
+    processes = max(1, min(processes, concurrency))
+    shares = [concurrency // processes + (1 if i < concurrency % processes else 0) for i in range(processes)]
+    offsets = [sum(shares[:i]) for i in range(processes)]
+    jobs = [(host, port, requests, share, duration, warmup, offset) for share, offset in zip(shares, offsets)]
+
+    if processes == 1:
+        partials = [_client_process(jobs[0])]
+    else:
+        with multiprocessing.get_context('spawn').Pool(processes) as pool:
+            partials = pool.map(_client_process, jobs)
+
+    latencies = [latency for partial in partials for latency in partial['latencies']]
+    statuses = Counter()
+    for partial in partials:
+        statuses.update(partial['statuses'])
+    return LoadResult(
+        requests=len(latencies),
+        errors=sum(partial['errors'] for partial in partials),
+        elapsed=duration,
+        latencies=latencies,
+        statuses=dict(statuses),
+    )
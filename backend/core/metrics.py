@@ -0,0 +1,201 @@
+"""
+Métricas de Prometheus por endpoint: peticiones, latencia, código de estado, consultas SQL,
+tiempo en SQL y tamaño de la respuesta, etiquetadas con el nombre de la URL resuelta
+(``product-list-create``, ``user-detail``, ``signin``...).
+
+Con gunicorn o uvicorn cada worker es un proceso con sus propios contadores. Si la variable de
+entorno ``PROMETHEUS_MULTIPROC_DIR`` apunta a un directorio (vacío al iniciar el servidor),
+cada proceso escribe sus valores en archivos mapeados en memoria dentro de él y ``/metrics``
+los suma todos; sin ella, ``/metrics`` solo muestra los del proceso que atiende la petición.
+
+Si prometheus_client no está instalado, el middleware se desactiva y ``/metrics`` responde 503.
+``/metrics`` solo responde a las IPs de ``METRICS_ALLOWED_IPS`` o con el token ``METRICS_TOKEN``.
+"""
+import hmac
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+# Las rutas que no existen se agrupan en una sola etiqueta para no crear una serie por URL.
+UNMATCHED_VIEW = 'unmatched'
+KNOWN_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'})
+
+LABELS = ('view', 'method')
+
+if prometheus_client is not None:
+    REQUESTS = prometheus_client.Counter(
+        'http_requests_total', 'Peticiones atendidas por vista, método y código de estado.',
+        LABELS + ('status',),
+    )
+    LATENCY = prometheus_client.Histogram(
+        'http_request_duration_seconds', 'Tiempo de respuesta, incluido el envío de respuestas en streaming.',
+        LABELS, buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    )
+    QUERIES = prometheus_client.Histogram(
+        'http_request_db_queries', 'Consultas SQL ejecutadas por petición.',
+        LABELS, buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200),
+    )
+    DB_TIME = prometheus_client.Histogram(
+        'http_request_db_duration_seconds', 'Tiempo dentro de la base de datos por petición.',
+        LABELS, buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10),
+    )
+    RESPONSE_SIZE = prometheus_client.Histogram(
+        'http_response_size_bytes', 'Tamaño del cuerpo de la respuesta.',
+        LABELS, buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864),
+    )
+
+
+class QueryTracker:
+    """
+    Envoltura de ``connection.execute_wrapper`` que cuenta las consultas de una petición y su duración.
+    """
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class PrometheusMetricsMiddleware:
+    """
+    Registra las métricas de cada petición. Va primero en ``MIDDLEWARE`` para medir también al
+    resto de los middlewares. Funciona en WSGI y en ASGI.
+
+    Las respuestas en streaming (exportación) se registran cuando termina el envío: sus consultas
+    se ejecutan mientras se recorre el contenido, después de que la vista devolvió la respuesta.
+    Con contenido síncrono se cuentan en el hilo que lo recorre; con contenido asíncrono solo se
+    cuentan las de la vista.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if prometheus_client is None or not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        tracker = QueryTracker()
+        with connection.execute_wrapper(tracker):
+            response = self.get_response(request)
+        return self.finish(request, response, started, tracker)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        tracker = QueryTracker()
+        # Las conexiones son por hilo y el ORM corre en el hilo de sync_to_async de esta petición,
+        # así que la envoltura se instala en la conexión de ese hilo y no en la del event loop.
+        await sync_to_async(self.add_tracker)(tracker)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(self.remove_tracker)(tracker)
+        return self.finish(request, response, started, tracker)
+
+    @staticmethod
+    def add_tracker(tracker):
+        connection.execute_wrappers.append(tracker)
+
+    @staticmethod
+    def remove_tracker(tracker):
+        if tracker in connection.execute_wrappers:
+            connection.execute_wrappers.remove(tracker)
+
+    def finish(self, request, response, started, tracker):
+        labels = (self.view_name(request), request.method if request.method in KNOWN_METHODS else 'OTHER')
+        if not response.streaming:
+            self.observe(labels, response.status_code, time.perf_counter() - started, tracker, len(response.content))
+            return response
+
+        content = response.streaming_content
+        if response.is_async:
+            async def measured():
+                size = 0
+                try:
+                    async for chunk in content:
+                        size += len(chunk)
+                        yield chunk
+                finally:
+                    self.observe(labels, response.status_code, time.perf_counter() - started, tracker, size)
+        else:
+            def measured():
+                size = 0
+                try:
+                    with connection.execute_wrapper(tracker):
+                        for chunk in content:
+                            size += len(chunk)
+                            yield chunk
+                finally:
+                    self.observe(labels, response.status_code, time.perf_counter() - started, tracker, size)
+
+        response.streaming_content = measured()
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        return match.view_name if match is not None and match.view_name else UNMATCHED_VIEW
+
+    @staticmethod
+    def observe(labels, status, elapsed, tracker, size):
+        REQUESTS.labels(*labels, str(status)).inc()
+        LATENCY.labels(*labels).observe(elapsed)
+        QUERIES.labels(*labels).observe(tracker.count)
+        DB_TIME.labels(*labels).observe(tracker.duration)
+        RESPONSE_SIZE.labels(*labels).observe(size)
+
+
+def can_read_metrics(request) -> bool:
+    """
+    Permite leer las métricas con ``Authorization: Bearer <METRICS_TOKEN>`` (si hay token configurado)
+    o desde una IP de ``METRICS_ALLOWED_IPS``. Se usa ``REMOTE_ADDR``, no ``X-Forwarded-For``.
+    """
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+            return True
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    """
+    Métricas en el formato de texto de Prometheus. Con ``PROMETHEUS_MULTIPROC_DIR`` suma las de
+    todos los procesos; si no, las del proceso actual.
+    """
+    if prometheus_client is None or not settings.METRICS_ENABLED:
+        return JsonResponse({"status": "error", "message": "Las métricas no están disponibles"}, status=503)
+
+    if not can_read_metrics(request):
+        return JsonResponse({"status": "error", "message": "No tiene permiso para consultar las métricas"}, status=403)
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return HttpResponse(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
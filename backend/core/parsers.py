@@ -0,0 +1,33 @@
+"""
+Parser JSON del API basado en orjson, con el mismo comportamiento que ``JSONParser`` de DRF.
+Si orjson no está instalado, o el cuerpo no viene en UTF-8, se usa el parser de DRF.
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONParser(JSONParser):
+    """
+    ``JSONParser`` que decodifica con orjson cuando está disponible.
+    orjson siempre rechaza ``NaN`` e ``Infinity``, igual que DRF con ``STRICT_JSON``.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
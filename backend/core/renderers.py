@@ -0,0 +1,44 @@
+"""
+Renderer JSON del API basado en orjson, con la misma salida que ``JSONRenderer`` de DRF.
+
+Si orjson no está instalado, o la respuesta pide algo que orjson no reproduce igual
+(indentación distinta de la compacta, ``UNICODE_JSON``/``COMPACT_JSON`` desactivados, enteros
+de más de 64 bits), se usa el ``JSONRenderer`` de DRF sobre ``json`` de la biblioteca estándar.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    # Las fechas pasan por el encoder de DRF para conservar su formato (``Z`` en UTC, etc.).
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` que serializa con orjson cuando está disponible.
+    """
+
+    _default = staticmethod(JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self._default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que DRF: se escapan U+2028 y U+2029 para que la salida sea JavaScript válido.
+        if b'\xe2\x80' in ret:
+            ret = ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+        return ret
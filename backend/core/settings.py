@@ -53,6 +53,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -66,6 +67,8 @@ AUTH_USER_MODEL = 'users.User'
 
 
 MIDDLEWARE = [
+    # Primero, para que la latencia de las métricas incluya a los demás middlewares.
+    'core.metrics.PrometheusMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -110,6 +113,25 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Memoria local por defecto (pruebas y desarrollo); en producción CACHE_REDIS_URL apunta a Redis.
+
+if os.getenv('CACHE_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -128,6 +150,31 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# El hasher de AUTH_PASSWORD_HASHER cifra las contraseñas nuevas; los demás solo verifican las ya
+# guardadas, que se vuelven a cifrar con el preferido (y con AUTH_PASSWORD_ITERATIONS) al iniciar sesión.
+# argon2 y bcrypt_sha256 necesitan argon2-cffi y bcrypt. Ver benchmark_password_hashing.
+
+_PASSWORD_HASHERS = {
+    'pbkdf2_sha256': 'api.auth.hashers.PBKDF2PasswordHasher',
+    'pbkdf2_sha1': 'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt_sha256': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+AUTH_PASSWORD_HASHER = os.getenv('AUTH_PASSWORD_HASHER', 'pbkdf2_sha256')
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[AUTH_PASSWORD_HASHER]] + [
+    hasher for algorithm, hasher in _PASSWORD_HASHERS.items() if algorithm != AUTH_PASSWORD_HASHER
+]
+AUTH_PASSWORD_ITERATIONS = int(os.getenv('AUTH_PASSWORD_ITERATIONS', 1_000_000))
+
+# Verificación de contraseñas en un pool de procesos (por proceso del servidor; 0 = en el hilo de la
+# petición), verificaciones que pueden esperar antes de responder 503 y segundos máximos de espera.
+AUTH_PASSWORD_WORKERS = int(os.getenv('AUTH_PASSWORD_WORKERS', 2))
+AUTH_PASSWORD_QUEUE_SIZE = int(os.getenv('AUTH_PASSWORD_QUEUE_SIZE', 16))
+AUTH_PASSWORD_TIMEOUT = float(os.getenv('AUTH_PASSWORD_TIMEOUT', 10))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -153,11 +200,59 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT de simplejwt con el usuario en caché y una variante asíncrona para las vistas AsyncAPIView
+        'api.auth.authentication.CachedJWTAuthentication',
         # 'rest_framework_jwt.authentication.JSONWebTokenAuthentication', #  #deprecate package djangorestframework-jwt
     ],
+    # JSON con orjson (misma salida que el renderer de DRF; usa json estándar si orjson no está instalado)
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Proxies de confianza delante de la aplicación. Con 0 la IP del cliente (throttling) es REMOTE_ADDR:
+    # sin este valor DRF usaría X-Forwarded-For tal como lo manda el cliente, que puede cambiarlo en cada petición.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+    # Token buckets del inicio de sesión: ráfaga de N intentos que se recarga a N por periodo
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.getenv('AUTH_LOGIN_THROTTLE_IP_RATE', '20/min'),
+        'login_email': os.getenv('AUTH_LOGIN_THROTTLE_EMAIL_RATE', '5/min'),
+    },
 }
 
+# Serialización rápida (values_list + conversores por campo) en listados y detalles de solo lectura
+FAST_SERIALIZATION = os.getenv('FAST_SERIALIZATION', 'False').lower() in ('true', '1', 'yes')
+
+# Métricas de Prometheus por endpoint en /metrics (ver core/metrics.py). Con varios workers,
+# la variable PROMETHEUS_MULTIPROC_DIR indica el directorio donde se suman las de todos los procesos.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() in ('true', '1', 'yes')
+# /metrics solo responde a las IPs de METRICS_ALLOWED_IPS (por defecto, la propia máquina) o a quien
+# envíe "Authorization: Bearer <METRICS_TOKEN>"; sin token configurado solo vale la lista de IPs.
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Paginación por cursor del listado de productos
+PRODUCTS_PAGE_SIZE = int(os.getenv('PRODUCTS_PAGE_SIZE', 50))
+PRODUCTS_MAX_PAGE_SIZE = int(os.getenv('PRODUCTS_MAX_PAGE_SIZE', 500))
+
+# Segundos que se guarda en caché cada página del listado de productos (0 desactiva el caché)
+PRODUCTS_LIST_CACHE_TIMEOUT = int(os.getenv('PRODUCTS_LIST_CACHE_TIMEOUT', 300))
+
+# Máximo de elementos (create + update + delete) por petición a /api/products/bulk/
+PRODUCTS_BULK_MAX_ITEMS = int(os.getenv('PRODUCTS_BULK_MAX_ITEMS', 1000))
+
+# Filas que se leen de la base de datos por lote al exportar el catálogo
+PRODUCTS_EXPORT_CHUNK_SIZE = int(os.getenv('PRODUCTS_EXPORT_CHUNK_SIZE', 2000))
+
+# Feed de cambios: los cambios más recientes que estos segundos todavía no se entregan, para no saltarse
+# escrituras cuya transacción aún no se confirma; las bajas se conservan esta cantidad de días
+PRODUCTS_CHANGES_SETTLE_SECONDS = float(os.getenv('PRODUCTS_CHANGES_SETTLE_SECONDS', 2))
+PRODUCTS_TOMBSTONE_RETENTION_DAYS = int(os.getenv('PRODUCTS_TOMBSTONE_RETENTION_DAYS', 30))
+
 SIMPLE_JWT = {
 
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv('JWT_ACCESS_TOKEN_MINUTES', 60))),
@@ -193,6 +288,30 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=int(os.getenv('JWT_SLIDING_REFRESH_DAYS', 1))),
 }
 
+# Caché del usuario autenticado por JWT: segundos en el caché compartido y en la memoria de cada proceso
+# (0 desactiva cada nivel). El nivel compartido solo se usa con un caché compartido (Redis): con la memoria
+# local se omite. Tras un cambio, otros procesos pueden usar el valor anterior hasta su TTL local.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+AUTH_USER_CACHE_LOCAL_TIMEOUT = float(os.getenv('AUTH_USER_CACHE_LOCAL_TIMEOUT', 5))
+
+# Lista negra de refresh tokens: segundos que se guarda cada respuesta exacta en el caché compartido y
+# cada cuánto reconstruye cada proceso su filtro de Bloom desde la base de datos. Sin un caché compartido
+# (Redis) no se usan: cada comprobación consulta la base de datos.
+AUTH_BLACKLIST_CACHE_TIMEOUT = int(os.getenv('AUTH_BLACKLIST_CACHE_TIMEOUT', 3600))
+AUTH_BLACKLIST_BLOOM_REBUILD_SECONDS = int(os.getenv('AUTH_BLACKLIST_BLOOM_REBUILD_SECONDS', 300))
+
+# Estado de los límites de inicio de sesión: en la memoria de cada proceso (LRU de a lo sumo
+# AUTH_LOGIN_THROTTLE_MAX_ENTRIES llaves) o, con AUTH_LOGIN_THROTTLE_SHARED, en el caché compartido.
+AUTH_LOGIN_THROTTLE_SHARED = os.getenv('AUTH_LOGIN_THROTTLE_SHARED', 'False').lower() in ('true', '1', 'yes')
+AUTH_LOGIN_THROTTLE_MAX_ENTRIES = int(os.getenv('AUTH_LOGIN_THROTTLE_MAX_ENTRIES', 100_000))
+
+# last_login: con AUTH_LAST_LOGIN_SYNC se escribe en cada inicio de sesión (comportamiento de Django);
+# si no, cada proceso lo escribe por lotes cada N segundos o al juntar N usuarios, y al terminar. Con 0
+# segundos no hay hilo y se escribe en cada inicio de sesión.
+AUTH_LAST_LOGIN_SYNC = os.getenv('AUTH_LAST_LOGIN_SYNC', 'False').lower() in ('true', '1', 'yes')
+AUTH_LAST_LOGIN_FLUSH_SECONDS = float(os.getenv('AUTH_LAST_LOGIN_FLUSH_SECONDS', 10))
+AUTH_LAST_LOGIN_FLUSH_SIZE = int(os.getenv('AUTH_LAST_LOGIN_FLUSH_SIZE', 1000))
+
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
         'Bearer': {
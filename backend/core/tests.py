@@ -0,0 +1,62 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.users.models import User
+
+
+class MetricsEndpointTests(TestCase):
+    """
+    ``/metrics``: acceso restringido por IP o token y líneas registradas por el middleware.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('metrics')
+
+    @staticmethod
+    def sample(text, series):
+        """
+        Valor de una serie del formato de texto de Prometheus (0 si aún no existe).
+        """
+        for line in text.splitlines():
+            name, _, value = line.rpartition(' ')
+            if name == series:
+                return float(value)
+        return 0.0
+
+    def scrape(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_request_is_counted_and_timed(self):
+        counter = 'http_requests_total{method="GET",status="200",view="product-list-create"}'
+        latency = 'http_request_duration_seconds_count{method="GET",view="product-list-create"}'
+        slowest = 'http_request_duration_seconds_bucket{le="+Inf",method="GET",view="product-list-create"}'
+        queries = 'http_request_db_queries_count{method="GET",view="product-list-create"}'
+        before = self.scrape()
+
+        api = APIClient()
+        api.force_authenticate(User.objects.create(username='metricas', email='metricas@example.com'))
+        self.assertEqual(api.get(reverse('product-list-create')).status_code, 200)
+
+        after = self.scrape()
+        for series in (counter, latency, slowest, queries):
+            with self.subTest(series):
+                self.assertEqual(self.sample(after, series), self.sample(before, series) + 1)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', after)
+
+    def test_other_ips_are_rejected(self):
+        response = self.client.get(self.url, REMOTE_ADDR='203.0.113.7', HTTP_X_FORWARDED_FOR='127.0.0.1')
+
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn(b'http_requests_total', response.content)
+
+    @override_settings(METRICS_TOKEN='secreto', METRICS_ALLOWED_IPS=[])
+    def test_bearer_token_grants_access(self):
+        cases = (('Bearer secreto', 200), ('Bearer otro', 403), ('secreto', 403), (None, 403))
+        for authorization, expected in cases:
+            with self.subTest(authorization):
+                headers = {'HTTP_AUTHORIZATION': authorization} if authorization else {}
+                self.assertEqual(self.client.get(self.url, **headers).status_code, expected)
@@ -20,6 +20,8 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
 
+from core.metrics import metrics_view
+
 
 schema_view = get_schema_view(
    openapi.Info(
@@ -35,6 +37,7 @@ schema_view = get_schema_view(
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+    path('metrics', metrics_view, name='metrics'),
 
     # API endpoints
     path('api/users/', include('api.users.urls')),